@@ -0,0 +1,59 @@
+"""Measure near-duplicate lookups against a large tweet history.
+
+Run from the repository root:
+
+    PYTHONPATH=. python benchmarks/bench_duplicate_index.py
+"""
+
+import random
+import string
+import time
+
+from fame.utils.duplicate_index import NearDuplicateIndex
+
+
+def make_tweets(count: int, rng: random.Random):
+    """Return synthetic tweets drawn from a Zipf-like vocabulary."""
+    vocabulary = [
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9)))
+        for _ in range(5000)
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    tweets = [
+        " ".join(rng.choices(vocabulary, weights, k=rng.randint(10, 30)))
+        + " #physics 🔬"
+        for _ in range(count)
+    ]
+    return tweets, vocabulary
+
+
+def main(count: int = 300000, queries: int = 1000):
+    """Print indexing time, lookup latency and recall for edited repeats."""
+    rng = random.Random(0)
+    tweets, vocabulary = make_tweets(count + queries, rng)
+    history, fresh = tweets[:count], tweets[count:]
+
+    index = NearDuplicateIndex()
+    start = time.perf_counter()
+    index.add_many(history)
+    print(f"Indexed {count} tweets in {time.perf_counter() - start:.1f} s")
+
+    # Repeats of old tweets with one word changed
+    repeats = []
+    for tweet in rng.sample(history, queries):
+        words = tweet.split()
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+        repeats.append(" ".join(words))
+
+    for label, texts in (("new", fresh), ("repeat", repeats)):
+        start = time.perf_counter()
+        hits = sum(index.is_duplicate(text) for text in texts)
+        elapsed = (time.perf_counter() - start) / len(texts) * 1e6
+        print(
+            f"{label:>6} tweets: {elapsed:6.0f} us per lookup, "
+            f"{hits / len(texts):.1%} flagged"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure bytes per persona for the dataclass and slotted representations.
+
+Run from the repository root:
+
+    PYTHONPATH=. python benchmarks/bench_persona_memory.py
+"""
+
+import gc
+import tracemalloc
+
+from fame.core.abilities_and_knowledge import AbilitiesAndKnowledge
+from fame.core.mood_and_emotions import MoodAndEmotions
+
+ABILITIES = [
+    "PhD in Theoretical Physics. Expert in quantum mechanics, relativity, "
+    "particle physics. Seasoned researcher and professor.",
+    "CEO and founder. Expert in electric vehicles, space technology, AI. "
+    "Experienced in scaling startups and machine learning research.",
+    "Strong dancing skills, learning choreography and teaching beginners.",
+]
+MOODS = [
+    "Thoughtful and enthusiastic, curious and patient, sometimes concerned.",
+    "Excited and determined, always focused and creative.",
+    "generally happy but sometimes gets stressed about exams",
+]
+
+
+def measure(build, count: int) -> float:
+    """Return the traced bytes per persona retained by build()."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    personas = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del personas
+    return (after - before) / count
+
+
+def main(count: int = 20000):
+    """Print bytes per persona before and after converting to slotted state."""
+    # Parsed objects as the Agent holds them today; raw descriptions are
+    # shared strings, so only the per-persona structures are counted
+    parsed = [
+        (AbilitiesAndKnowledge(ABILITIES[i % 3]), MoodAndEmotions(MOODS[i % 3]))
+        for i in range(3)
+    ]
+
+    def build_dataclass(i):
+        abilities, mood = parsed[i % 3]
+        return (
+            AbilitiesAndKnowledge.from_features(
+                abilities.raw_description, abilities.get_knowledge_context()
+            ),
+            MoodAndEmotions.from_features(
+                mood.raw_description, mood.get_mood_context()
+            ),
+        )
+
+    def build_slotted(i):
+        abilities, mood = parsed[i % 3]
+        return abilities.to_state(), mood.to_state()
+
+    before = measure(build_dataclass, count)
+    after = measure(build_slotted, count)
+    print(f"Dataclass objects: {before:8.0f} bytes per persona")
+    print(f"Slotted state:     {after:8.0f} bytes per persona")
+    print(f"Reduction:         {1 - after / before:8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Measure per-persona parse cost of the shared keyword engine.
+
+Run from the repository root:
+
+    PYTHONPATH=. python benchmarks/bench_persona_parsing.py
+"""
+
+import time
+
+from fame.core.abilities_and_knowledge import AbilitiesAndKnowledge
+from fame.core.mood_and_emotions import MoodAndEmotions
+from fame.parsers import (
+    parse_abilities_knowledge,
+    parse_facets_of_personality,
+    parse_mood_emotions,
+)
+
+PERSONAS = [
+    (
+        "Dr. Sarah Chen is a passionate physics professor who loves making "
+        "complex concepts accessible. She is patient, encouraging and curious.",
+        "PhD in Theoretical Physics from MIT. Expert in quantum mechanics, "
+        "relativity, and particle physics. Seasoned researcher with 15 years "
+        "of teaching experience and strong skills in science communication.",
+        "Thoughtful and enthusiastic about science education. Feels happy "
+        "when students have breakthrough moments, occasionally concerned "
+        "about misinformation.",
+    ),
+    (
+        "Visionary tech entrepreneur with bold ideas and direct communication. "
+        "Enjoys memes and is interested in space exploration.",
+        "CEO and founder of multiple companies. Expert in: electric vehicles, "
+        "space technology, neural interfaces, AI. Experienced in scaling "
+        "startups and machine learning research.",
+        "Excited and determined, sometimes provocative, always focused.",
+    ),
+    (
+        "Bonnie is a friendly and cheerful girl who likes dancing and studying "
+        "in high school.",
+        "She has strong dancing skills and high school level knowledge in the "
+        "United States.",
+        "generally happy but sometimes gets stressed about exams",
+    ),
+]
+
+
+PARSERS = {
+    "MoodAndEmotions": lambda persona: MoodAndEmotions(persona[2]),
+    "AbilitiesAndKnowledge": lambda persona: AbilitiesAndKnowledge(persona[1]),
+    "parse_facets_of_personality": lambda persona: parse_facets_of_personality(
+        persona[0]
+    ),
+    "parse_abilities_knowledge": lambda persona: parse_abilities_knowledge(persona[1]),
+    "parse_mood_emotions": lambda persona: parse_mood_emotions(persona[2]),
+}
+
+
+def time_per_persona(parse, iterations: int) -> float:
+    """Return the mean time in microseconds to run parse over one persona."""
+    for persona in PERSONAS:
+        parse(persona)
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        parse(PERSONAS[i % len(PERSONAS)])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int = 20000):
+    """Print the mean parse time per persona for each parser and in total."""
+    total = 0.0
+    for name, parse in PARSERS.items():
+        cost = time_per_persona(parse, iterations)
+        total += cost
+        print(f"{name:<30} {cost:8.1f} us")
+
+    agent_cost = time_per_persona(
+        lambda persona: (
+            PARSERS["MoodAndEmotions"](persona),
+            PARSERS["AbilitiesAndKnowledge"](persona),
+        ),
+        iterations,
+    )
+    print(f"{'Agent persona parse':<30} {agent_cost:8.1f} us")
+    print(f"{'All parsers':<30} {total:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
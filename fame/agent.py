@@ -1,19 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
+import difflib
+import hashlib
 import os
+import queue
 import random
-from typing import Optional, Dict, List, Any
-from fame.integrations.replicate_integration import ReplicateIntegration
+import re
+import threading
+import time
+from collections import deque
+from typing import Optional, Deque, Dict, List, Any, Iterator, Tuple, Union
+from fame.integrations.replicate_integration import MAX_SEED, ReplicateIntegration
 from fame.integrations.openrouter_integration import OpenRouterIntegration
 from fame.integrations.twitter_integration import TwitterIntegration
+from fame.integrations.publishers import create_publisher
 from fame.core.facets_of_personality import FacetsOfPersonality
 from fame.core.abilities_and_knowledge import AbilitiesAndKnowledge
 from fame.core.mood_and_emotions import MoodAndEmotions
+from fame.core.mood_dynamics import MoodStore
+from fame.persona_snapshot import PersonaSnapshot
+from fame.content_buffer import ContentBuffer, DEFAULT_MAX_AGE, delete_media
+from fame.outbox import Outbox, PENDING
+from fame.post_history import PostHistory
+from .utils.deadline import Deadline
+from .utils.json_stream import JSONArrayParser, parse_json_array
+from .utils.face_detection import get_face_detector
+from .utils.duplicate_index import NearDuplicateIndex, normalize_text
+from .utils.media_cache import MediaCache
 from .utils.tweet_validator import TweetValidator
-from .utils.path_utils import resolve_profile_path
+from .utils.path_utils import resolve_data_path, resolve_profile_path
 from dotenv import load_dotenv
 from pathlib import Path
 
+# The thread planner separates tweets with a line containing only "---"
+THREAD_DELIMITER = re.compile(r"\n[ \t]*---[ \t]*(?:\n|$)")
+
+# Shares of the time left that each stage of an image post may use; the
+# caption gets whatever remains
+SCENE_BUDGET_SHARE = 0.2
+RENDER_BUDGET_SHARE = 0.85
+# Share of the render stage for generating the image when a face swap follows
+GENERATE_BUDGET_SHARE = 0.6
+
+# A timeline post matches an in-doubt outbox entry when their normalized text
+# is at least this similar (X escapes and rewrites links) and it was created
+# no more than RECONCILE_SKEW seconds before the entry (X truncates to seconds)
+RECONCILE_SIMILARITY = 0.9
+RECONCILE_SKEW = 5.0
+
+# Posts generated (or drafts finalized) at once by fill_content_buffer and
+# finalize_buffered; buffering uses idle capacity, so it should not flood
+# Replicate however many posts are missing
+BUFFER_WORKERS = 4
+
+# Preview-tier seeds tried when a face swap image shows no usable face
+FACELESS_RETRIES = 1
+
+# Appended to scene prompts whose image gets the profile face swapped in
+FACE_SWAP_PHOTO_NOTES = (
+    "\n\nPhotography setup: Shot with a professional DSLR camera, 85mm portrait lens at f/2.8. "
+    "Natural window lighting from the front-left, supplemented with a soft fill light. "
+    "Camera positioned at eye level, subject's face at 3/4 angle. "
+    "Sharp focus on facial features, subtle background blur. "
+    "High-end color grading, ultra-realistic photographic style, 4K resolution. "
+    "Absolutely no artistic filters, no anime style, no illustration effects. "
+    "This must look like a professional photograph taken with high-end equipment."
+)
+
 
 class Agent:
     def __init__(
@@ -24,8 +78,35 @@ class Agent:
         mood_emotions: str,
         environment_execution: list,
         profile_image_path: Optional[str] = None,
+        compiled_persona: Optional[Dict[str, Any]] = None,
+        mood_store: Optional[MoodStore] = None,
+        duplicate_index: Optional[NearDuplicateIndex] = None,
+        name: Optional[str] = None,
+        post_history: Optional[PostHistory] = None,
+        outbox: Optional[Outbox] = None,
+        twitter_integration: Optional[TwitterIntegration] = None,
+        content_buffer: Optional[ContentBuffer] = None,
+        publisher: Union[str, Any, None] = None,
     ):
-        """Initialize the agent with its core components."""
+        """
+        Initialize the agent with its core components.
+
+        compiled_persona is a record from a persona snapshot; when given, the
+        descriptions are not reparsed and demographics are only resolved if
+        the snapshot has none.
+        mood_store is a MoodStore shared by many agents; when given, this
+        agent's mood evolves inside it. duplicate_index holds the account's
+        posted text; by default it is kept per account in the data directory.
+        name identifies the persona in the post history and outbox, which
+        default to shared databases in the data directory. twitter_integration
+        is an account's client from a TwitterAccountPool; by default a client
+        is built from the X_* variables when posting to X, so local sinks
+        need no X credentials. content_buffer holds posts generated
+        ahead of time and defaults to a shared database in the data directory.
+        publisher is where posts go: "x" (default), "sqlite" or "jsonl" (a
+        local sink in the data directory), "null", or a publisher instance;
+        FAME_PUBLISHER sets the default.
+        """
         # Load environment variables
         load_dotenv(env_file)
 
@@ -35,23 +116,59 @@ class Agent:
         )
 
         # Initialize core components
-        self.facets = FacetsOfPersonality(
-            description=facets_of_personality, llm=self.openrouter_integration
-        )
-        self.abilities = AbilitiesAndKnowledge(abilities_knowledge)
-        self.mood = MoodAndEmotions(mood_emotions)
+        if compiled_persona:
+            self.facets = FacetsOfPersonality(
+                description=facets_of_personality,
+                llm=self.openrouter_integration,
+                demographics=compiled_persona["demographics"],
+            )
+            self.abilities = AbilitiesAndKnowledge.from_features(
+                abilities_knowledge, compiled_persona["abilities"]
+            )
+            self.mood = MoodAndEmotions.from_features(
+                mood_emotions, compiled_persona["mood"]
+            )
+        else:
+            self.facets = FacetsOfPersonality(
+                description=facets_of_personality, llm=self.openrouter_integration
+            )
+            self.abilities = AbilitiesAndKnowledge(abilities_knowledge)
+            self.mood = MoodAndEmotions(mood_emotions)
+        if mood_store is not None:
+            self.mood.attach_store(mood_store)
 
         # Store profile image path
         self.profile_image_path = profile_image_path or os.getenv("PROFILE_IMAGE_PATH")
 
+        # Publish to X unless a local sink is selected
+        publisher = publisher or os.getenv("FAME_PUBLISHER", "x")
+
         # Initialize Twitter integration with credentials from env
-        self.twitter_integration = TwitterIntegration(
-            consumer_key=os.getenv("X_CONSUMER_KEY"),
-            consumer_secret=os.getenv("X_CONSUMER_SECRET"),
-            access_token=os.getenv("X_ACCESS_TOKEN"),
-            access_token_secret=os.getenv("X_ACCESS_TOKEN_SECRET"),
+        if twitter_integration is None and publisher == "x":
+            twitter_integration = TwitterIntegration(
+                consumer_key=os.getenv("X_CONSUMER_KEY"),
+                consumer_secret=os.getenv("X_CONSUMER_SECRET"),
+                access_token=os.getenv("X_ACCESS_TOKEN"),
+                access_token_secret=os.getenv("X_ACCESS_TOKEN_SECRET"),
+                media_cache=MediaCache(resolve_data_path("media_cache.db")),
+            )
+        # None when posting to a local sink without an account client
+        self.twitter_integration = twitter_integration
+        self.name = (
+            name or getattr(self.twitter_integration, "account_id", None) or "default"
         )
 
+        if publisher == "x":
+            publisher = self.twitter_integration
+        elif isinstance(publisher, str):
+            sinks = {"sqlite": "published.db", "jsonl": "published.jsonl"}
+            # Personas share the sink's file but keep their own timeline
+            options = {"account_id": self.name}
+            if publisher in sinks:
+                options["path"] = resolve_data_path(sinks[publisher])
+            publisher = create_publisher(publisher, **options)
+        self.publisher = publisher
+
         # Initialize other integrations
         self.replicate_integration = ReplicateIntegration(
             api_key=os.getenv("REPLICATE_API_KEY")
@@ -59,12 +176,109 @@ class Agent:
 
         # Initialize utilities
         self.tweet_validator = TweetValidator()
+        if duplicate_index is None:
+            account = self.publisher.account_id or "default"
+            # Local sinks are named after the persona, so keep their indexes
+            # apart from those of real X accounts
+            directory = (
+                ("duplicates",)
+                if isinstance(self.publisher, TwitterIntegration)
+                else ("duplicates", "local")
+            )
+            duplicate_index = NearDuplicateIndex(
+                resolve_data_path(*directory, f"{account}.idx")
+            )
+        self.duplicate_index = duplicate_index
+        self.post_history = post_history or PostHistory(resolve_data_path("history.db"))
+        self.outbox = outbox or Outbox(resolve_data_path("outbox.db"))
+        self.content_buffer = content_buffer or ContentBuffer(
+            resolve_data_path("content_buffer.db")
+        )
+        # Generated scene descriptions not used by an image yet
+        self.scene_pool: Deque[str] = deque()
+        # Notified whenever a streamed scene lands in the pool or the stream ends
+        self._scene_ready = threading.Condition()
+        self._scenes_streaming = False
+        # Local check for a usable face before paying for a face swap; None
+        # without OpenCV, in which case every image is swapped
+        self.face_detector = get_face_detector()
+        self._face_checked_profile: Optional[str] = None
 
         # Set up environment execution
         self.environment = environment_execution
 
-    def post_tweet(self, instruction: str) -> Dict[str, Any]:
-        """Post a text-only tweet based on the given instruction."""
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: Union[str, PersonaSnapshot],
+        name: str,
+        env_file: str,
+        environment_execution: Optional[list] = None,
+        profile_image_path: Optional[str] = None,
+        mood_store: Optional[MoodStore] = None,
+        twitter_integration: Optional[TwitterIntegration] = None,
+        publisher: Union[str, Any, None] = None,
+    ) -> "Agent":
+        """
+        Create an agent from a precompiled persona snapshot.
+
+        Args:
+            snapshot: Snapshot path or an open PersonaSnapshot (share one
+                open snapshot when creating many agents)
+            name: Name of the persona in the snapshot
+            env_file: Path to the .env file with API keys
+            environment_execution: Scheduling configuration
+            profile_image_path: Overrides the snapshot's profile image path
+            mood_store: Shared MoodStore for the agent's mood
+            twitter_integration: The account's client from a TwitterAccountPool
+            publisher: Where posts go (see __init__)
+        """
+        if isinstance(snapshot, str):
+            with PersonaSnapshot(snapshot) as opened:
+                persona = opened.get(name)
+        else:
+            persona = snapshot.get(name)
+
+        return cls(
+            env_file=env_file,
+            facets_of_personality=persona["facets_of_personality"],
+            abilities_knowledge=persona["abilities_knowledge"],
+            mood_emotions=persona["mood_emotions"],
+            environment_execution=environment_execution or [],
+            profile_image_path=profile_image_path or persona["profile_image_path"],
+            compiled_persona=persona,
+            mood_store=mood_store,
+            name=name,
+            twitter_integration=twitter_integration,
+            publisher=publisher,
+        )
+
+    def post_tweet(
+        self, instruction: str, deadline: Union[Deadline, float, None] = None
+    ) -> Dict[str, Any]:
+        """
+        Post a text-only tweet based on the given instruction.
+
+        deadline is a latency budget in seconds (or a Deadline) for
+        generating the tweet; each LLM call's timeout and retries are fitted
+        into what is left of it.
+        """
+        if self.openrouter_integration.breaker.is_open:
+            return self._post_without_llm("text")
+
+        content = self._compose_tweet(instruction, deadline)
+        if content["status"] != "ready":
+            return content
+
+        print("\nPosting tweet...")
+        # Post the tweet
+        return self._publish_content(content)
+
+    def _compose_tweet(
+        self, instruction: str, deadline: Union[Deadline, float, None] = None
+    ) -> Dict[str, Any]:
+        """Generate a text tweet without posting it; see _ready_content()."""
+        deadline = Deadline.coerce(deadline)
         try:
             print("\nGenerating tweet content from instruction...")
 
@@ -91,14 +305,12 @@ class Agent:
             )
 
             print("\nGenerating tweet text using OpenRouter...")
-            # Generate tweet text
-            tweet_text = self.openrouter_integration.generate_text(prompt=prompt)
+            # Generate tweet text, leaving time for a shorter retry
+            tweet_text = self.openrouter_integration.generate_text(
+                prompt=prompt, deadline=deadline.child(0.6), task="tweet"
+            )
             if not tweet_text:
-                print("Failed to generate tweet text")
-                return {
-                    "status": "failed",
-                    "message": "Failed to generate tweet text",
-                }
+                return self._failed("Failed to generate tweet text", deadline)
 
             print(f"\nGenerated tweet text: {tweet_text}")
 
@@ -120,7 +332,7 @@ class Agent:
                 )
 
                 tweet_text = self.openrouter_integration.generate_text(
-                    prompt=shorter_prompt
+                    prompt=shorter_prompt, deadline=deadline, task="tweet"
                 )
                 if tweet_text:
                     cleaned_tweet = self.tweet_validator.clean_tweet_text(tweet_text)
@@ -135,12 +347,15 @@ class Agent:
                     "message": f"Tweet validation failed: {validation_details}",
                 }
 
-            print("\nPosting tweet...")
-            # Post the tweet
-            result = self.twitter_integration.post_tweet(cleaned_tweet)
-            print(f"Twitter API response: {result}")
+            cleaned_tweet = self._avoid_duplicate(cleaned_tweet, prompt, deadline)
+            if not cleaned_tweet:
+                return self._duplicate_result()
 
-            return result
+            return self._ready_content(
+                cleaned_tweet,
+                prompt=instruction,
+                model=self.openrouter_integration.model_id("tweet"),
+            )
 
         except Exception as e:
             print(f"Error in post_tweet: {str(e)}")
@@ -149,6 +364,402 @@ class Agent:
                 "message": f"Error posting tweet: {str(e)}",
             }
 
+    def post_thread(self, instruction: str, max_tweets: int = 5) -> Dict[str, Any]:
+        """
+        Post a thread of tweets planned in one LLM call.
+
+        The plan is streamed; each tweet is cleaned, validated (and split if
+        too long) as soon as it is complete and handed to a publisher thread
+        that posts it as a reply to the previous one. Generation and posting
+        overlap instead of alternating.
+
+        Returns:
+            Result dict with the root "tweet_id" and all "tweet_ids" posted
+        """
+        try:
+            personality = self.facets.get_personality_context()
+            abilities = self.abilities.get_knowledge_context()
+            mood = self.mood.get_mood_context()
+            prompt = (
+                f"You are a social media personality with these traits:\n"
+                f"- Personality: {personality}\n"
+                f"- Knowledge & Abilities: {abilities}\n"
+                f"- Current Mood: {mood}\n\n"
+                f"Write a Twitter thread following this instruction:\n{instruction}\n\n"
+                f"Requirements:\n"
+                f"1. At most {max_tweets} tweets\n"
+                f"2. Each tweet MUST be under 280 characters\n"
+                f"3. The first tweet must make sense on its own and hook the reader\n"
+                f"4. Be engaging and authentic to your personality\n"
+                f"5. Use hashtags only in the last tweet\n"
+                f"6. Put a line containing only --- between tweets\n\n"
+                f"Write only the tweets, with no numbering and no commentary."
+            )
+
+            parts: queue.Queue = queue.Queue()
+            results: List[Dict[str, Any]] = []
+
+            def publish_parts():
+                in_reply_to = None
+                while True:
+                    part = parts.get()
+                    if part is None:
+                        return
+                    result = self._publish(
+                        part,
+                        in_reply_to=in_reply_to,
+                        model=self.openrouter_integration.model_id(),
+                    )
+                    results.append(result)
+                    if result.get("status") != "success":
+                        return
+                    in_reply_to = result["tweet_id"]
+
+            print("\nGenerating thread...")
+            queued = 0
+            stream_error = None
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                publisher = pool.submit(publish_parts)
+                try:
+                    for part in self._thread_parts(prompt):
+                        if queued == 0 and self.duplicate_index.is_duplicate(part):
+                            return self._duplicate_result()
+                        # Stop generating once the publisher has given up
+                        if publisher.done() or queued == max_tweets:
+                            break
+                        print(f"\nQueueing thread tweet {queued + 1}: {part}")
+                        parts.put(part)
+                        queued += 1
+                except Exception as e:
+                    # Tweets may be out already; report them rather than lose them
+                    print(f"Thread generation failed: {str(e)}")
+                    stream_error = f"Thread generation failed: {str(e)}"
+                finally:
+                    parts.put(None)
+                publisher.result()
+
+            tweet_ids = [r["tweet_id"] for r in results if r.get("status") == "success"]
+            if not results:
+                return {
+                    "status": "failed",
+                    "message": stream_error or "Failed to generate thread",
+                }
+            if stream_error or len(tweet_ids) < len(results) or len(tweet_ids) < queued:
+                # A failed post stops the thread before generation can fail
+                reason = (
+                    stream_error
+                    if stream_error and len(tweet_ids) == len(results)
+                    else results[-1].get("message")
+                )
+                return {
+                    "status": "failed",
+                    "message": f"Thread stopped after {len(tweet_ids)} tweets: {reason}",
+                    "tweet_id": tweet_ids[0] if tweet_ids else None,
+                    "tweet_ids": tweet_ids,
+                }
+            return {
+                "status": "success",
+                "message": f"Thread of {len(tweet_ids)} tweets posted successfully",
+                "tweet_id": tweet_ids[0],
+                "tweet_ids": tweet_ids,
+            }
+
+        except Exception as e:
+            print(f"Error posting thread: {str(e)}")
+            return {
+                "status": "failed",
+                "message": f"Error posting thread: {str(e)}",
+            }
+
+    def _thread_parts(self, prompt: str) -> Iterator[str]:
+        """Yield postable tweets from a streamed thread plan as each completes."""
+        buffer = ""
+        for delta in self.openrouter_integration.stream_text(prompt=prompt):
+            buffer += delta
+            *complete, buffer = THREAD_DELIMITER.split(buffer)
+            for text in complete:
+                yield from self._prepare_thread_part(text)
+        yield from self._prepare_thread_part(buffer)
+
+    def _prepare_thread_part(self, text: str) -> List[str]:
+        """Clean one planned tweet and split it if it does not fit."""
+        text = self.tweet_validator.clean_tweet_text(text.strip().strip("-"))
+        prepared = []
+        for part in self.tweet_validator.split_tweet(text):
+            is_valid, validation_details = self.tweet_validator.validate_tweet(part)
+            if is_valid:
+                prepared.append(part)
+            else:
+                print(f"Skipping thread tweet: {validation_details}")
+        return prepared
+
+    def _avoid_duplicate(
+        self,
+        tweet: str,
+        prompt: str,
+        deadline: Optional[Deadline] = None,
+        task: str = "tweet",
+    ) -> Optional[str]:
+        """
+        Return the tweet, or a regenerated one if it repeats an earlier post.
+
+        Returns None when the regenerated tweet is still a near-duplicate or
+        fails validation.
+        """
+        if not self.duplicate_index.is_duplicate(tweet):
+            return tweet
+
+        print("\nTweet is too similar to an earlier post, regenerating...")
+        tweet_text = self.openrouter_integration.generate_text(
+            prompt=(
+                f"{prompt}\n\n"
+                f"IMPORTANT: You have already posted something very similar to:\n"
+                f"{tweet}\n"
+                f"Take a different angle and use different wording."
+            ),
+            deadline=deadline,
+            task=task,
+        )
+        if not tweet_text:
+            return None
+
+        tweet = self.tweet_validator.clean_tweet_text(tweet_text)
+        is_valid, _ = self.tweet_validator.validate_tweet(tweet)
+        if not is_valid or self.duplicate_index.is_duplicate(tweet):
+            return None
+        return tweet
+
+    @staticmethod
+    def _failed(message: str, deadline: Deadline) -> Dict[str, Any]:
+        """Failed result, saying so when the deadline was the cause."""
+        if deadline.expired():
+            message = f"{message}: deadline exceeded"
+        print(message)
+        return {
+            "status": "failed",
+            "message": message,
+        }
+
+    def _duplicate_result(self) -> Dict[str, Any]:
+        """Result returned when a tweet is skipped as a near-duplicate."""
+        print("Skipping tweet: near-duplicate of an earlier post")
+        return {
+            "status": "skipped",
+            "message": "Tweet is a near-duplicate of an earlier post",
+        }
+
+    @staticmethod
+    def _ready_content(
+        text: str, media_paths: Optional[List[str]] = None, **details
+    ) -> Dict[str, Any]:
+        """Result of composing a post that is ready to publish."""
+        return {
+            "status": "ready",
+            "message": "Post is ready to publish",
+            "text": text,
+            "media_paths": media_paths or [],
+            "details": details,
+        }
+
+    def _publish_content(self, content: Dict[str, Any]) -> Dict[str, Any]:
+        """Publish a post returned by _ready_content() or the content buffer."""
+        return self._publish(
+            content["text"], media_paths=content["media_paths"], **content["details"]
+        )
+
+    def _publish(
+        self,
+        text: str,
+        media_paths: Optional[List[str]] = None,
+        in_reply_to: Optional[str] = None,
+        **details,
+    ) -> Dict[str, Any]:
+        """Persist a post in the outbox, then publish it."""
+        media_paths = media_paths or []
+        if len(media_paths) > 1:
+            kind = "gallery"
+        else:
+            kind = "image" if media_paths else "text"
+        entry = self.outbox.enqueue(
+            text,
+            persona=self.name,
+            account_id=self.publisher.account_id,
+            kind=kind,
+            media_paths=media_paths,
+            in_reply_to=in_reply_to,
+            details=details,
+        )
+        return self._deliver(entry)
+
+    def _deliver(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one publish attempt for an outbox entry."""
+        key = entry["key"]
+        if not self.outbox.begin(key):
+            return {
+                "status": "skipped",
+                "message": f"Outbox entry {key} is already being published",
+            }
+
+        if entry["media_paths"]:
+            result = self.publisher.post_tweet_with_media(
+                text=entry["text"], media_path=entry["media_paths"]
+            )
+        else:
+            result = self.publisher.post_tweet(
+                entry["text"], in_reply_to=entry["in_reply_to"]
+            )
+        print(f"Publisher response: {result}")
+
+        if result.get("status") == "success":
+            self.outbox.complete(key, result["tweet_id"], result.get("media_id"))
+            self._record_entry(entry, result)
+        elif result.get("in_doubt"):
+            # X may have accepted it; only reconciliation may retry it
+            self.outbox.mark_in_doubt(key, result["message"])
+        else:
+            self.outbox.fail(
+                key, result["message"], retry=result.get("retryable", False)
+            )
+
+        result["outbox_key"] = key
+        return result
+
+    def _record_entry(self, entry: Dict[str, Any], result: Dict[str, Any]):
+        """Record a published outbox entry."""
+        details = dict(entry["details"])
+        media_paths = entry["media_paths"]
+        if len(media_paths) > 1:
+            details["extra"] = {
+                **details.get("extra", {}),
+                "image_paths": media_paths,
+                "media_ids": result.get("media_ids"),
+            }
+        self._record_post(
+            entry["text"],
+            result,
+            kind=entry["kind"],
+            in_reply_to=entry["in_reply_to"],
+            image_path=media_paths[0] if media_paths else None,
+            **details,
+        )
+
+    def reconcile_outbox(self, min_age: float = 60.0) -> Dict[str, Any]:
+        """
+        Resolve posts whose publish outcome is unknown, e.g. after a crash.
+
+        Each in-doubt entry is looked up in the account's recent timeline:
+        if it is there it is marked published, otherwise it goes back to
+        pending so it can be retried.
+
+        Args:
+            min_age: Skip attempts younger than this many seconds, which
+                may still be running in another process
+        """
+        cutoff = datetime.now().timestamp() - min_age
+        entries = [
+            entry
+            for entry in self.outbox.in_doubt(persona=self.name)
+            if entry["updated_at"] < cutoff
+        ]
+        if not entries:
+            return {
+                "status": "success",
+                "message": "Nothing to reconcile",
+                "published": 0,
+                "released": 0,
+            }
+
+        timeline = self.publisher.get_recent_tweets(max_results=100)
+        if timeline["status"] != "success":
+            return timeline
+
+        published = released = 0
+        matched = set()
+        for entry in entries:
+            match = self._find_published(entry, timeline["tweets"], matched)
+            if match:
+                matched.add(match["id"])
+                self.outbox.complete(entry["key"], match["id"])
+                self._record_entry(
+                    entry, {"status": "success", "tweet_id": match["id"]}
+                )
+                published += 1
+            else:
+                self.outbox.release(entry["key"])
+                released += 1
+
+        print(f"Reconciled outbox: {published} published, {released} to retry")
+        return {
+            "status": "success",
+            "message": f"Reconciled {len(entries)} outbox entries",
+            "published": published,
+            "released": released,
+        }
+
+    @staticmethod
+    def _find_published(
+        entry: Dict[str, Any], tweets: List[Dict[str, Any]], matched: set
+    ) -> Optional[Dict[str, Any]]:
+        """Return the timeline post most similar to an outbox entry, if any."""
+        text = normalize_text(entry["text"])
+        best, best_ratio = None, RECONCILE_SIMILARITY
+        for tweet in tweets:
+            if tweet["id"] in matched:
+                continue
+            created_at = tweet["created_at"]
+            if (
+                created_at is not None
+                and created_at.timestamp() < entry["created_at"] - RECONCILE_SKEW
+            ):
+                continue
+            ratio = difflib.SequenceMatcher(
+                None, text, normalize_text(tweet["text"])
+            ).ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = tweet, ratio
+        return best
+
+    def retry_outbox(self, max_attempts: int = 5) -> List[Dict[str, Any]]:
+        """
+        Reconcile in-doubt posts, then publish every pending one.
+
+        Call this at startup so posts interrupted by a crash are completed
+        exactly once. Entries that reach max_attempts are marked failed.
+        """
+        reconciled = self.reconcile_outbox()
+        if reconciled["status"] != "success":
+            print(f"Outbox reconciliation failed: {reconciled['message']}")
+
+        results = []
+        for entry in self.outbox.entries(PENDING, persona=self.name):
+            if entry["attempts"] >= max_attempts:
+                self.outbox.abandon(entry["key"], "Too many publish attempts")
+                continue
+            results.append(self._deliver(entry))
+        return results
+
+    def _record_post(self, tweet: str, result: Dict[str, Any], **details):
+        """Add a published tweet to the duplicate index and post history."""
+        if result.get("status") != "success":
+            return
+
+        self.duplicate_index.add(tweet)
+        mood = self.mood.get_mood_context()
+        try:
+            self.post_history.record(
+                tweet,
+                persona=self.name,
+                account_id=self.publisher.account_id,
+                tweet_id=result.get("tweet_id"),
+                media_id=result.get("media_id"),
+                mood=mood["current_mood"],
+                mood_intensity=mood["mood_intensity"],
+                **details,
+            )
+        except Exception as e:
+            # The tweet is already live; never report it as failed
+            print(f"Error recording post history: {str(e)}")
+
     def _generate_base_image_prompt(self, for_face_swap: bool = False) -> str:
         """Generate a base image prompt based on personality."""
         try:
@@ -187,66 +798,122 @@ class Agent:
             )
 
             # Generate the scenes using LLM
-            scenes_json = self.openrouter_integration.generate_text(prompt=scene_prompt)
+            scenes_json = self.openrouter_integration.generate_text(
+                prompt=scene_prompt, task="scenes"
+            )
             if not scenes_json:
                 print("No response from LLM")
                 return ""
 
-            try:
-                # Clean the response
-                cleaned_json = scenes_json.strip()
-                if not cleaned_json.startswith("["):
-                    # Try to find the JSON array
-                    import re
-
-                    match = re.search(r"\[(.*?)\]", cleaned_json, re.DOTALL)
-                    if match:
-                        cleaned_json = match.group(0)
-                    else:
-                        print("Could not find JSON array in response")
-                        return ""
-
-                # Parse JSON array
-                import json
-
-                scenes = json.loads(cleaned_json)
-
-                if not isinstance(scenes, list) or len(scenes) == 0:
-                    print("Invalid scenes format or empty list")
-                    return ""
-
-                # Randomly select one scene
-                import random
-
-                selected_scene = random.choice(scenes)
-
-                print(f"\nSelected scene from {len(scenes)} options: {selected_scene}")
-
-                # Add technical notes for face swapping and photography
-                if for_face_swap:
-                    selected_scene += (
-                        "\n\nPhotography setup: Shot with a professional DSLR camera, 85mm portrait lens at f/2.8. "
-                        "Natural window lighting from the front-left, supplemented with a soft fill light. "
-                        "Camera positioned at eye level, subject's face at 3/4 angle. "
-                        "Sharp focus on facial features, subtle background blur. "
-                        "High-end color grading, ultra-realistic photographic style, 4K resolution. "
-                        "Absolutely no artistic filters, no anime style, no illustration effects. "
-                        "This must look like a professional photograph taken with high-end equipment."
-                    )
-
-                return selected_scene
-
-            except json.JSONDecodeError as e:
-                print(f"Failed to parse scenes JSON: {str(e)}")
+            scenes = [
+                scene
+                for scene in parse_json_array(scenes_json)
+                if isinstance(scene, str)
+            ]
+            if not scenes:
+                print("Could not find scenes in response")
                 print(f"Raw response: {scenes_json}")
                 return ""
 
+            # Randomly select one scene
+            import random
+
+            selected_scene = random.choice(scenes)
+
+            print(f"\nSelected scene from {len(scenes)} options: {selected_scene}")
+
+            # Add technical notes for face swapping and photography
+            if for_face_swap:
+                selected_scene += (
+                    "\n\nPhotography setup: Shot with a professional DSLR camera, 85mm portrait lens at f/2.8. "
+                    "Natural window lighting from the front-left, supplemented with a soft fill light. "
+                    "Camera positioned at eye level, subject's face at 3/4 angle. "
+                    "Sharp focus on facial features, subtle background blur. "
+                    "High-end color grading, ultra-realistic photographic style, 4K resolution. "
+                    "Absolutely no artistic filters, no anime style, no illustration effects. "
+                    "This must look like a professional photograph taken with high-end equipment."
+                )
+
+            return selected_scene
+
         except Exception as e:
             print(f"Error generating base image prompt: {str(e)}")
             return ""
 
-    def _generate_image_prompt(self, for_face_swap: bool = False) -> str:
+    def _generate_image_prompt(
+        self, for_face_swap: bool = False, deadline: Optional[Deadline] = None
+    ) -> str:
         """Generate a prompt for image generation."""
+        scenes = self._take_scenes(1, for_face_swap=for_face_swap, deadline=deadline)
+        if not scenes:
+            return ""
+
+        print(f"\nSelected scene: {scenes[0]}")
+        return scenes[0]
+
+    def _take_scenes(
+        self,
+        count: int,
+        for_face_swap: bool = False,
+        deadline: Optional[Deadline] = None,
+    ) -> List[str]:
+        """
+        Take distinct scenes from the scene pool.
+
+        One LLM call yields ten scenes; the unused ones are kept for later
+        image posts, and the LLM is only asked again when the pool runs low.
+        The scenes are streamed into the pool, so a caller gets its scenes as
+        soon as they are written instead of waiting for all ten. Returns
+        fewer than count scenes if the LLM fails.
+        """
+        deadline = deadline or Deadline()
+        taken: List[str] = []
+        requested = False
+        with self._scene_ready:
+            while True:
+                while self.scene_pool and len(taken) < count:
+                    taken.append(self.scene_pool.popleft())
+                if len(taken) == count or deadline.expired():
+                    break
+                if not self._scenes_streaming:
+                    if requested:
+                        # Our stream ended without enough scenes
+                        break
+                    self._scenes_streaming = True
+                    threading.Thread(
+                        target=self._stream_scenes_into_pool,
+                        args=(deadline,),
+                        daemon=True,
+                    ).start()
+                    requested = True
+                self._scene_ready.wait(timeout=deadline.remaining())
+        if for_face_swap:
+            taken = [scene + FACE_SWAP_PHOTO_NOTES for scene in taken]
+        return taken
+
+    def _stream_scenes_into_pool(self, deadline: Deadline):
+        """Add scenes to the pool as the LLM writes them, waking waiting takers."""
+        try:
+            for scene in self._stream_scenes(deadline):
+                with self._scene_ready:
+                    # Mix new scenes in with the ones still pooled
+                    position = random.randint(0, len(self.scene_pool))
+                    self.scene_pool.insert(position, scene)
+                    self._scene_ready.notify_all()
+        finally:
+            with self._scene_ready:
+                self._scenes_streaming = False
+                self._scene_ready.notify_all()
+
+    def _stream_scenes(self, deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """
+        Yield candidate photo scene descriptions as each one is complete.
+
+        Elements of the LLM's JSON array that are malformed are skipped; the
+        valid ones around them are kept.
+        """
+        parser = JSONArrayParser()
+        found = 0
         try:
             # Get personality context
             personality = self.facets.get_personality_context()
@@ -276,168 +943,694 @@ class Agent:
                 f"Ensure the output is a properly formatted JSON array. No additional text or explanation."
             )
 
-            # Get scenes from LLM
-            scenes_json = self.openrouter_integration.generate_text(prompt=scene_prompt)
-            if not scenes_json:
-                print("No response from LLM")
-                return ""
+            # Parse the scenes out of the response while it streams
+            chunks = self.openrouter_integration.stream_text(
+                prompt=scene_prompt, deadline=deadline, task="scenes"
+            )
+            for scene in parser.parse(chunks):
+                if isinstance(scene, str) and scene.strip():
+                    found += 1
+                    yield scene.strip()
 
-            try:
-                # Clean the response
-                cleaned_json = scenes_json.strip()
-                if not cleaned_json.startswith("["):
-                    # Try to find the JSON array
-                    import re
-
-                    match = re.search(r"\[(.*?)\]", cleaned_json, re.DOTALL)
-                    if match:
-                        cleaned_json = match.group(0)
-                    else:
-                        print("Could not find JSON array in response")
-                        return ""
-
-                # Parse JSON array
-                import json
-
-                scenes = json.loads(cleaned_json)
-
-                if not isinstance(scenes, list) or len(scenes) == 0:
-                    print("Invalid scenes format or empty list")
-                    return ""
-
-                # Randomly select one scene
-                import random
-
-                selected_scene = random.choice(scenes)
-
-                print(f"\nSelected scene from {len(scenes)} options: {selected_scene}")
-
-                # Add technical notes for face swapping and photography
-                if for_face_swap:
-                    selected_scene += (
-                        "\n\nPhotography setup: Shot with a professional DSLR camera, 85mm portrait lens at f/2.8. "
-                        "Natural window lighting from the front-left, supplemented with a soft fill light. "
-                        "Camera positioned at eye level, subject's face at 3/4 angle. "
-                        "Sharp focus on facial features, subtle background blur. "
-                        "High-end color grading, ultra-realistic photographic style, 4K resolution. "
-                        "Absolutely no artistic filters, no anime style, no illustration effects. "
-                        "This must look like a professional photograph taken with high-end equipment."
-                    )
+        except Exception as e:
+            print(f"Error generating scenes: {str(e)}")
 
-                return selected_scene
+        if parser.errors:
+            print(f"Skipped {parser.errors} malformed scenes")
+        if not found:
+            print("No scenes found in LLM response")
 
-            except json.JSONDecodeError as e:
-                print(f"Failed to parse scenes JSON: {str(e)}")
-                print(f"Raw response: {scenes_json}")
-                return ""
+    def post_image_tweet(
+        self,
+        prompt: str = "",
+        tweet_text: str = "",
+        use_face_swap: bool = False,
+        deadline: Union[Deadline, float, None] = None,
+    ) -> Dict[str, Any]:
+        """
+        Generate and post a tweet with an image.
 
-        except Exception as e:
-            print(f"Error generating image prompt: {str(e)}")
-            return ""
+        While image generation is unavailable a text tweet is posted
+        instead; while the LLM is unavailable and a caption would be needed,
+        a buffered post is published, if there is one.
 
-    def post_image_tweet(
-        self, prompt: str = "", tweet_text: str = "", use_face_swap: bool = False
+        deadline is a latency budget in seconds (or a Deadline) for
+        generating the post. It is split across the scene, image, face swap
+        and caption stages; an image still rendering when its share runs
+        out is cancelled.
+        """
+        if self.replicate_integration.breaker.is_open:
+            return self._post_text_instead(prompt, tweet_text, deadline)
+        if self.openrouter_integration.breaker.is_open and not tweet_text:
+            return self._post_without_llm("image")
+
+        content = self._compose_image_tweet(prompt, tweet_text, use_face_swap, deadline)
+        if content["status"] != "ready":
+            return content
+
+        print("\nPosting tweet with image...")
+        # Post tweet with image using post_tweet_with_media
+        return self._publish_content(content)
+
+    def _post_text_instead(
+        self,
+        scene: str,
+        tweet_text: str,
+        deadline: Union[Deadline, float, None] = None,
     ) -> Dict[str, Any]:
-        """Generate and post a tweet with an image."""
+        """Degrade an image tweet to a text tweet."""
+        print(f"\n{self.replicate_integration.breaker.open_message()}")
+        print("Posting a text tweet instead...")
+        if not tweet_text:
+            instruction = "Share what you are up to right now"
+            if scene:
+                instruction = f"Share a thought about this moment: {scene}"
+            result = self.post_tweet(instruction, deadline)
+        else:
+            cleaned_tweet = self._finalize_caption(tweet_text, "")
+            if isinstance(cleaned_tweet, dict):
+                return cleaned_tweet
+            result = self._publish(cleaned_tweet)
+        result["degraded"] = "text"
+        return result
+
+    def _post_without_llm(self, kind: str) -> Dict[str, Any]:
+        """Publish a buffered post while the LLM is unavailable, or fail fast."""
+        message = self.openrouter_integration.breaker.open_message()
+        print(f"\n{message}")
+        result = self.post_buffered(kind=kind, generate_if_empty=False)
+        if result["status"] == "skipped":
+            return {
+                "status": "failed",
+                "message": message,
+            }
+        result["degraded"] = "buffered"
+        return result
+
+    def _compose_image_tweet(
+        self,
+        prompt: str = "",
+        tweet_text: str = "",
+        use_face_swap: bool = False,
+        deadline: Union[Deadline, float, None] = None,
+        tier: str = "final",
+    ) -> Dict[str, Any]:
+        """
+        Generate an image tweet without posting it; see _ready_content().
+
+        A "preview" tier image is a draft: see _finalize_draft().
+        """
+        deadline = Deadline.coerce(deadline)
         try:
             # Verify face swap requirements
-            if use_face_swap:
-                if not self.profile_image_path:
-                    return {
-                        "status": "failed",
-                        "message": "Face swap requested but no profile image path provided",
-                    }
-                if not os.path.exists(self.profile_image_path):
-                    return {
-                        "status": "failed",
-                        "message": f"Profile image not found at: {self.profile_image_path}",
-                    }
-                print(f"\nUsing profile image for face swap: {self.profile_image_path}")
+            error = self._check_face_swap(use_face_swap)
+            if error:
+                return error
+
+            # Skip before paying for an image if the given text was posted
+            if tweet_text and self.duplicate_index.is_duplicate(
+                self.tweet_validator.clean_tweet_text(tweet_text)
+            ):
+                return self._duplicate_result()
 
             # Generate image prompt if not provided
             if not prompt:
-                prompt = self._generate_image_prompt(for_face_swap=use_face_swap)
+                prompt = self._generate_image_prompt(
+                    for_face_swap=use_face_swap,
+                    deadline=deadline.child(SCENE_BUDGET_SHARE),
+                )
                 if not prompt:
-                    return {
-                        "status": "failed",
-                        "message": "Failed to generate image prompt",
-                    }
+                    return self._failed("Failed to generate image prompt", deadline)
 
             # Generate image
-            print("\nGenerating image...")
-            image_path = self.replicate_integration.generate_image(prompt=prompt)
+            image_path, seed = self._render_image(
+                prompt, use_face_swap, deadline.child(RENDER_BUDGET_SHARE), tier=tier
+            )
             if not image_path:
-                return {
-                    "status": "failed",
-                    "message": "Failed to generate image",
-                }
-
-            # Apply face swap with better logging
-            if use_face_swap and self.profile_image_path:
-                print("\nApplying face swap...")
-                print(f"Base image: {image_path}")
-                print(f"Face image: {self.profile_image_path}")
-                swapped_image = self.replicate_integration.face_swap(
-                    base_image_path=image_path, face_image_path=self.profile_image_path
-                )
-                if swapped_image:
-                    print(f"Face swap successful, new image: {swapped_image}")
-                    image_path = swapped_image
-                else:
-                    print("Face swap failed, using original image")
-                    print("Check if both images are valid and face is clearly visible")
+                return self._failed("Failed to generate image", deadline)
 
             # Generate tweet text if not provided
+            tweet_prompt = ""
             if not tweet_text:
                 print("\nGenerating tweet text...")
-                personality = self.facets.get_personality_context()
-                tweet_prompt = (
-                    f"Write a tweet from the first-person perspective of someone with this personality:\n"
-                    f"{personality}\n\n"
-                    f"They are posting about this image: {prompt}\n\n"
-                    f"Requirements:\n"
-                    f"1. Write in their authentic voice\n"
-                    f"2. Include 1-2 relevant emojis\n"
-                    f"3. Add 1-2 relevant hashtags\n"
-                    f"4. Keep it under 280 characters\n"
-                    f"5. Make it personal and genuine\n"
-                    f"6. Write as if they took the photo themselves\n\n"
-                    f"Write only the tweet, no commentary."
+                tweet_prompt = self._caption_prompt(
+                    f"They are posting about this image: {prompt}"
                 )
                 tweet_text = self.openrouter_integration.generate_text(
-                    prompt=tweet_prompt
+                    prompt=tweet_prompt, deadline=deadline, task="caption"
                 )
                 if not tweet_text:
+                    return self._failed("Failed to generate tweet text", deadline)
+
+            cleaned_tweet = self._finalize_caption(tweet_text, tweet_prompt, deadline)
+            if isinstance(cleaned_tweet, dict):
+                return cleaned_tweet
+
+            return self._ready_content(
+                cleaned_tweet,
+                media_paths=[image_path],
+                prompt=tweet_prompt or None,
+                model=self._caption_model(tweet_prompt),
+                scene=prompt,
+                extra={"seed": seed, "image_tier": tier, "face_swap": use_face_swap},
+            )
+
+        except Exception as e:
+            print(f"Error posting image tweet: {str(e)}")
+            return {
+                "status": "failed",
+                "message": f"Error posting image tweet: {str(e)}",
+            }
+
+    def content_fingerprint(self) -> str:
+        """Identify the persona and mood that buffered content is valid for."""
+        state = "\0".join(
+            [
+                self.facets.description,
+                self.abilities.raw_description,
+                self.mood.get_mood_context()["current_mood"],
+            ]
+        )
+        return hashlib.sha256(state.encode("utf-8")).hexdigest()[:16]
+
+    def fill_content_buffer(
+        self,
+        count: int = 3,
+        kind: str = "image",
+        instruction: str = "",
+        use_face_swap: bool = False,
+        max_age: float = DEFAULT_MAX_AGE,
+        preview: bool = False,
+        workers: int = BUFFER_WORKERS,
+    ) -> Dict[str, Any]:
+        """
+        Generate posts ahead of time until count are ready to publish.
+
+        Run this when the agent is idle (e.g. shortly before scheduled
+        posts); post_buffered() then only has to publish. Posts generated
+        for an earlier persona or mood are discarded first.
+
+        Args:
+            count: Number of ready posts to keep for this kind
+            kind: "image" or "text"
+            instruction: Instruction for text posts
+            use_face_swap: Swap the profile face into buffered images
+            max_age: Seconds a buffered post stays fresh
+            preview: Buffer image posts as drafts with cheap preview
+                images; they get their final image from finalize_buffered()
+                or when they are posted
+            workers: Posts generated at once
+
+        Returns:
+            Result dict with the number of posts "added" and now "buffered"
+        """
+        if kind == "text" and not instruction:
+            return {
+                "status": "failed",
+                "message": "Buffering text posts needs an instruction",
+            }
+        if kind == "image":
+            error = self._check_face_swap(use_face_swap)
+            if error:
+                return error
+
+        fingerprint = self.content_fingerprint()
+        self.content_buffer.invalidate(self.name, keep=fingerprint)
+        self.content_buffer.prune()
+        missing = count - self.content_buffer.count(self.name, fingerprint, kind)
+        if missing <= 0:
+            return {
+                "status": "success",
+                "message": "Content buffer is full",
+                "added": 0,
+                "buffered": count,
+            }
+
+        print(f"\nPre-generating {missing} {kind} posts...")
+        with ThreadPoolExecutor(max_workers=max(1, min(missing, workers))) as pool:
+            if kind == "text":
+                futures = [
+                    pool.submit(self._compose_tweet, instruction)
+                    for _ in range(missing)
+                ]
+            else:
+                tier = "preview" if preview else "final"
+                futures = [
+                    pool.submit(
+                        self._compose_image_tweet, "", "", use_face_swap, None, tier
+                    )
+                    for _ in range(missing)
+                ]
+            contents = [future.result() for future in futures]
+
+        added = 0
+        for content in contents:
+            if content["status"] != "ready":
+                print(f"Failed to pre-generate post: {content['message']}")
+                continue
+            self.content_buffer.put(
+                content["text"],
+                persona=self.name,
+                fingerprint=fingerprint,
+                kind=kind,
+                media_paths=content["media_paths"],
+                details=content["details"],
+                max_age=max_age,
+            )
+            added += 1
+
+        return {
+            "status": "success" if added else "failed",
+            "message": f"Pre-generated {added} of {missing} {kind} posts",
+            "added": added,
+            "buffered": self.content_buffer.count(self.name, fingerprint, kind),
+        }
+
+    def post_buffered(
+        self,
+        kind: str = "image",
+        instruction: str = "",
+        use_face_swap: bool = False,
+        generate_if_empty: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Publish the oldest fresh post from the content buffer.
+
+        Buffered posts that went stale, lost their image or became
+        near-duplicates in the meantime are dropped. When nothing is ready,
+        the post is generated live unless generate_if_empty is False.
+        """
+        fingerprint = self.content_fingerprint()
+        while True:
+            entry = self.content_buffer.take(self.name, fingerprint, kind)
+            if entry is None:
+                break
+            if not all(os.path.exists(path) for path in entry["media_paths"]):
+                print("Dropping buffered post: media file is missing")
+                delete_media(entry["media_paths"])
+                continue
+            if self.duplicate_index.is_duplicate(entry["text"]):
+                print("Dropping buffered post: near-duplicate of an earlier post")
+                delete_media(entry["media_paths"])
+                continue
+            if self._is_draft(entry):
+                final = self._finalize_draft(entry)
+                if final is None:
+                    # Keep the draft for a later attempt
+                    self.content_buffer.put(
+                        entry["text"],
+                        persona=self.name,
+                        fingerprint=entry["fingerprint"],
+                        kind=entry["kind"],
+                        media_paths=entry["media_paths"],
+                        details=entry["details"],
+                        max_age=entry["expires_at"] - time.time(),
+                    )
                     return {
                         "status": "failed",
-                        "message": "Failed to generate tweet text",
+                        "message": "Failed to render the final image of a draft",
                     }
+                # The preview is replaced by the final image
+                delete_media(
+                    [
+                        path
+                        for path in entry["media_paths"]
+                        if path not in final["media_paths"]
+                    ]
+                )
+                entry = final
+            print(f"\nPosting buffered {kind} post...")
+            return self._publish_content(entry)
 
-            # Clean and validate the tweet
-            cleaned_tweet = self.tweet_validator.clean_tweet_text(tweet_text)
-            is_valid, validation_details = self.tweet_validator.validate_tweet(
-                cleaned_tweet
+        if not generate_if_empty:
+            return {
+                "status": "skipped",
+                "message": "No buffered content is ready",
+            }
+        print("\nContent buffer is empty, generating the post now...")
+        if kind == "text":
+            return self.post_tweet(instruction)
+        return self.post_image_tweet(use_face_swap=use_face_swap)
+
+    def finalize_buffered(self, workers: int = BUFFER_WORKERS) -> Dict[str, Any]:
+        """
+        Render the final images of all buffered drafts.
+
+        Call this once the drafts have been reviewed (rejected ones can be
+        removed with content_buffer.discard()). Each preview is rendered
+        again from the same prompt and seed at full quality, with the face
+        swap. Drafts still in the buffer at posting time are finalized then.
+
+        Args:
+            workers: Drafts rendered at once
+
+        Returns:
+            Result dict with the number of drafts "finalized"
+        """
+        fingerprint = self.content_fingerprint()
+        self.content_buffer.invalidate(self.name, keep=fingerprint)
+        drafts = [
+            entry
+            for entry in self.content_buffer.entries(self.name, kind="image")
+            if self._is_draft(entry)
+        ]
+        if not drafts:
+            return {
+                "status": "success",
+                "message": "No drafts to finalize",
+                "finalized": 0,
+            }
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(drafts), workers))) as pool:
+            finals = list(pool.map(self._finalize_draft, drafts))
+
+        finalized = 0
+        for final in finals:
+            # A draft posted in the meantime is no longer in the buffer
+            if final and self.content_buffer.update(
+                final["key"], final["media_paths"], final["details"]
+            ):
+                finalized += 1
+
+        return {
+            "status": "success" if finalized == len(drafts) else "failed",
+            "message": f"Finalized {finalized} of {len(drafts)} drafts",
+            "finalized": finalized,
+        }
+
+    @staticmethod
+    def _is_draft(entry: Dict[str, Any]) -> bool:
+        """Whether a buffered post still has a preview image."""
+        extra = entry["details"].get("extra") or {}
+        return extra.get("image_tier") == "preview"
+
+    def _finalize_draft(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the draft with its final image, or None if rendering failed."""
+        extra = entry["details"]["extra"]
+        print("\nRendering final image for a draft...")
+        # The seed is kept even if the image shows no face, so the post
+        # matches the approved preview
+        image_path, _ = self._render_image(
+            entry["details"]["scene"],
+            extra.get("face_swap", False),
+            tier="final",
+            seed=extra["seed"],
+        )
+        if not image_path:
+            return None
+        details = {**entry["details"], "extra": {**extra, "image_tier": "final"}}
+        return {**entry, "media_paths": [image_path], "details": details}
+
+    def post_gallery_tweet(
+        self,
+        count: int = 4,
+        tweet_text: str = "",
+        use_face_swap: bool = False,
+        prompts: Optional[List[str]] = None,
+        deadline: Union[Deadline, float, None] = None,
+    ) -> Dict[str, Any]:
+        """
+        Generate and post one tweet with 2-4 images.
+
+        The images (and face swaps) are rendered concurrently while the
+        caption is written, and all media is uploaded in parallel, so the
+        post takes about as long as a single image tweet.
+
+        Args:
+            count: Number of images, 2 to 4
+            tweet_text: Caption; generated from the scenes when empty
+            use_face_swap: Swap the profile face into every image
+            prompts: Image prompts to use instead of generated scenes
+            deadline: Latency budget in seconds (or a Deadline) for
+                generating the post; images still rendering when it runs
+                out are cancelled
+        """
+        if self.replicate_integration.breaker.is_open:
+            scene = prompts[0] if prompts else ""
+            return self._post_text_instead(scene, tweet_text, deadline)
+
+        deadline = Deadline.coerce(deadline)
+        try:
+            scenes = list(prompts or [])
+            if scenes:
+                count = len(scenes)
+            if not 2 <= count <= 4:
+                return {
+                    "status": "failed",
+                    "message": "A gallery tweet needs 2 to 4 images",
+                }
+
+            error = self._check_face_swap(use_face_swap)
+            if error:
+                return error
+
+            if tweet_text and self.duplicate_index.is_duplicate(
+                self.tweet_validator.clean_tweet_text(tweet_text)
+            ):
+                return self._duplicate_result()
+
+            if not scenes:
+                scenes = self._take_scenes(
+                    count,
+                    for_face_swap=use_face_swap,
+                    deadline=deadline.child(SCENE_BUDGET_SHARE),
+                )
+                if len(scenes) < count:
+                    return self._failed("Failed to generate image prompts", deadline)
+
+            tweet_prompt = ""
+            if not tweet_text:
+                described = "\n".join(f"- {scene}" for scene in scenes)
+                tweet_prompt = self._caption_prompt(
+                    f"They are posting a photo set of these scenes:\n{described}"
+                )
+
+            print(f"\nGenerating {count} images...")
+            # Images and caption run side by side, so each may use the
+            # render share of the remaining budget
+            stage_deadline = deadline.child(RENDER_BUDGET_SHARE)
+            with ThreadPoolExecutor(max_workers=count + 1) as pool:
+                renders = [
+                    pool.submit(
+                        self._render_image, scene, use_face_swap, stage_deadline
+                    )
+                    for scene in scenes
+                ]
+                if tweet_prompt:
+                    caption = pool.submit(
+                        self.openrouter_integration.generate_text,
+                        prompt=tweet_prompt,
+                        deadline=stage_deadline,
+                        task="caption",
+                    )
+                    tweet_text = caption.result()
+                results = [render.result()[0] for render in renders]
+
+            # Post whatever rendered, as long as it is still a gallery
+            rendered = [(scene, path) for scene, path in zip(scenes, results) if path]
+            if len(rendered) < 2:
+                return self._failed("Failed to generate images", deadline)
+            if not tweet_text:
+                return self._failed("Failed to generate tweet text", deadline)
+
+            cleaned_tweet = self._finalize_caption(tweet_text, tweet_prompt, deadline)
+            if isinstance(cleaned_tweet, dict):
+                return cleaned_tweet
+
+            print(f"\nPosting tweet with {len(rendered)} images...")
+            return self._publish(
+                cleaned_tweet,
+                media_paths=[path for _, path in rendered],
+                prompt=tweet_prompt or None,
+                model=self._caption_model(tweet_prompt),
+                scene=rendered[0][0],
+                extra={"scenes": [scene for scene, _ in rendered]},
             )
 
-            if not is_valid:
-                print(f"Tweet validation failed: {validation_details}")
+        except Exception as e:
+            print(f"Error posting gallery tweet: {str(e)}")
+            return {
+                "status": "failed",
+                "message": f"Error posting gallery tweet: {str(e)}",
+            }
+
+    def _check_face_swap(self, use_face_swap: bool) -> Optional[Dict[str, Any]]:
+        """Return a failed result if face swap was requested but cannot run."""
+        if not use_face_swap:
+            return None
+        if not self.profile_image_path:
+            return {
+                "status": "failed",
+                "message": "Face swap requested but no profile image path provided",
+            }
+        if not os.path.exists(self.profile_image_path):
+            return {
+                "status": "failed",
+                "message": f"Profile image not found at: {self.profile_image_path}",
+            }
+        if self.face_detector and self._face_checked_profile != self.profile_image_path:
+            try:
+                has_face = self.face_detector.has_face(self.profile_image_path)
+            except Exception as e:
                 return {
                     "status": "failed",
-                    "message": f"Tweet validation failed: {validation_details}",
+                    "message": f"Cannot check profile image for a face: {str(e)}",
                 }
+            if not has_face:
+                return {
+                    "status": "failed",
+                    "message": f"No usable face found in profile image: {self.profile_image_path}",
+                }
+            self._face_checked_profile = self.profile_image_path
+        print(f"\nUsing profile image for face swap: {self.profile_image_path}")
+        return None
+
+    def _render_image(
+        self,
+        prompt: str,
+        use_face_swap: bool,
+        deadline: Optional[Deadline] = None,
+        tier: str = "final",
+        seed: Optional[int] = None,
+    ) -> Tuple[Optional[str], int]:
+        """
+        Generate an image and optionally swap in the profile face.
+
+        Returns the image path (None on failure) and the seed it was
+        rendered with. Before a face swap the image is checked for a usable
+        face locally: without one, new seeds are tried at the cheap preview
+        tier (unless the seed was given) and the image is rendered again
+        from the first that shows a face; otherwise the swap is skipped.
+        Previews skip the face swap; it is done on the final render.
+        """
+        deadline = deadline or Deadline()
+        swap = bool(use_face_swap and self.profile_image_path)
+        keep_seed = seed is not None
+        if seed is None:
+            seed = random.randint(0, MAX_SEED)
 
-            print("\nPosting tweet with image...")
-            # Post tweet with image using post_tweet_with_media
-            result = self.twitter_integration.post_tweet_with_media(
-                text=cleaned_tweet, media_path=image_path
+        def generate(tier: str, seed: int) -> Optional[str]:
+            print("\nGenerating image...")
+            return self.replicate_integration.generate_image(
+                prompt=prompt,
+                deadline=(
+                    deadline.child(GENERATE_BUDGET_SHARE)
+                    if swap and tier == "final"
+                    else deadline
+                ),
+                tier=tier,
+                seed=seed,
             )
-            print(f"Twitter API response: {result}")
 
-            return result
+        image_path = generate(tier, seed)
+        if not image_path:
+            return None, seed
+        if swap and self.face_detector and not self._shows_face(image_path):
+            face_seed, probe = (
+                (None, None) if keep_seed else self._find_face_seed(generate)
+            )
+            if face_seed is None:
+                print("No usable face in the generated image, skipping face swap")
+                swap = False
+            else:
+                # A preview is the probe itself; a final is rendered from its seed
+                if tier != "preview":
+                    delete_media([probe])
+                    probe = generate(tier, face_seed)
+                if probe:
+                    delete_media([image_path])
+                    image_path, seed = probe, face_seed
+                else:
+                    swap = False
+
+        # Apply face swap with better logging
+        if swap and tier == "final":
+            print("\nApplying face swap...")
+            print(f"Base image: {image_path}")
+            print(f"Face image: {self.profile_image_path}")
+            swapped_image = self.replicate_integration.face_swap(
+                base_image_path=image_path,
+                face_image_path=self.profile_image_path,
+                deadline=deadline,
+            )
+            if swapped_image:
+                print(f"Face swap successful, new image: {swapped_image}")
+                image_path = swapped_image
+            else:
+                print("Face swap failed, using original image")
+                print("Check if both images are valid and face is clearly visible")
 
+        return image_path, seed
+
+    def _shows_face(self, image_path: str) -> bool:
+        """Whether a generated image shows a usable face; True if unknown."""
+        try:
+            return self.face_detector.has_face(image_path)
         except Exception as e:
-            print(f"Error posting image tweet: {str(e)}")
+            # Leave the decision to the face swap model, as without OpenCV
+            print(f"Error detecting faces: {str(e)}")
+            return True
+
+    def _find_face_seed(self, generate) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Try new seeds at the preview tier; return the first seed whose image
+        shows a face and that preview image, or (None, None).
+        """
+        for _ in range(FACELESS_RETRIES):
+            print("No usable face in the generated image, trying a new seed...")
+            seed = random.randint(0, MAX_SEED)
+            probe = generate("preview", seed)
+            if not probe:
+                break
+            if self._shows_face(probe):
+                return seed, probe
+            delete_media([probe])
+        return None, None
+
+    def _caption_prompt(self, subject: str) -> str:
+        """Build the prompt for an image tweet's caption."""
+        personality = self.facets.get_personality_context()
+        return (
+            f"Write a tweet from the first-person perspective of someone with this personality:\n"
+            f"{personality}\n\n"
+            f"{subject}\n\n"
+            f"Requirements:\n"
+            f"1. Write in their authentic voice\n"
+            f"2. Include 1-2 relevant emojis\n"
+            f"3. Add 1-2 relevant hashtags\n"
+            f"4. Keep it under 280 characters\n"
+            f"5. Make it personal and genuine\n"
+            f"6. Write as if they took the photo themselves\n\n"
+            f"Write only the tweet, no commentary."
+        )
+
+    def _caption_model(self, tweet_prompt: str) -> Optional[str]:
+        """Model that wrote a caption; None when the caption was given."""
+        return self.openrouter_integration.model_id("caption") if tweet_prompt else None
+
+    def _finalize_caption(
+        self,
+        tweet_text: str,
+        tweet_prompt: str,
+        deadline: Optional[Deadline] = None,
+    ) -> Union[str, Dict[str, Any]]:
+        """Clean, validate and dedupe a caption; a dict is a failed result."""
+        cleaned_tweet = self.tweet_validator.clean_tweet_text(tweet_text)
+        is_valid, validation_details = self.tweet_validator.validate_tweet(
+            cleaned_tweet
+        )
+        if not is_valid:
+            print(f"Tweet validation failed: {validation_details}")
             return {
                 "status": "failed",
-                "message": f"Error posting image tweet: {str(e)}",
+                "message": f"Tweet validation failed: {validation_details}",
             }
+
+        # Only generated captions can be regenerated
+        if tweet_prompt:
+            cleaned_tweet = self._avoid_duplicate(
+                cleaned_tweet, tweet_prompt, deadline, task="caption"
+            )
+            if not cleaned_tweet:
+                return self._duplicate_result()
+        return cleaned_tweet
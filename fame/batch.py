@@ -0,0 +1,264 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from fame.agent import Agent
+from fame.server import ACTIONS, REQUEUE_ACTIONS, PersonaRegistry
+
+# Parameter of each action that receives a job's "instruction"
+INSTRUCTION_PARAMS = {
+    "post_tweet": "instruction",
+    "post_thread": "instruction",
+    "post_buffered": "instruction",
+    "fill_content_buffer": "instruction",
+    "post_image_tweet": "prompt",
+}
+
+# Concurrent requests per integration, shared by all agents of a batch
+DEFAULT_LIMITS = {"llm": 8, "replicate": 4, "x": 4}
+
+
+# Status of the record written to the output when a job starts
+STARTED = "started"
+
+
+def read_checkpoint(output: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the last record of each job in output, keyed by job id.
+
+    A job whose last record is STARTED was running when the batch stopped.
+    """
+    records: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(output):
+        return records
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                records[record["id"]] = record
+            except (ValueError, KeyError, TypeError):
+                # A line cut off by a crash
+                continue
+    return records
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def iter_jobs(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (job id, job) for each line of a JSONL jobs file.
+
+    A job is {"persona", "action", "instruction"} with optional "params"
+    (more keyword arguments for the action) and "id" (defaults to the line
+    number, so the file must not be reordered between resumed runs).
+    Unparsable lines are yielded as {"error": ...}.
+    """
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+                if not isinstance(job, dict):
+                    raise ValueError("job must be an object")
+            except ValueError as e:
+                yield str(number), {"error": f"Invalid job on line {number}: {e}"}
+                continue
+            yield str(job.get("id", number)), job
+
+
+def job_params(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the keyword arguments for a job's action."""
+    action = job.get("action")
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown action '{action}'. Available: {', '.join(ACTIONS)}")
+    params = dict(job.get("params") or {})
+    if job.get("instruction"):
+        if action not in INSTRUCTION_PARAMS:
+            raise ValueError(f"Action '{action}' takes no instruction")
+        params.setdefault(INSTRUCTION_PARAMS[action], job["instruction"])
+    return params
+
+
+class BatchRunner:
+    """
+    Runs a JSONL file of agent jobs with bounded concurrency.
+
+    Jobs run on a thread pool, and each integration (LLM, Replicate, X) has
+    its own limit on concurrent requests, shared by all agents. Results are
+    appended to the output file as each job finishes; the output doubles as
+    the checkpoint, so running the same jobs file again skips every job that
+    already has a result.
+
+    Each job also gets a "started" record before it runs. A job that was
+    still running when the batch stopped may have published, so on resume
+    it is recorded as interrupted instead of run again (its post is settled
+    by retry_outbox); only actions in REQUEUE_ACTIONS are repeated.
+    """
+
+    def __init__(
+        self,
+        registry: PersonaRegistry,
+        workers: int = 16,
+        limits: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Args:
+            registry: Personas and their warm agents
+            workers: Jobs run at once
+            limits: Concurrent requests per integration ("llm",
+                "replicate", "x"); missing ones use DEFAULT_LIMITS
+        """
+        self.registry = registry
+        self.workers = workers
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.limiters = {
+            name: threading.BoundedSemaphore(limit) for name, limit in limits.items()
+        }
+
+    def _agent(self, persona: str) -> Agent:
+        agent = self.registry.agent(persona)
+        agent.openrouter_integration.limiter = self.limiters["llm"]
+        agent.replicate_integration.limiter = self.limiters["replicate"]
+        if agent.twitter_integration is not None:
+            agent.twitter_integration.limiter = self.limiters["x"]
+        return agent
+
+    def run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one job and return its result dict."""
+        if "error" in job:
+            return {"status": "failed", "message": job["error"]}
+        try:
+            params = job_params(job)
+            agent = self._agent(job.get("persona", ""))
+            result = getattr(agent, job["action"])(**params)
+        except Exception as e:
+            return {"status": "failed", "message": str(e)}
+        if isinstance(result, dict):
+            return result
+        return {"status": "success", "message": "Done", "result": result}
+
+    def run(self, jobs_path: str, output: str) -> Dict[str, Any]:
+        """
+        Run the jobs that have no result in output yet.
+
+        Returns:
+            Result dict with the number of jobs "run", "failed",
+            "interrupted" (by an earlier run, not repeated) and "skipped"
+            (already done)
+        """
+        records = read_checkpoint(output)
+        done = {
+            job_id
+            for job_id, record in records.items()
+            if record.get("status") != STARTED
+        }
+        counts = {"run": 0, "failed": 0, "interrupted": 0, "skipped": 0}
+        write_lock = threading.Lock()
+        # Keeps a 10k-job file from being read into the pool all at once
+        slots = threading.BoundedSemaphore(self.workers * 2)
+
+        def write(job_id: str, job: Dict[str, Any], status: str, **fields):
+            record = {
+                "id": job_id,
+                "persona": job.get("persona"),
+                "action": job.get("action"),
+                "status": status,
+                **fields,
+            }
+            with write_lock:
+                out.write(json.dumps(record, default=str) + "\n")
+                out.flush()
+
+        def run_and_record(job_id: str, job: Dict[str, Any]):
+            started = time.time()
+            write(job_id, job, STARTED)
+            result = self.run_job(job)
+            write(
+                job_id,
+                job,
+                result.get("status"),
+                result=result,
+                seconds=round(time.time() - started, 3),
+            )
+            with write_lock:
+                counts["run"] += 1
+                if result.get("status") not in ("success", "skipped"):
+                    counts["failed"] += 1
+
+        if done:
+            print(f"Resuming: {len(done)} jobs already have results")
+        with open(output, "a", encoding="utf-8") as out:
+            if os.path.getsize(output) > 0 and not _ends_with_newline(output):
+                # Keep a line cut off by a crash apart from the next result
+                out.write("\n")
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for job_id, job in iter_jobs(jobs_path):
+                    if job_id in done:
+                        counts["skipped"] += 1
+                        continue
+                    if job_id in records and job.get("action") not in REQUEUE_ACTIONS:
+                        # It may have published before the crash
+                        message = (
+                            "Interrupted by an earlier run; it may have completed "
+                            "(run retry_outbox to settle its post)"
+                        )
+                        print(f"Job {job_id}: {message}")
+                        write(
+                            job_id,
+                            job,
+                            "interrupted",
+                            result={"status": "failed", "message": message},
+                        )
+                        counts["interrupted"] += 1
+                        counts["failed"] += 1
+                        continue
+                    slots.acquire()
+                    future = pool.submit(run_and_record, job_id, job)
+                    future.add_done_callback(lambda _: slots.release())
+
+        print(
+            f"\nBatch finished: {counts['run']} run, {counts['failed']} failed, "
+            f"{counts['interrupted']} interrupted, {counts['skipped']} already done"
+        )
+        return {
+            "status": "success" if not counts["failed"] else "failed",
+            "message": f"Ran {counts['run']} jobs, {counts['failed']} failed",
+            **counts,
+        }
+
+
+def run_batch(
+    jobs_path: str,
+    personas: str,
+    output: Optional[str] = None,
+    env_file: str = ".env",
+    workers: int = 16,
+    limits: Optional[Dict[str, int]] = None,
+    publisher: Optional[str] = None,
+    accounts_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run a JSONL file of jobs; see BatchRunner.
+
+    output defaults to <jobs file>.results.jsonl next to the jobs file.
+    """
+    if output is None:
+        output = f"{os.path.splitext(jobs_path)[0]}.results.jsonl"
+    registry = PersonaRegistry(
+        personas, env_file=env_file, publisher=publisher, accounts_dir=accounts_dir
+    )
+    try:
+        print(f"Writing results to: {output}")
+        return BatchRunner(registry, workers=workers, limits=limits).run(
+            jobs_path, output
+        )
+    finally:
+        registry.close()
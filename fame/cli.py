@@ -0,0 +1,129 @@
+import argparse
+from typing import List, Optional
+
+
+def _serve(args: argparse.Namespace) -> int:
+    from fame.server import serve
+
+    serve(
+        args.personas,
+        env_file=args.env_file,
+        host=args.host,
+        port=args.port,
+        socket_path=args.socket,
+        workers=args.workers,
+        publisher=args.publisher,
+        accounts_dir=args.accounts,
+        watch_interval=args.watch or None,
+        parse_workers=args.parse_workers,
+    )
+    return 0
+
+
+def _batch(args: argparse.Namespace) -> int:
+    from fame.batch import run_batch
+
+    result = run_batch(
+        args.jobs,
+        args.personas,
+        output=args.output,
+        env_file=args.env_file,
+        workers=args.workers,
+        limits={"llm": args.llm, "replicate": args.replicate, "x": args.x},
+        publisher=args.publisher,
+        accounts_dir=args.accounts,
+    )
+    return 0 if result["status"] == "success" else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the parser for the fame command."""
+    from fame.batch import DEFAULT_LIMITS
+    from fame.server import DEFAULT_PORT
+
+    parser = argparse.ArgumentParser(
+        prog="fame", description="Run FAME agents from the command line."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser(
+        "serve", help="Run a worker daemon with an HTTP job API"
+    )
+    serve.add_argument(
+        "personas", help="Persona snapshot, or a JSONL/CSV file of definitions"
+    )
+    serve.add_argument("--env-file", default=".env", help="File with the API keys")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    serve.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="Port to listen on"
+    )
+    serve.add_argument("--socket", help="Listen on this Unix socket instead of TCP")
+    serve.add_argument("--workers", type=int, default=8, help="Jobs run at once")
+    serve.add_argument(
+        "--publisher", help="Where posts go: x (default), sqlite, jsonl or null"
+    )
+    serve.add_argument(
+        "--accounts", help="Directory of <persona>.env files with X credentials"
+    )
+    serve.add_argument(
+        "--watch",
+        type=float,
+        default=2.0,
+        help="Seconds between checks for persona changes (0 to disable)",
+    )
+    serve.add_argument(
+        "--parse-workers", type=int, help="Processes for parsing persona definitions"
+    )
+    serve.set_defaults(func=_serve)
+
+    batch = commands.add_parser(
+        "batch", help="Run a JSONL file of jobs, resuming where a run stopped"
+    )
+    batch.add_argument(
+        "jobs", help='JSONL file of {"persona", "action", "instruction"} jobs'
+    )
+    batch.add_argument(
+        "--personas",
+        required=True,
+        help="Persona snapshot, or a JSONL/CSV file of definitions",
+    )
+    batch.add_argument(
+        "--output",
+        help="Results file (default: <jobs>.results.jsonl); also the checkpoint",
+    )
+    batch.add_argument("--env-file", default=".env", help="File with the API keys")
+    batch.add_argument("--workers", type=int, default=16, help="Jobs run at once")
+    batch.add_argument(
+        "--llm",
+        type=int,
+        default=DEFAULT_LIMITS["llm"],
+        help="Concurrent LLM requests",
+    )
+    batch.add_argument(
+        "--replicate",
+        type=int,
+        default=DEFAULT_LIMITS["replicate"],
+        help="Concurrent Replicate predictions",
+    )
+    batch.add_argument(
+        "--x", type=int, default=DEFAULT_LIMITS["x"], help="Concurrent X requests"
+    )
+    batch.add_argument(
+        "--publisher", help="Where posts go: x (default), sqlite, jsonl or null"
+    )
+    batch.add_argument(
+        "--accounts", help="Directory of <persona>.env files with X credentials"
+    )
+    batch.set_defaults(func=_batch)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of the fame command."""
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
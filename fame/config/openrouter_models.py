@@ -33,3 +33,40 @@ DEFAULT_MODELS = {
         },
     },
 }
+
+# Per-task routing: the model each task runs on and the request parameters it
+# needs. Output length dominates latency, so max_tokens is sized to the answer
+# rather than the model default. "model_type" picks a config above and "id"
+# optionally routes the task to another model; "params" are sent with each
+# request, with max_tokens multiplied by the number of items for batched tasks.
+# With "complete", an answer cut off at max_tokens is not returned; it is
+# requested again with twice the tokens.
+DEFAULT_TASKS = {
+    # ["teenager", "female", "korean"]
+    "demographics": {
+        "model_type": "text_generation",
+        "params": {"max_tokens": 40, "temperature": 0.0, "stop": ["\n\n"]},
+    },
+    # One {"mood", "intensity"} object per text
+    "sentiment": {
+        "model_type": "text_generation",
+        "params": {"max_tokens": 32, "temperature": 0.0},
+    },
+    # A tweet is at most 280 characters, but CJK text and emoji take more
+    # tokens per character, and a cut-off tweet can still fit in 280
+    "tweet": {
+        "model_type": "text_generation",
+        "params": {"max_tokens": 160, "temperature": 0.8},
+        "complete": True,
+    },
+    "caption": {
+        "model_type": "text_generation",
+        "params": {"max_tokens": 160, "temperature": 0.8},
+        "complete": True,
+    },
+    # A JSON array of 10 scenes of up to 100 words each
+    "scenes": {
+        "model_type": "text_generation",
+        "params": {"max_tokens": 1600, "temperature": 0.9},
+    },
+}
@@ -0,0 +1,241 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Generated content older than this is not posted
+DEFAULT_MAX_AGE = 6 * 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buffer (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    persona TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    text TEXT NOT NULL,
+    media_paths TEXT,
+    details TEXT,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS buffer_persona ON buffer (persona, kind, created_at);
+"""
+
+
+def delete_media(media_paths: List[str]):
+    """Delete the media files of a post that will not be published."""
+    for path in media_paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error deleting buffered media {path}: {str(e)}")
+
+
+class ContentBuffer:
+    """
+    Posts generated ahead of time, ready to publish, in SQLite.
+
+    Filling the buffer runs the slow part of a post (scenes, images, face
+    swap, caption) whenever there is spare capacity; at posting time an
+    entry is only taken and published. Every entry carries a fingerprint of
+    the persona and mood it was generated for, and is discarded once the
+    persona's fingerprint changes or the entry expires. The media files of
+    discarded entries are deleted with them.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Database file; created with its parent directory if missing
+        """
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def put(
+        self,
+        text: str,
+        persona: str,
+        fingerprint: str,
+        kind: str = "text",
+        media_paths: Optional[List[str]] = None,
+        details: Optional[Dict[str, Any]] = None,
+        max_age: float = DEFAULT_MAX_AGE,
+    ) -> str:
+        """
+        Store a ready post and return its key.
+
+        Args:
+            text: Tweet text
+            persona: Name of the persona it was generated for
+            fingerprint: Persona and mood state it was generated for
+            kind: "text", "image" or "gallery"
+            media_paths: Local files to attach
+            details: Data passed on to the outbox (prompt, scene, ...)
+            max_age: Seconds the post stays fresh
+        """
+        now = time.time()
+        entry = {
+            "key": uuid.uuid4().hex,
+            "persona": persona,
+            "kind": kind,
+            "fingerprint": fingerprint,
+            "text": text,
+            "media_paths": json.dumps(media_paths or []),
+            "details": json.dumps(details or {}),
+            "created_at": now,
+            "expires_at": now + max_age,
+        }
+        columns = ", ".join(entry)
+        placeholders = ", ".join(f":{name}" for name in entry)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO buffer ({columns}) VALUES ({placeholders})", entry
+            )
+        return entry["key"]
+
+    def take(
+        self, persona: str, fingerprint: str, kind: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Remove and return the oldest fresh post for the persona, or None.
+
+        Entries generated for another fingerprint are discarded on the way.
+        """
+        self.invalidate(persona, keep=fingerprint)
+        sql = "SELECT * FROM buffer WHERE persona = ? AND expires_at > ?"
+        params: List[Any] = [persona, time.time()]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        sql += " ORDER BY created_at LIMIT 1"
+        # SELECT then DELETE in one write transaction rather than DELETE ...
+        # RETURNING, which needs SQLite 3.35
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(sql, params).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("DELETE FROM buffer WHERE id = ?", (row["id"],))
+        return self._to_dict(row)
+
+    def count(
+        self,
+        persona: str,
+        fingerprint: Optional[str] = None,
+        kind: Optional[str] = None,
+    ) -> int:
+        """Return the number of fresh posts buffered for the persona."""
+        sql = "SELECT COUNT(*) FROM buffer WHERE persona = ? AND expires_at > ?"
+        params: List[Any] = [persona, time.time()]
+        if fingerprint is not None:
+            sql += " AND fingerprint = ?"
+            params.append(fingerprint)
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def entries(self, persona: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the persona's fresh posts, oldest first, without taking them."""
+        sql = "SELECT * FROM buffer WHERE persona = ? AND expires_at > ?"
+        params: List[Any] = [persona, time.time()]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        sql += " ORDER BY created_at"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def update(self, key: str, media_paths: List[str], details: Dict[str, Any]) -> bool:
+        """
+        Replace the media and details of a buffered post, e.g. with a final
+        render of a preview image. Returns False if the post is gone.
+
+        The replaced media files are deleted; if the post is gone, the new
+        ones are, as nothing refers to them.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT media_paths FROM buffer WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE buffer SET media_paths = ?, details = ? WHERE key = ?",
+                    (json.dumps(media_paths), json.dumps(details), key),
+                )
+        if row is None:
+            delete_media(media_paths)
+            return False
+        old_paths = json.loads(row["media_paths"] or "[]")
+        delete_media([path for path in old_paths if path not in media_paths])
+        return True
+
+    def _delete(self, where: str, params: List[Any]) -> int:
+        """Delete matching entries and their media; returns the number removed."""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                f"SELECT media_paths FROM buffer WHERE {where}", params
+            ).fetchall()
+            self._conn.execute(f"DELETE FROM buffer WHERE {where}", params)
+        for row in rows:
+            delete_media(json.loads(row["media_paths"] or "[]"))
+        return len(rows)
+
+    def discard(self, key: str) -> bool:
+        """Remove one buffered post, e.g. a rejected draft."""
+        return self._delete("key = ?", [key]) > 0
+
+    def invalidate(self, persona: str, keep: Optional[str] = None) -> int:
+        """
+        Discard the persona's buffered posts; returns the number removed.
+
+        Args:
+            persona: Name of the persona
+            keep: Keep posts generated for this fingerprint
+        """
+        where = "persona = ?"
+        params: List[Any] = [persona]
+        if keep is not None:
+            where += " AND fingerprint != ?"
+            params.append(keep)
+        return self._delete(where, params)
+
+    def prune(self) -> int:
+        """Delete expired posts; returns the number removed."""
+        return self._delete("expires_at <= ?", [time.time()])
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        entry = dict(row)
+        entry["media_paths"] = json.loads(entry["media_paths"] or "[]")
+        entry["details"] = json.loads(entry["details"] or "{}")
+        return entry
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "ContentBuffer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
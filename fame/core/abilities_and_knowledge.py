@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 from typing import List, Dict, Any
-import re
+from fame.parsers import extract_ability_features
+from fame.core.persona_state import AbilitiesState
 
 
 @dataclass
@@ -13,13 +14,8 @@ class AbilitiesAndKnowledge:
     skills: List[Dict[str, float]] = field(default_factory=list)
     raw_description: str = ""
 
-    def __post_init__(self):
-        """Initialize after dataclass fields are set."""
-        self._parse_description()
-
     def __init__(self, description: str):
         """Initialize abilities and knowledge from description."""
-        super().__init__()
         self.raw_description = description
         self.expertise = []
         self.specialties = []
@@ -28,92 +24,48 @@ class AbilitiesAndKnowledge:
 
     def _parse_description(self):
         """Parse the description to extract abilities and knowledge."""
-        description = self.raw_description.lower()
+        features = extract_ability_features(self.raw_description)
 
-        # Clear existing lists before parsing
-        self.expertise = []
-        self.specialties = []
+        # Replace existing lists with the freshly parsed ones
+        self.expertise = features["expertise"]
+        self.specialties = features["specialties"]
         self.skills = []
 
-        # Extract expertise areas
-        expertise_patterns = [
-            r"expert in ([^\.]+)",
-            r"specialized in ([^\.]+)",
-            r"expertise in ([^\.]+)",
-        ]
-
-        for pattern in expertise_patterns:
-            matches = re.finditer(pattern, description)
-            for match in matches:
-                self.expertise.extend(
-                    [exp.strip() for exp in match.group(1).split(",")]
-                )
-
-        # Extract primary field
-        field_patterns = [
-            r"phd in ([^\.]+)",
-            r"ms in ([^\.]+)",
-            r"master in ([^\.]+)",
-            r"specializing in ([^\.]+)",
-        ]
-
-        for pattern in field_patterns:
-            match = re.search(pattern, description, re.I)
-            if match:
-                self.primary_field = match.group(1).strip()
-                break
-
-        # Extract specialties with expanded categories
-        specialty_indicators = {
-            "ai_ml": [
-                "machine learning",
-                "artificial intelligence",
-                "neural networks",
-                "ai/ml",
-            ],
-            "sustainability": [
-                "sustainable",
-                "green tech",
-                "eco-friendly",
-                "carbon footprint",
-            ],
-            "business": ["startup", "entrepreneurship", "business", "scaling"],
-            "technology": ["computing", "algorithms", "tech solutions", "architecture"],
-            "innovation": ["innovation", "research", "development", "patents"],
-            "physics": ["quantum mechanics", "relativity", "particle physics"],
-            "teaching": ["education", "teaching", "instruction"],
-            "research": ["research", "investigation", "study"],
-        }
-
-        for specialty, indicators in specialty_indicators.items():
-            if any(indicator in description for indicator in indicators):
-                self.specialties.append(specialty)
-
-        # Determine experience level
-        experience_indicators = {
-            "expert": ["expert", "advanced", "seasoned", "veteran"],
-            "intermediate": ["experienced", "proficient", "skilled"],
-            "beginner": ["junior", "beginning", "learning"],
-        }
-
-        for level, indicators in experience_indicators.items():
-            if any(indicator in description for indicator in indicators):
-                self.experience_level = level
-                break
-
-        # Extract role
-        role_patterns = [
-            r"(founder|ceo|owner|executive|leader)",
-            r"(professor|teacher|instructor|researcher|scientist)",
-            r"(engineer|developer|architect)",
-            r"(phd|doctorate|master)",
-        ]
-
-        for pattern in role_patterns:
-            match = re.search(pattern, description, re.I)
-            if match:
-                self.role = match.group(1).lower()
-                break
+        # Keep the defaults for anything the description does not mention
+        if features["primary_field"] is not None:
+            self.primary_field = features["primary_field"]
+        if features["experience_level"] is not None:
+            self.experience_level = features["experience_level"]
+        if features["role"] is not None:
+            self.role = features["role"]
+
+    @classmethod
+    def from_features(
+        cls, description: str, features: Dict[str, Any]
+    ) -> "AbilitiesAndKnowledge":
+        """Build from previously parsed features without reparsing."""
+        abilities = cls.__new__(cls)
+        abilities.raw_description = description
+        abilities.expertise = list(features.get("expertise", []))
+        abilities.primary_field = features.get("primary_field", cls.primary_field)
+        abilities.specialties = list(features.get("specialties", []))
+        abilities.experience_level = features.get(
+            "experience_level", cls.experience_level
+        )
+        abilities.role = features.get("role", cls.role)
+        abilities.skills = list(features.get("skills", []))
+        return abilities
+
+    @classmethod
+    def from_state(
+        cls, state: AbilitiesState, description: str = ""
+    ) -> "AbilitiesAndKnowledge":
+        """Build a mutable instance from a compact AbilitiesState."""
+        return cls.from_features(description, state.get_knowledge_context())
+
+    def to_state(self) -> AbilitiesState:
+        """Return a compact, immutable snapshot of these abilities."""
+        return AbilitiesState.from_context(self.get_knowledge_context())
 
     def get_knowledge_context(self) -> Dict[str, Any]:
         """Get comprehensive knowledge and abilities context."""
@@ -1,21 +1,30 @@
-from typing import Dict
+from typing import Dict, Optional
 from fame.integrations.openrouter_integration import OpenRouterIntegration
 
 
 class FacetsOfPersonality:
     """Core personality traits and characteristics."""
 
-    def __init__(self, description: str, llm: OpenRouterIntegration):
+    def __init__(
+        self,
+        description: str,
+        llm: OpenRouterIntegration,
+        demographics: Optional[Dict[str, str]] = None,
+    ):
         """
         Initialize personality facets.
 
         Args:
             description: Personality description
             llm: OpenRouter integration instance
+            demographics: Already resolved demographics (e.g. from a persona
+                snapshot); extracted with the LLM when not provided
         """
         self.description = description
         self.llm = llm
-        self.demographics = self._extract_demographics(description)
+        if demographics is None:
+            demographics = self._extract_demographics(description)
+        self.demographics = demographics
 
     def _extract_demographics(self, description: str) -> Dict[str, str]:
         """Extract demographic information from personality description."""
@@ -33,7 +42,7 @@ class FacetsOfPersonality:
             )
 
             # Get demographics from LLM
-            response = self.llm.generate_text(prompt=prompt)
+            response = self.llm.generate_text(prompt=prompt, task="demographics")
             if not response:
                 return {}
 
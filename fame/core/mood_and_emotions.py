@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from fame.parsers import extract_mood_features
+from fame.core.persona_state import MoodState
 
 
 @dataclass
@@ -13,65 +15,76 @@ class MoodAndEmotions:
         """Initialize mood and emotions from description."""
         self.raw_description = description
         self.emotional_state = []
+        self.store = None
+        self.store_row = None
         self._parse_description()
 
-    def _parse_description(self):
-        """Parse the description to extract mood and emotions."""
-        description = self.raw_description.lower()
+    def attach_store(self, store, row: Optional[int] = None) -> int:
+        """
+        Keep the current mood in a shared MoodStore instead of on this object.
 
-        # Define mood keywords and their associated intensities
-        mood_keywords = {
-            "excited": (0.8, ["excited", "thrilled", "enthusiastic", "energetic"]),
-            "happy": (0.7, ["happy", "joyful", "pleased", "delighted"]),
-            "optimistic": (0.6, ["optimistic", "hopeful", "positive", "confident"]),
-            "calm": (0.5, ["calm", "peaceful", "relaxed", "serene"]),
-            "neutral": (0.5, ["neutral", "balanced", "steady", "composed"]),
-            "thoughtful": (0.4, ["thoughtful", "contemplative", "reflective"]),
-            "serious": (0.3, ["serious", "focused", "determined", "resolute"]),
-            "concerned": (0.2, ["concerned", "worried", "anxious", "uneasy"]),
-        }
+        The parsed mood becomes the persona's baseline. Returns the store row.
+        """
+        if row is None:
+            row = store.add(self.current_mood, self.mood_intensity)
+        self.store = store
+        self.store_row = row
+        return row
 
-        # Find the most relevant mood
-        max_matches = 0
-        best_mood = "neutral"
-        best_intensity = 0.5
+    def _parse_description(self):
+        """Parse the description to extract mood and emotions."""
+        features = extract_mood_features(self.raw_description)
 
-        for mood, (intensity, keywords) in mood_keywords.items():
-            matches = sum(1 for keyword in keywords if keyword in description)
-            if matches > max_matches:
-                max_matches = matches
-                best_mood = mood
-                best_intensity = intensity
+        self.current_mood = features["current_mood"]
+        self.mood_intensity = features["mood_intensity"]
+        self.emotional_state.extend(features["emotional_state"])
 
-        self.current_mood = best_mood
-        self.mood_intensity = best_intensity
+    @classmethod
+    def from_features(
+        cls, description: str, features: Dict[str, Any]
+    ) -> "MoodAndEmotions":
+        """Build from previously parsed features without reparsing."""
+        mood = cls.__new__(cls)
+        mood.raw_description = description
+        mood.current_mood = features.get("current_mood", cls.current_mood)
+        mood.mood_intensity = features.get("mood_intensity", cls.mood_intensity)
+        mood.emotional_state = list(features.get("emotional_state", []))
+        mood.store = None
+        mood.store_row = None
+        return mood
 
-        # Extract emotional states
-        emotional_keywords = {
-            "passionate": ["passionate", "zealous", "ardent"],
-            "curious": ["curious", "inquisitive", "interested"],
-            "patient": ["patient", "understanding", "tolerant"],
-            "encouraging": ["encouraging", "supportive", "motivating"],
-            "analytical": ["analytical", "logical", "methodical"],
-            "creative": ["creative", "innovative", "imaginative"],
-            "friendly": ["friendly", "approachable", "welcoming"],
-            "professional": ["professional", "formal", "composed"],
-        }
+    @classmethod
+    def from_state(cls, state: MoodState, description: str = "") -> "MoodAndEmotions":
+        """Build a mutable instance from a compact MoodState."""
+        return cls.from_features(description, state.get_mood_context())
 
-        for emotion, keywords in emotional_keywords.items():
-            if any(keyword in description for keyword in keywords):
-                self.emotional_state.append(emotion)
+    def to_state(self) -> MoodState:
+        """Return a compact, immutable snapshot of this mood."""
+        return MoodState.from_context(self.get_mood_context())
 
     def get_mood_context(self) -> Dict[str, Any]:
         """Get comprehensive mood context."""
+        current_mood, mood_intensity = self.current_mood, self.mood_intensity
+        if self.store is not None:
+            current_mood, mood_intensity = self.store.get(self.store_row)
+
         return {
-            "current_mood": self.current_mood,
-            "mood_intensity": self.mood_intensity,
+            "current_mood": current_mood,
+            "mood_intensity": mood_intensity,
             "emotional_state": self.emotional_state,
         }
 
     def update_mood(self, new_mood: str, intensity: float = None):
         """Update the current mood and optionally its intensity."""
+        if self.store is not None:
+            # A manual update is a full-strength impulse that decays over time
+            if intensity is None:
+                intensity = self.store.get(self.store_row)[1]
+            self.store.apply_impulses(
+                [self.store_row], [new_mood], [max(0.0, min(1.0, intensity))]
+            )
+            return
+
         self.current_mood = new_mood
         if intensity is not None:
             self.mood_intensity = max(0.0, min(1.0, intensity))
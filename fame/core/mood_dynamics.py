@@ -0,0 +1,201 @@
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from fame.parsers import MOOD_KEYWORDS
+
+# Moods produced by SentimentAnalyzer in addition to the persona moods
+SENTIMENT_MOODS = ("enthusiastic", "frustrated")
+
+
+class MoodStore:
+    """
+    NumPy-backed mood state for a fleet of personas, one row per persona.
+
+    Each row has a baseline mood and intensity (from the persona description)
+    and an event mood pushed by impulses such as the sentiment of a mention.
+    The event's weight decays exponentially toward the baseline with a
+    per-row half-life; while the weight is at least switch_threshold the
+    event mood is the current mood. tick() advances every row in one
+    vectorized step.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        half_life: float = 6 * 3600.0,
+        switch_threshold: float = 0.5,
+    ):
+        """
+        Args:
+            capacity: Initial number of rows; the store grows as needed
+            half_life: Default seconds for an impulse to lose half its weight
+            switch_threshold: Minimum event weight for the event mood to
+                replace the baseline mood
+        """
+        self.default_half_life = half_life
+        self.switch_threshold = switch_threshold
+        self.size = 0
+        self._lock = threading.Lock()
+        self._last_tick = time.monotonic()
+
+        self.labels: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for mood in tuple(MOOD_KEYWORDS) + SENTIMENT_MOODS:
+            self.label_code(mood)
+
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        """Allocate (or grow) the per-row arrays."""
+        arrays = {
+            "baseline_mood": np.int16,
+            "baseline_intensity": np.float32,
+            "event_mood": np.int16,
+            "event_intensity": np.float32,
+            "weight": np.float32,
+            "half_life": np.float32,
+            "mood": np.int16,
+            "intensity": np.float32,
+        }
+        for name, dtype in arrays.items():
+            grown = np.zeros(capacity, dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                grown[: self.size] = old[: self.size]
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def label_code(self, mood: str) -> int:
+        """Return the integer code for a mood label, registering new labels."""
+        code = self._codes.get(mood)
+        if code is None:
+            code = len(self.labels)
+            self.labels.append(mood)
+            self._codes[mood] = code
+        return code
+
+    def add(
+        self, mood: str, intensity: float, half_life: Optional[float] = None
+    ) -> int:
+        """Add a persona with its baseline mood and return its row."""
+        with self._lock:
+            if self.size == self.capacity:
+                self._allocate(self.capacity * 2)
+            row = self.size
+            self.size += 1
+
+            code = self.label_code(str(mood))
+            self.baseline_mood[row] = self.event_mood[row] = self.mood[row] = code
+            self.baseline_intensity[row] = self.intensity[row] = intensity
+            self.event_intensity[row] = intensity
+            self.weight[row] = 0.0
+            self.half_life[row] = half_life or self.default_half_life
+            return row
+
+    def set_baseline(self, row: int, mood: str, intensity: float):
+        """Change the mood a persona decays back to."""
+        with self._lock:
+            self.baseline_mood[row] = self.label_code(str(mood))
+            self.baseline_intensity[row] = intensity
+            self._refresh(np.array([row]))
+
+    def apply_impulses(
+        self,
+        rows: Union[Sequence[int], np.ndarray],
+        moods: Sequence[str],
+        intensities: Union[Sequence[float], np.ndarray],
+        strength: Union[float, Sequence[float], np.ndarray] = 1.0,
+    ):
+        """
+        Push event moods onto many personas at once.
+
+        Args:
+            rows: Persona rows receiving an impulse
+            moods: Event mood per row
+            intensities: Event intensity per row (0.0 - 1.0)
+            strength: Event weight (0.0 - 1.0), scalar or per row
+        """
+        with self._lock:
+            rows = np.asarray(rows, dtype=np.int64)
+            codes = np.fromiter(
+                (self.label_code(str(mood)) for mood in moods),
+                dtype=np.int16,
+                count=len(rows),
+            )
+            strength = np.clip(
+                np.broadcast_to(np.asarray(strength, dtype=np.float32), rows.shape),
+                0.0,
+                1.0,
+            )
+
+            self.event_mood[rows] = codes
+            self.event_intensity[rows] = np.clip(intensities, 0.0, 1.0)
+            self.weight[rows] = strength
+            self._refresh(rows)
+
+    def apply_sentiments(
+        self,
+        rows: Union[Sequence[int], np.ndarray],
+        sentiments: Iterable[Dict[str, Any]],
+        gain: float = 1.0,
+    ):
+        """
+        Apply SentimentAnalyzer results as impulses.
+
+        Each sentiment's intensity (scaled by its confidence when present)
+        sets the impulse strength.
+        """
+        sentiments = list(sentiments)
+        moods = [s.get("mood", "neutral") for s in sentiments]
+        intensities = np.array(
+            [s.get("intensity", 0.5) for s in sentiments], dtype=np.float32
+        )
+        confidence = np.array(
+            [s.get("confidence", 1.0) for s in sentiments], dtype=np.float32
+        )
+        self.apply_impulses(rows, moods, intensities, intensities * confidence * gain)
+
+    def tick(self, dt: Optional[float] = None):
+        """
+        Decay every persona's event weight toward its baseline.
+
+        Args:
+            dt: Seconds elapsed; defaults to the time since the last tick
+        """
+        with self._lock:
+            now = time.monotonic()
+            if dt is None:
+                dt = now - self._last_tick
+            self._last_tick = now
+
+            n = self.size
+            weight = self.weight[:n]
+            weight *= np.exp(-math.log(2.0) * dt / self.half_life[:n])
+            weight[weight < 1e-3] = 0.0
+            self._refresh(slice(0, n))
+
+    def _refresh(self, rows):
+        """Recompute current mood and intensity for the given rows."""
+        weight = self.weight[rows]
+        baseline = self.baseline_intensity[rows]
+        self.intensity[rows] = (
+            baseline + (self.event_intensity[rows] - baseline) * weight
+        )
+        self.mood[rows] = np.where(
+            weight >= self.switch_threshold,
+            self.event_mood[rows],
+            self.baseline_mood[rows],
+        )
+
+    def get(self, row: int) -> Tuple[str, float]:
+        """Return the current (mood, intensity) of a persona."""
+        return self.labels[self.mood[row]], round(float(self.intensity[row]), 3)
+
+    def moods(self) -> List[str]:
+        """Return the current mood label of every persona."""
+        labels = self.labels
+        return [labels[code] for code in self.mood[: self.size]]
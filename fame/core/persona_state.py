@@ -0,0 +1,167 @@
+import sys
+from enum import Enum
+from typing import Any, Dict, Iterable, Tuple, Type, Union
+
+from fame.parsers import EXPERIENCE_INDICATORS, MOOD_KEYWORDS, ROLE_GROUPS
+
+
+class _Label(str, Enum):
+    """String enum whose members format and print as their plain value."""
+
+    def __str__(self) -> str:
+        return self.value
+
+
+Mood = _Label("Mood", [(mood.upper(), mood) for mood in MOOD_KEYWORDS])
+ExperienceLevel = _Label(
+    "ExperienceLevel", [(level.upper(), level) for level in EXPERIENCE_INDICATORS]
+)
+Role = _Label(
+    "Role",
+    [("PROFESSIONAL", "professional")]
+    + [(role.upper(), role) for group in ROLE_GROUPS for role in group],
+)
+
+
+def intern_label(label_type: Type[Enum], value: Union[str, Enum]) -> Union[Enum, str]:
+    """
+    Return the shared enum member for a label, or an interned string.
+
+    Labels outside the known set (such as a mood set from sentiment
+    analysis) stay plain strings but are interned, so equal labels across
+    many personas still share one object.
+    """
+    if isinstance(value, label_type):
+        return value
+    try:
+        return label_type(value)
+    except ValueError:
+        return sys.intern(str(value))
+
+
+def _frozen_strings(values: Iterable[str]) -> Tuple[str, ...]:
+    """Return a tuple of interned strings."""
+    return tuple(sys.intern(str(value)) for value in values)
+
+
+class _FrozenSlots:
+    """Base for immutable __slots__ records."""
+
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable; use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self):
+        return (_rebuild, (type(self), self._values()))
+
+    def replace(self, **changes):
+        """Return a copy with the given fields changed."""
+        values = dict(zip(self.__slots__, self._values()))
+        values.update(changes)
+        return type(self)(**values)
+
+
+def _rebuild(cls, values: tuple):
+    """Unpickle a frozen slots record."""
+    return cls(**dict(zip(cls.__slots__, values)))
+
+
+class AbilitiesState(_FrozenSlots):
+    """Compact, immutable abilities and knowledge of one persona."""
+
+    __slots__ = (
+        "expertise",
+        "primary_field",
+        "specialties",
+        "experience_level",
+        "role",
+        "skills",
+    )
+
+    def __init__(
+        self,
+        expertise: Iterable[str] = (),
+        primary_field: str = "general",
+        specialties: Iterable[str] = (),
+        experience_level: Union[str, Enum] = "intermediate",
+        role: Union[str, Enum] = "professional",
+        skills: Iterable[Any] = (),
+    ):
+        super().__init__(
+            expertise=_frozen_strings(expertise),
+            primary_field=sys.intern(str(primary_field)),
+            specialties=_frozen_strings(specialties),
+            experience_level=intern_label(ExperienceLevel, experience_level),
+            role=intern_label(Role, role),
+            skills=tuple(skills),
+        )
+
+    @classmethod
+    def from_context(cls, context: Dict[str, Any]) -> "AbilitiesState":
+        """Build from an AbilitiesAndKnowledge.get_knowledge_context() dict."""
+        return cls(**{name: context[name] for name in cls.__slots__ if name in context})
+
+    def get_knowledge_context(self) -> Dict[str, Any]:
+        """Get the knowledge context in the same shape as AbilitiesAndKnowledge."""
+        return {
+            "expertise": list(self.expertise),
+            "primary_field": self.primary_field,
+            "specialties": list(self.specialties),
+            "experience_level": str(self.experience_level),
+            "role": str(self.role),
+            "skills": list(self.skills),
+        }
+
+
+class MoodState(_FrozenSlots):
+    """Compact, immutable mood and emotions of one persona."""
+
+    __slots__ = ("current_mood", "mood_intensity", "emotional_state")
+
+    def __init__(
+        self,
+        current_mood: Union[str, Enum] = "neutral",
+        mood_intensity: float = 0.5,
+        emotional_state: Iterable[str] = (),
+    ):
+        super().__init__(
+            current_mood=intern_label(Mood, current_mood),
+            mood_intensity=float(mood_intensity),
+            emotional_state=_frozen_strings(emotional_state),
+        )
+
+    @classmethod
+    def from_context(cls, context: Dict[str, Any]) -> "MoodState":
+        """Build from a MoodAndEmotions.get_mood_context() dict."""
+        return cls(**{name: context[name] for name in cls.__slots__ if name in context})
+
+    def get_mood_context(self) -> Dict[str, Any]:
+        """Get the mood context in the same shape as MoodAndEmotions."""
+        return {
+            "current_mood": str(self.current_mood),
+            "mood_intensity": self.mood_intensity,
+            "emotional_state": list(self.emotional_state),
+        }
@@ -0,0 +1,295 @@
+import json
+import time
+from typing import Optional, Dict, Any, List, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..utils.deadline import Deadline
+
+# HTTP status codes worth retrying (rate limits and transient upstream errors)
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Least time worth starting another attempt with
+MIN_ATTEMPT_TIME = 2.0
+
+
+class HTTPChatClient:
+    """Chat client bound to one model that talks to /chat/completions directly."""
+
+    def __init__(
+        self,
+        session: requests.Session,
+        base_url: str,
+        headers: Dict[str, str],
+        model: str,
+        params: Dict[str, Any],
+        timeout: float = 30,
+        max_retries: int = 3,
+    ):
+        self.session = session
+        self.url = f"{base_url.rstrip('/')}/chat/completions"
+        self.headers = headers
+        self.model = model
+        self.params = dict(params)
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+    def _build_body(
+        self, messages: List[Dict[str, str]], stream: bool, **params
+    ) -> Dict[str, Any]:
+        """Build the request body, letting per-call params override defaults."""
+        body = {"model": self.model, "messages": messages}
+        body.update(self.params)
+        body.update(params)
+        if stream:
+            body["stream"] = True
+            body["stream_options"] = {"include_usage": True}
+        return body
+
+    def _post(
+        self, body: Dict[str, Any], stream: bool, deadline: Optional[Deadline] = None
+    ) -> requests.Response:
+        """
+        POST the request, retrying transient failures with backoff.
+
+        With a deadline, each attempt's timeout is capped by the time left
+        and no retry is started that could not finish in time.
+        """
+        deadline = deadline or Deadline()
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(
+                    self.url,
+                    headers=self.headers,
+                    json=body,
+                    timeout=deadline.timeout(self.timeout),
+                    stream=stream,
+                )
+                if (
+                    response.status_code in RETRYABLE_STATUS_CODES
+                    and attempt < self.max_retries
+                ):
+                    response.close()
+                    raise requests.ConnectionError(
+                        f"Retryable status {response.status_code}"
+                    )
+                response.raise_for_status()
+                return response
+            except (requests.ConnectionError, requests.Timeout):
+                backoff = min(0.5 * 2 ** (attempt + 1), 8.0)
+                if attempt >= self.max_retries or not deadline.fits(
+                    backoff + MIN_ATTEMPT_TIME
+                ):
+                    raise
+                attempt += 1
+                time.sleep(backoff)
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        deadline: Optional[Deadline] = None,
+        **params,
+    ) -> Dict[str, Any]:
+        """Return the raw OpenAI-style completion (choices, usage, finish_reason)."""
+        body = self._build_body(messages, stream=False, **params)
+        response = self._post(body, stream=False, deadline=deadline)
+        return response.json()
+
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        deadline: Optional[Deadline] = None,
+        **params,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield OpenAI-style completion chunks as they arrive (server-sent events)."""
+        body = self._build_body(messages, stream=True, **params)
+        response = self._post(body, stream=True, deadline=deadline)
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                # Skip keep-alive blank lines and SSE comments
+                if not line or line.startswith(":"):
+                    continue
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                yield json.loads(data)
+        finally:
+            response.close()
+
+
+class HTTPChatBackend:
+    """Backend that sends requests over a pooled requests.Session."""
+
+    name = "http"
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        pool_maxsize: int = 10,
+        timeout: float = 30,
+        max_retries: int = 3,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "X-Title": "FAME",
+        }
+
+        # One session (and connection pool) shared by every client of this backend
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def create_client(self, model: str, params: Dict[str, Any]) -> HTTPChatClient:
+        """Create a lightweight client bound to a model and parameter set."""
+        return HTTPChatClient(
+            session=self.session,
+            base_url=self.base_url,
+            headers=self.headers,
+            model=model,
+            params=params,
+            timeout=self.timeout,
+            max_retries=self.max_retries,
+        )
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
+
+
+class LangchainChatClient:
+    """Chat client that routes requests through langchain_openai.ChatOpenAI."""
+
+    def __init__(self, llm, model: str, timeout: float = 30):
+        self.llm = llm
+        self.model = model
+        self.timeout = timeout
+
+    @staticmethod
+    def _to_langchain_messages(messages: List[Dict[str, str]]) -> list:
+        """Convert dict messages to langchain message objects."""
+        from langchain.schema import AIMessage, HumanMessage, SystemMessage
+
+        message_types = {
+            "system": SystemMessage,
+            "assistant": AIMessage,
+            "user": HumanMessage,
+        }
+        return [
+            message_types.get(msg["role"], HumanMessage)(content=msg["content"])
+            for msg in messages
+        ]
+
+    def _bind(self, deadline: Optional[Deadline], params: Dict[str, Any]):
+        """Return the model with per-call params and a deadline-capped timeout."""
+        if deadline is not None and deadline.remaining() is not None:
+            params = {**params, "timeout": deadline.timeout(self.timeout)}
+        return self.llm.bind(**params) if params else self.llm
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        deadline: Optional[Deadline] = None,
+        **params,
+    ) -> Dict[str, Any]:
+        """Return an OpenAI-style completion built from the langchain response."""
+        llm = self._bind(deadline, params)
+        response = llm.invoke(self._to_langchain_messages(messages))
+        metadata = getattr(response, "response_metadata", {}) or {}
+        return {
+            "model": metadata.get("model_name", self.model),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": response.content},
+                    "finish_reason": metadata.get("finish_reason"),
+                }
+            ],
+            "usage": metadata.get("token_usage", {}),
+        }
+
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        deadline: Optional[Deadline] = None,
+        **params,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield OpenAI-style chunks from langchain's streaming interface."""
+        llm = self._bind(deadline, params)
+        for chunk in llm.stream(self._to_langchain_messages(messages)):
+            metadata = getattr(chunk, "response_metadata", {}) or {}
+            yield {
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": chunk.content},
+                        "finish_reason": metadata.get("finish_reason"),
+                    }
+                ]
+            }
+
+
+class LangchainChatBackend:
+    """Backend that builds ChatOpenAI clients (requires langchain-openai)."""
+
+    name = "langchain"
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        timeout: float = 30,
+        max_retries: int = 3,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+    def create_client(self, model: str, params: Dict[str, Any]) -> LangchainChatClient:
+        """Create a ChatOpenAI client bound to a model and parameter set."""
+        from langchain_openai import ChatOpenAI
+
+        llm = ChatOpenAI(
+            model=model,
+            api_key=self.api_key,
+            base_url=self.base_url,
+            max_retries=self.max_retries,
+            timeout=self.timeout,
+            **params,
+        )
+        return LangchainChatClient(llm, model, timeout=self.timeout)
+
+    def close(self):
+        """Nothing to release; ChatOpenAI manages its own connections."""
+
+
+BACKENDS = {
+    HTTPChatBackend.name: HTTPChatBackend,
+    LangchainChatBackend.name: LangchainChatBackend,
+}
+
+
+def create_backend(name: str, api_key: str, base_url: str, **kwargs):
+    """Create a chat backend by name ("http" or "langchain")."""
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown chat backend '{name}'. Available: {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[name](api_key=api_key, base_url=base_url, **kwargs)
+
+
+def extract_content(response: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Return the assistant message content from a completion, if any."""
+    if not response or not response.get("choices"):
+        return None
+    return response["choices"][0].get("message", {}).get("content")
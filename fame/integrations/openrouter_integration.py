@@ -1,20 +1,39 @@
-from typing import Optional, Dict, Any, List
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-from ..config.openrouter_models import DEFAULT_MODELS
+import copy
+import json
+import requests
+from contextlib import nullcontext
+from typing import Optional, Dict, Any, List, Iterator, Union, Tuple
+from ..config.openrouter_models import DEFAULT_MODELS, DEFAULT_TASKS
+from ..utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from ..utils.deadline import Deadline, DeadlineExceeded
+from .chat_backends import create_backend, extract_content
+
+# Requests again, with twice the tokens, for answers of "complete" tasks
+# that were cut off at max_tokens
+TRUNCATION_RETRIES = 1
 
 
 class OpenRouterIntegration:
-    def __init__(self, api_key: str, custom_models: dict = None):
+    def __init__(
+        self,
+        api_key: str,
+        custom_models: dict = None,
+        backend: Union[str, Any] = "http",
+        custom_tasks: dict = None,
+    ):
         """
         Initialize OpenRouter integration with optional custom model configurations.
 
         Args:
             api_key: OpenRouter API key
             custom_models: Optional dict to override default model configurations
+            backend: "http" (direct pooled HTTP client, default), "langchain"
+                (ChatOpenAI, requires langchain-openai) or a backend instance
+            custom_tasks: Optional dict to override the per-task routing
+                (see DEFAULT_TASKS); "params" are merged with the defaults
         """
         self.api_key = api_key
-        self.models = DEFAULT_MODELS.copy()
+        self.models = copy.deepcopy(DEFAULT_MODELS)
         self.base_url = "https://openrouter.ai/api/v1"
 
         # Override with custom models if provided
@@ -22,58 +41,197 @@ class OpenRouterIntegration:
             for model_type, config in custom_models.items():
                 if model_type in self.models:
                     self.models[model_type].update(config)
+                else:
+                    self.models[model_type] = {"default_params": {}, **config}
+
+        self.tasks = copy.deepcopy(DEFAULT_TASKS)
+        for task, route in (custom_tasks or {}).items():
+            self.set_task(
+                task,
+                route.get("model_type"),
+                route.get("id"),
+                route.get("params"),
+                route.get("complete"),
+            )
+
+        # Initialize chat backend
+        if isinstance(backend, str):
+            self.backend = create_backend(
+                backend,
+                api_key=api_key,
+                base_url=self.base_url,
+                max_retries=3,
+                timeout=30,
+            )
+        else:
+            self.backend = backend
+
+        # Ready-made clients keyed by (model_type, model_id, params), built on demand
+        self._clients: Dict[Tuple[str, str, str], Any] = {}
+
+        # Fail fast while OpenRouter is down instead of waiting out retries
+        self.breaker = CircuitBreaker("OpenRouter")
+        # Held around every request; share a semaphore between integrations
+        # to bound their concurrent requests (see fame batch)
+        self.limiter = nullcontext()
+
+    @property
+    def llm(self):
+        """Client for the text generation model."""
+        return self.get_client("text_generation")
 
-        # Initialize LLM client
-        self.llm = ChatOpenAI(
-            model=self.models["text_generation"]["id"],
-            temperature=self.models["text_generation"]["default_params"]["temperature"],
-            max_tokens=self.models["text_generation"]["default_params"]["max_tokens"],
-            api_key=api_key,
-            base_url=self.base_url,
-            max_retries=3,
-            timeout=30,
-        )
+    def get_client(
+        self, model_type: str = "text_generation", model_id: Optional[str] = None
+    ):
+        """
+        Return the client for a model type, building it on first use.
+
+        Clients are cached per model type, model id and parameter set, so
+        switching models never rebuilds or mutates a client another thread
+        may be using. Unknown model types fall back to text_generation.
+        model_id runs the model type's parameters on another model.
+        """
+        config = self.models.get(model_type) or self.models["text_generation"]
+        model_id = model_id or config["id"]
+        params = config.get("default_params", {})
+        key = (model_type, model_id, json.dumps(params, sort_keys=True))
+
+        client = self._clients.get(key)
+        if client is None:
+            # setdefault keeps the first client if two threads race to build one
+            client = self._clients.setdefault(
+                key, self.backend.create_client(model_id, params)
+            )
+        return client
 
     def set_model(self, model_type: str, model_id: str, default_params: dict = None):
         """Set or update a model configuration."""
-        if model_type not in self.models:
-            self.models[model_type] = {"id": model_id, "default_params": {}}
-        else:
-            self.models[model_type]["id"] = model_id
+        current = self.models.get(model_type, {"default_params": {}})
 
+        # Swap in a new config dict rather than mutating the one readers hold;
+        # the matching client is built on the next request for this model type
+        params = dict(current.get("default_params", {}))
         if default_params:
-            self.models[model_type]["default_params"].update(default_params)
+            params.update(default_params)
+        self.models[model_type] = {**current, "id": model_id, "default_params": params}
 
-        # Update LLM client if text generation model changed
-        if model_type == "text_generation":
-            self.llm = ChatOpenAI(
-                model=model_id,
-                api_key=self.api_key,
-                base_url=self.base_url,
-                max_retries=3,
-                timeout=30,
-                **self.models[model_type]["default_params"],
-            )
+        # Drop clients for the old config; callers already holding one keep it
+        self._clients = {
+            key: client for key, client in self._clients.items() if key[0] != model_type
+        }
+
+    def set_task(
+        self,
+        task: str,
+        model_type: Optional[str] = None,
+        model_id: Optional[str] = None,
+        params: dict = None,
+        complete: Optional[bool] = None,
+    ):
+        """
+        Set or update the routing of a task.
+
+        Args:
+            task: Task name, e.g. "tweet" or "scenes"
+            model_type: Model config the task runs on
+            model_id: Model to run the task on instead of the config's model
+            params: Request parameters (max_tokens, temperature, stop, ...)
+            complete: Request a cut-off answer again instead of returning it
+        """
+        current = self.tasks.get(task, {"params": {}})
+        route = {**current, "params": {**current.get("params", {}), **(params or {})}}
+        if model_type is not None:
+            route["model_type"] = model_type
+        if model_id is not None:
+            route["id"] = model_id
+        if complete is not None:
+            route["complete"] = complete
+        # Swapped in whole, like set_model, so readers never see half an update
+        self.tasks[task] = route
+
+    def _route(
+        self, task: Optional[str], model_type: str, items: int = 1
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """Return the client and per-request params for a task."""
+        route = self.tasks.get(task) if task else None
+        if not route:
+            return self.get_client(model_type), {}
+
+        params = dict(route.get("params", {}))
+        if params.get("max_tokens") and items > 1:
+            params["max_tokens"] *= items
+        client = self.get_client(route.get("model_type", model_type), route.get("id"))
+        return client, params
+
+    def model_id(
+        self, task: Optional[str] = None, model_type: str = "text_generation"
+    ) -> str:
+        """Return the id of the model a request is routed to."""
+        route = self.tasks.get(task) if task else None
+        if route and route.get("id"):
+            return route["id"]
+        if route:
+            model_type = route.get("model_type", model_type)
+        config = self.models.get(model_type) or self.models["text_generation"]
+        return config["id"]
+
+    def generate_text(
+        self,
+        prompt: str,
+        model_type: str = "text_generation",
+        deadline: Optional[Deadline] = None,
+        task: Optional[str] = None,
+        items: int = 1,
+    ) -> Optional[str]:
+        """
+        Generate text using the model configured for model_type.
 
-    def generate_text(self, prompt: str) -> Optional[str]:
-        """Generate text using the configured model."""
+        With a deadline, the request's timeout and retries fit the time left.
+        A task (see DEFAULT_TASKS) picks the model and request parameters
+        instead; items scales max_tokens for prompts that batch several
+        answers. For "complete" tasks a cut-off answer is requested again
+        with more tokens, and None is returned if it is still cut off.
+        """
         try:
             print("\nPreparing to generate text...")
-            print(f"Using model: {self.models['text_generation']['id']}")
+            print(f"Using model: {self._route(task, model_type)[0].model}")
 
             messages = [
                 {"role": "system", "content": "You are a helpful AI assistant."},
                 {"role": "user", "content": prompt},
             ]
 
-            print("\nSending request to OpenRouter...")
-            response = self.chat_completion(messages)
+            route = self.tasks.get(task) if task else None
+            retries = TRUNCATION_RETRIES if route and route.get("complete") else 0
+            overrides: Dict[str, Any] = {}
+            for attempt in range(retries + 1):
+                print("\nSending request to OpenRouter...")
+                response = self.chat_completion(
+                    messages,
+                    model_type=model_type,
+                    deadline=deadline,
+                    task=task,
+                    items=items,
+                    **overrides,
+                )
 
-            if not response or "choices" not in response:
-                print("No valid response from OpenRouter")
-                return None
+                generated_text = extract_content(response)
+                if generated_text is None:
+                    print("No valid response from OpenRouter")
+                    return None
+                truncated = response["choices"][0].get("finish_reason") == "length"
+                if not retries or not truncated:
+                    break
+                if attempt == retries:
+                    print("Generated text was cut off at max_tokens")
+                    return None
+                max_tokens = overrides.get("max_tokens") or self._route(
+                    task, model_type, items
+                )[1].get("max_tokens")
+                if max_tokens:
+                    overrides["max_tokens"] = max_tokens * 2
+                print("\nGenerated text was cut off, retrying with more tokens...")
 
-            generated_text = response["choices"][0]["message"]["content"]
             print(f"\nGenerated text: {generated_text}")
 
             return generated_text.strip()
@@ -82,26 +240,114 @@ class OpenRouterIntegration:
             print(f"Text generation failed: {str(e)}")
             return None
 
+    def stream_text(
+        self,
+        prompt: str,
+        model_type: str = "text_generation",
+        deadline: Optional[Deadline] = None,
+        task: Optional[str] = None,
+    ) -> Iterator[str]:
+        """Stream generated text for a prompt as it is produced."""
+        messages = [
+            {"role": "system", "content": "You are a helpful AI assistant."},
+            {"role": "user", "content": prompt},
+        ]
+        for chunk in self.stream_chat_completion(
+            messages, model_type=model_type, deadline=deadline, task=task
+        ):
+            for choice in chunk.get("choices") or []:
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    yield content
+
     def chat_completion(
-        self, messages: List[Dict[str, str]], model_type: str = "chat", **kwargs
+        self,
+        messages: List[Dict[str, str]],
+        model_type: str = "chat",
+        deadline: Optional[Deadline] = None,
+        task: Optional[str] = None,
+        items: int = 1,
+        **kwargs,
     ) -> Optional[Dict[str, Any]]:
-        """Get chat completion using the specified model type."""
-        try:
-            # Convert dict messages to langchain message objects
-            langchain_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    langchain_messages.append(SystemMessage(content=msg["content"]))
-                else:
-                    langchain_messages.append(HumanMessage(content=msg["content"]))
+        """
+        Get chat completion using the specified model type.
 
-            response = self.llm.invoke(langchain_messages)
-            return {
-                "choices": [
-                    {"message": {"content": response.content, "role": "assistant"}}
-                ]
-            }
+        Returns the OpenAI-style response including choices (with role and
+        finish_reason) and usage, or None on failure. A task routes the
+        request as in generate_text; kwargs override its params.
+        """
+        if deadline is not None and deadline.expired():
+            print("Chat completion skipped: deadline exceeded")
+            return None
+        if not self.breaker.allow():
+            print(self.breaker.open_message())
+            return None
 
+        try:
+            client, params = self._route(task, model_type, items)
+            with self.limiter:
+                response = client.complete(
+                    messages, deadline=deadline, **{**params, **kwargs}
+                )
         except Exception as e:
+            self._record_outcome(e, deadline)
             print(f"Chat completion failed: {str(e)}")
             return None
+
+        self._record_outcome(None)
+        return response
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model_type: str = "chat",
+        deadline: Optional[Deadline] = None,
+        task: Optional[str] = None,
+        **kwargs,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream chat completion chunks using the specified model type.
+
+        Yields OpenAI-style chunks with choices[].delta, finish_reason and,
+        on the final chunk, usage. Raises CircuitOpenError while OpenRouter
+        is failing and DeadlineExceeded if the deadline has passed.
+        """
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded("Deadline exceeded")
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.open_message())
+
+        error = None
+        try:
+            client, params = self._route(task, model_type)
+            with self.limiter:
+                yield from client.stream(
+                    messages, deadline=deadline, **{**params, **kwargs}
+                )
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # Also runs when the caller stops reading early
+            self._record_outcome(error, deadline)
+
+    def _record_outcome(
+        self, error: Optional[Exception], deadline: Optional[Deadline] = None
+    ):
+        """Update the circuit breaker after a request."""
+        # Running out of our own budget says nothing about OpenRouter
+        if isinstance(error, DeadlineExceeded) or (
+            isinstance(error, requests.Timeout)
+            and deadline is not None
+            and deadline.expired()
+        ):
+            error = None
+        # Client errors (bad request, auth) mean the service itself is up
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            status = error.response.status_code
+            if status < 500 and status != 429:
+                error = None
+        if error is None:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
@@ -0,0 +1,312 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+# A publisher is anything with the posting interface of TwitterIntegration:
+#   account_id
+#   post_tweet(text, in_reply_to=None) -> result dict with "tweet_id"
+#   post_tweet_with_media(text, media_path) -> result dict with "tweet_id"
+#   get_recent_tweets(max_results=20) -> result dict with the account's "tweets"
+#   delete_tweet(tweet_id) -> result dict
+# TwitterIntegration itself is the X publisher.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    id INTEGER PRIMARY KEY,
+    account_id TEXT,
+    text TEXT NOT NULL,
+    in_reply_to TEXT,
+    media_paths TEXT,
+    created_at REAL NOT NULL,
+    deleted_at REAL
+);
+"""
+
+
+def _timestamp(created_at: float) -> datetime:
+    return datetime.fromtimestamp(created_at, timezone.utc)
+
+
+def _media_paths(media_path: Union[str, Sequence[str]]) -> List[str]:
+    return [media_path] if isinstance(media_path, str) else list(media_path)
+
+
+class _IdSequence:
+    """Tweet ids that increase with time and stay unique across restarts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last = time.time_ns()
+
+    def next(self) -> str:
+        with self._lock:
+            self._last = max(self._last + 1, time.time_ns())
+            return str(self._last)
+
+
+class SQLitePublisher:
+    """Publisher that stores posts in a local SQLite database instead of X."""
+
+    def __init__(self, path: str, account_id: str = "local"):
+        """
+        Args:
+            path: Database file; created with its parent directory if missing
+            account_id: Account name recorded with every post; personas
+                sharing a database each use their own (the Agent uses its name)
+        """
+        self.path = path
+        self.account_id = account_id
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._ids = _IdSequence()
+
+    def _insert(
+        self, text: str, in_reply_to: Optional[str], media_paths: List[str]
+    ) -> str:
+        tweet_id = self._ids.next()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO tweets "
+                "(id, account_id, text, in_reply_to, media_paths, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    int(tweet_id),
+                    self.account_id,
+                    text,
+                    in_reply_to,
+                    json.dumps(media_paths),
+                    time.time(),
+                ),
+            )
+        return tweet_id
+
+    def post_tweet(
+        self, text: str, in_reply_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Store a text-only post."""
+        return {
+            "status": "success",
+            "message": "Tweet stored locally",
+            "tweet_id": self._insert(text, in_reply_to, []),
+        }
+
+    def post_tweet_with_media(
+        self, text: str, media_path: Union[str, Sequence[str]]
+    ) -> Dict[str, Any]:
+        """Store a post with the paths of its media files."""
+        return {
+            "status": "success",
+            "message": "Tweet with media stored locally",
+            "tweet_id": self._insert(text, None, _media_paths(media_path)),
+        }
+
+    def get_recent_tweets(self, max_results: int = 20) -> Dict[str, Any]:
+        """Return the account's most recent stored posts, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, text, created_at FROM tweets "
+                "WHERE account_id = ? AND deleted_at IS NULL "
+                "ORDER BY id DESC LIMIT ?",
+                (self.account_id, max_results),
+            ).fetchall()
+        tweets = [
+            {"id": str(tweet_id), "text": text, "created_at": _timestamp(created_at)}
+            for tweet_id, text, created_at in rows
+        ]
+        return {
+            "status": "success",
+            "message": f"Fetched {len(tweets)} tweets",
+            "tweets": tweets,
+        }
+
+    def delete_tweet(self, tweet_id: str) -> Dict[str, Any]:
+        """Mark a stored post as deleted."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE tweets SET deleted_at = ? WHERE id = ?",
+                (time.time(), int(tweet_id)),
+            )
+        return {
+            "status": "success",
+            "message": "Tweet deleted successfully",
+        }
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+
+class JSONLPublisher:
+    """Publisher that appends posts to a local JSON Lines file instead of X."""
+
+    def __init__(self, path: str, account_id: str = "local"):
+        """
+        Args:
+            path: File the posts are appended to, one JSON object per line
+            account_id: Account name recorded with every post; personas
+                sharing a file each use their own (the Agent uses its name)
+        """
+        self.path = path
+        self.account_id = account_id
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        self._ids = _IdSequence()
+
+    def _append(self, record: Dict[str, Any]) -> str:
+        with self._lock:
+            record = {"id": self._ids.next(), **record}
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+        return record["id"]
+
+    def post_tweet(
+        self, text: str, in_reply_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Append a text-only post."""
+        tweet_id = self._append(
+            {
+                "account_id": self.account_id,
+                "text": text,
+                "in_reply_to": in_reply_to,
+                "created_at": time.time(),
+            }
+        )
+        return {
+            "status": "success",
+            "message": "Tweet stored locally",
+            "tweet_id": tweet_id,
+        }
+
+    def post_tweet_with_media(
+        self, text: str, media_path: Union[str, Sequence[str]]
+    ) -> Dict[str, Any]:
+        """Append a post with the paths of its media files."""
+        tweet_id = self._append(
+            {
+                "account_id": self.account_id,
+                "text": text,
+                "media_paths": _media_paths(media_path),
+                "created_at": time.time(),
+            }
+        )
+        return {
+            "status": "success",
+            "message": "Tweet with media stored locally",
+            "tweet_id": tweet_id,
+        }
+
+    def get_recent_tweets(self, max_results: int = 20) -> Dict[str, Any]:
+        """Return the account's most recent appended posts, newest first."""
+        posts: Dict[str, Dict[str, Any]] = {}
+        with self._lock, open(self.path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if "deleted" in record:
+                    posts.pop(record["deleted"], None)
+                elif record.get("account_id") == self.account_id:
+                    posts[record["id"]] = record
+        # Posts are appended in id order, which the dict keeps
+        recent = list(posts.values())[-max_results:] if max_results > 0 else []
+        tweets = [
+            {
+                "id": record["id"],
+                "text": record["text"],
+                "created_at": _timestamp(record["created_at"]),
+            }
+            for record in reversed(recent)
+        ]
+        return {
+            "status": "success",
+            "message": f"Fetched {len(tweets)} tweets",
+            "tweets": tweets,
+        }
+
+    def delete_tweet(self, tweet_id: str) -> Dict[str, Any]:
+        """Append a deletion marker (the file is append-only)."""
+        with self._lock:
+            self._file.write(
+                json.dumps({"deleted": str(tweet_id), "deleted_at": time.time()}) + "\n"
+            )
+            self._file.flush()
+        return {
+            "status": "success",
+            "message": "Tweet deleted successfully",
+        }
+
+    def close(self):
+        """Close the file."""
+        self._file.close()
+
+
+class NullPublisher:
+    """Publisher that accepts every post and keeps nothing."""
+
+    def __init__(self, account_id: str = "null"):
+        self.account_id = account_id
+        self._ids = _IdSequence()
+
+    def post_tweet(
+        self, text: str, in_reply_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Pretend to post a text-only tweet."""
+        return {
+            "status": "success",
+            "message": "Tweet discarded",
+            "tweet_id": self._ids.next(),
+        }
+
+    def post_tweet_with_media(
+        self, text: str, media_path: Union[str, Sequence[str]]
+    ) -> Dict[str, Any]:
+        """Pretend to post a tweet with media."""
+        return {
+            "status": "success",
+            "message": "Tweet with media discarded",
+            "tweet_id": self._ids.next(),
+        }
+
+    def get_recent_tweets(self, max_results: int = 20) -> Dict[str, Any]:
+        """Return no tweets."""
+        return {
+            "status": "success",
+            "message": "Fetched 0 tweets",
+            "tweets": [],
+        }
+
+    def delete_tweet(self, tweet_id: str) -> Dict[str, Any]:
+        """Pretend to delete a tweet."""
+        return {
+            "status": "success",
+            "message": "Tweet deleted successfully",
+        }
+
+
+PUBLISHERS = {
+    "sqlite": SQLitePublisher,
+    "jsonl": JSONLPublisher,
+    "null": NullPublisher,
+}
+
+
+def create_publisher(name: str, **kwargs):
+    """Create a local publisher by name ("sqlite", "jsonl" or "null")."""
+    if name not in PUBLISHERS:
+        raise ValueError(
+            f"Unknown publisher '{name}'. Available: x, {', '.join(PUBLISHERS)}"
+        )
+    return PUBLISHERS[name](**kwargs)
@@ -1,10 +1,32 @@
 import os
 import time
+import uuid
 import replicate
 import requests
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
+from replicate.exceptions import ModelError
 import base64
+from fame.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from fame.utils.deadline import Deadline, DeadlineExceeded
+
+# Seconds between status checks of a running prediction
+POLL_INTERVAL = 0.5
+
+# Timeout for downloading a prediction's output
+DOWNLOAD_TIMEOUT = 60.0
+
+# Render settings per quality tier. Previews are for drafts that may be
+# discarded; the final render repeats the preview's prompt and seed at full
+# quality, so it shows the same picture.
+IMAGE_TIERS = {
+    "preview": {"num_inference_steps": 12, "output_quality": 60},
+    "final": {"num_inference_steps": 50, "output_quality": 100},
+}
+
+# Largest seed accepted by the image model
+MAX_SEED = 2**32 - 1
 
 
 class ReplicateIntegration:
@@ -14,12 +36,92 @@ class ReplicateIntegration:
         """Initialize Replicate integration."""
         os.environ["REPLICATE_API_TOKEN"] = api_key
         self.client = replicate.Client(api_token=api_key)
+        # Fail fast while Replicate is degraded instead of waiting on each run
+        self.breaker = CircuitBreaker("Replicate", failure_threshold=3)
+        # Held around every prediction; see OpenRouterIntegration.limiter
+        self.limiter = nullcontext()
         print("Successfully initialized Replicate client")
 
-    def generate_image(self, prompt: str, negative_prompt: str = None) -> Optional[str]:
-        """Generate an image using Replicate's image generation model."""
+    def _run(
+        self,
+        model: str,
+        input_data: Dict[str, Any],
+        deadline: Optional[Deadline] = None,
+    ) -> Any:
+        """Run a prediction, tracking Replicate's health in the breaker."""
+        deadline = deadline or Deadline()
+        if deadline.expired():
+            raise DeadlineExceeded("Deadline exceeded before starting prediction")
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.open_message())
+        try:
+            with self.limiter:
+                output = self._predict(model, input_data, deadline)
+        except (ModelError, DeadlineExceeded):
+            # The model rejected this input or our budget ran out; the
+            # service itself answered
+            self.breaker.record_success()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return output
+
+    def _predict(self, model: str, input_data: Dict[str, Any], deadline: Deadline):
+        """Run a prediction to completion, cancelling it if the deadline passes."""
+        version = model.split(":", 1)[1]
+        prediction = self.client.predictions.create(version=version, input=input_data)
+        while prediction.status not in ("succeeded", "failed", "canceled"):
+            remaining = deadline.remaining()
+            if remaining is not None and remaining <= 0:
+                # Stop paying for a result nobody will wait for
+                prediction.cancel()
+                raise DeadlineExceeded(
+                    f"Deadline exceeded, cancelled prediction {prediction.id}"
+                )
+            time.sleep(
+                POLL_INTERVAL if remaining is None else min(POLL_INTERVAL, remaining)
+            )
+            prediction.reload()
+
+        if prediction.status != "succeeded":
+            raise ModelError(prediction)
+        return prediction.output
+
+    @staticmethod
+    def _download(url: str, output_path: Path, deadline: Deadline):
+        """Save a prediction output file."""
+        response = requests.get(url, timeout=deadline.timeout(DOWNLOAD_TIMEOUT))
+        response.raise_for_status()
+        with open(output_path, "wb") as f:
+            f.write(response.content)
+
+    @staticmethod
+    def _output_path(prefix: str) -> Path:
+        """Return a new file path in the temp directory."""
+        temp_dir = Path("temp")
+        temp_dir.mkdir(exist_ok=True)
+        # The timestamp alone collides when images are generated concurrently
+        return temp_dir / f"{prefix}_{int(time.time())}_{uuid.uuid4().hex[:8]}.png"
+
+    def generate_image(
+        self,
+        prompt: str,
+        negative_prompt: str = None,
+        deadline: Optional[Deadline] = None,
+        tier: str = "final",
+        seed: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        Generate an image using Replicate's image generation model.
+
+        tier is a key of IMAGE_TIERS; pass the same seed to render a preview
+        again as a final image. The prediction is cancelled if it is still
+        running at the deadline.
+        """
         try:
-            print("\nStarting image generation...")
+            print(f"\nStarting {tier} image generation...")
             print(f"Prompt: {prompt}")
 
             # Configure model and input
@@ -31,17 +133,18 @@ class ReplicateIntegration:
                 "aspect_ratio": "1:1",
                 "lora_strength": 1.0,
                 "output_format": "webp",
-                "output_quality": 100,
-                "num_inference_steps": 50,
+                **IMAGE_TIERS[tier],
                 "negative_prompt": (
                     "cartoon, anime, illustration, painting, drawing, artwork, "
                     "distorted, blurry, low quality, ugly, duplicate, morbid, "
                     "mutilated, deformed, disfigured, poorly drawn face"
                 ),
             }
+            if seed is not None:
+                input_data["seed"] = seed
 
             # Run prediction
-            output = self.client.run(model, input=input_data)
+            output = self._run(model, input_data, deadline)
             if not output:
                 print("No output received from model")
                 return None
@@ -49,19 +152,11 @@ class ReplicateIntegration:
             # Get output URL
             output_url = output[0] if isinstance(output, list) else output
 
-            # Create temp directory
-            temp_dir = Path("temp")
-            temp_dir.mkdir(exist_ok=True)
-
             # Save the generated image
-            output_path = temp_dir / f"generated_image_{int(time.time())}.png"
+            output_path = self._output_path("generated_image")
 
             print(f"Downloading image from: {output_url}")
-            response = requests.get(output_url)
-            response.raise_for_status()
-
-            with open(output_path, "wb") as f:
-                f.write(response.content)
+            self._download(output_url, output_path, deadline or Deadline())
 
             print(f"\nSuccessfully saved image to: {output_path}")
             return str(output_path)
@@ -70,8 +165,17 @@ class ReplicateIntegration:
             print(f"Error generating image: {str(e)}")
             return None
 
-    def face_swap(self, base_image_path: str, face_image_path: str) -> Optional[str]:
-        """Swap faces in images using Replicate's face swap model."""
+    def face_swap(
+        self,
+        base_image_path: str,
+        face_image_path: str,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[str]:
+        """
+        Swap faces in images using Replicate's face swap model.
+
+        The prediction is cancelled if it is still running at the deadline.
+        """
         try:
             print("\nStarting face swap...")
             print(f"Base image: {base_image_path}")
@@ -96,7 +200,7 @@ class ReplicateIntegration:
             input_data = {"input_image": base_image_uri, "swap_image": face_image_uri}
 
             # Run face swap
-            output = self.client.run(model, input=input_data)
+            output = self._run(model, input_data, deadline)
             if not output:
                 print("No output received from face swap model")
                 return None
@@ -104,19 +208,11 @@ class ReplicateIntegration:
             # Get output URL
             output_url = output[0] if isinstance(output, list) else output
 
-            # Create temp directory
-            temp_dir = Path("temp")
-            temp_dir.mkdir(exist_ok=True)
-
             # Save the swapped image
-            output_path = temp_dir / f"swapped_image_{int(time.time())}.png"
+            output_path = self._output_path("swapped_image")
 
             print(f"Downloading swapped image from: {output_url}")
-            response = requests.get(output_url)
-            response.raise_for_status()
-
-            with open(output_path, "wb") as f:
-                f.write(response.content)
+            self._download(output_url, output_path, deadline or Deadline())
 
             print(f"Face swap successful, saved to: {output_path}")
             return str(output_path)
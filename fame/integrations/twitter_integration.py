@@ -1,5 +1,40 @@
+import re
+import threading
+import time
 import tweepy
-from typing import Dict, Any, Optional
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dotenv import dotenv_values
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+from fame.utils.circuit_breaker import CircuitBreaker
+from fame.utils.media_cache import MediaCache, file_digest
+
+# Endpoint used to create tweets, as tracked in rate_limits
+POST_TWEET_ENDPOINT = "POST /2/tweets"
+
+# Timeout for API requests that do not set one (tweepy.Client never does)
+REQUEST_TIMEOUT = 30.0
+
+
+class _TimeoutSession(requests.Session):
+    """
+    Session that applies a default timeout to every request and holds the
+    limiter while a request runs.
+    """
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+        self.limiter = nullcontext()
+
+    def request(self, *args, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        with self.limiter:
+            return super().request(*args, **kwargs)
 
 
 class TwitterIntegration:
@@ -9,8 +44,18 @@ class TwitterIntegration:
         consumer_secret: str,
         access_token: str,
         access_token_secret: str,
+        media_cache: Optional[MediaCache] = None,
+        adapter: Optional[HTTPAdapter] = None,
     ):
-        """Initialize Twitter API client."""
+        """
+        Initialize Twitter API client.
+
+        media_cache holds uploaded media ids for reuse; by default it lives
+        in memory for the lifetime of this client. adapter is a connection
+        pool shared with other accounts (see TwitterAccountPool).
+        """
+        # User access tokens start with the numeric id of the account
+        self.account_id = access_token.split("-", 1)[0] if access_token else None
         auth = tweepy.OAuthHandler(consumer_key, consumer_secret)
         auth.set_access_token(access_token, access_token_secret)
         self.api = tweepy.API(auth)
@@ -20,45 +65,222 @@ class TwitterIntegration:
             access_token=access_token,
             access_token_secret=access_token_secret,
         )
+        self.media_cache = media_cache or MediaCache()
+
+        # Rate limit windows seen for this account: endpoint -> (remaining, reset)
+        self.rate_limits: Dict[str, Tuple[int, float]] = {}
+
+        # Both API versions share one session, which records rate limits
+        # from every response; with a shared adapter, connections are
+        # reused across accounts
+        self.session = _TimeoutSession(REQUEST_TIMEOUT)
+        if adapter is not None:
+            self.session.mount("https://", adapter)
+        self.session.hooks["response"].append(self._track_rate_limit)
+        self.api.session = self.session
+        self.client.session = self.session
+
+        # Posts fail fast (and stay in the outbox) while X is failing
+        self.breaker = CircuitBreaker("X API")
+
+    def _track_rate_limit(self, response: requests.Response, *args, **kwargs):
+        """Record the rate limit headers of an API response."""
+        remaining = response.headers.get("x-rate-limit-remaining")
+        reset = response.headers.get("x-rate-limit-reset")
+        if remaining is None or reset is None:
+            return
+        # Tweet and user ids in the path share one limit per endpoint
+        path = re.sub(r"/\d{4,}(?=/|$)", "/:id", urlparse(response.url).path)
+        endpoint = f"{response.request.method} {path}"
+        self.rate_limits[endpoint] = (int(remaining), float(reset))
+
+    def rate_limit_wait(self, endpoint: str = POST_TWEET_ENDPOINT) -> float:
+        """Return the seconds until the endpoint may be called again (0 if now)."""
+        remaining, reset = self.rate_limits.get(endpoint, (1, 0.0))
+        if remaining > 0:
+            return 0.0
+        return max(0.0, reset - time.time())
+
+    @property
+    def limiter(self):
+        """Held around every X request; see OpenRouterIntegration.limiter."""
+        return self.session.limiter
+
+    @limiter.setter
+    def limiter(self, limiter):
+        self.session.limiter = limiter
+
+    def _record_outcome(self, error: Optional[Exception]):
+        """Update the circuit breaker after a request."""
+        # Only server and connection errors say anything about X's health
+        if error is not None and self._classify_error(error)[1]:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _unavailable_result(self) -> Dict[str, Any]:
+        """Failed result for a post skipped because the breaker is open."""
+        return {
+            "status": "failed",
+            "message": self.breaker.open_message(),
+            "retryable": True,
+            "in_doubt": False,
+        }
+
+    def _rate_limited_result(self, wait: float) -> Dict[str, Any]:
+        """Failed result for a post skipped because the account is rate limited."""
+        return {
+            "status": "failed",
+            "message": f"Rate limited for another {wait:.0f} seconds",
+            "retryable": True,
+            "in_doubt": False,
+        }
 
-    def post_tweet(self, text: str) -> Dict[str, Any]:
-        """Post a text-only tweet."""
+    @staticmethod
+    def _classify_error(error: Exception) -> Tuple[bool, bool]:
+        """
+        Return (retryable, in_doubt) for an API error.
+
+        An error response below 500 means X did not create the tweet; rate
+        limits are worth retrying later. Server errors, timeouts and
+        connection errors may come after X accepted the tweet, so the
+        outcome is unknown.
+        """
+        if isinstance(error, tweepy.errors.HTTPException):
+            status = error.response.status_code
+            if status == 429:
+                return True, False
+            if status >= 500:
+                return True, True
+            return False, False
+        return True, True
+
+    def post_tweet(
+        self, text: str, in_reply_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Post a text-only tweet, optionally as a reply to another tweet."""
+        wait = self.rate_limit_wait()
+        if wait:
+            return self._rate_limited_result(wait)
+        if not self.breaker.allow():
+            return self._unavailable_result()
         try:
-            response = self.client.create_tweet(text=text)
+            response = self.client.create_tweet(
+                text=text, in_reply_to_tweet_id=in_reply_to
+            )
+            self._record_outcome(None)
             return {
                 "status": "success",
                 "message": "Tweet posted successfully",
                 "tweet_id": response.data["id"],
             }
         except Exception as e:
+            self._record_outcome(e)
+            retryable, in_doubt = self._classify_error(e)
             return {
                 "status": "failed",
                 "message": f"Failed to post tweet: {str(e)}",
+                "retryable": retryable,
+                "in_doubt": in_doubt,
             }
 
-    def post_tweet_with_media(self, text: str, media_path: str) -> Dict[str, Any]:
-        """Post a tweet with media attachment."""
+    def upload_media(self, media_path: str) -> Tuple[str, bool]:
+        """
+        Upload a file, reusing the media id of an earlier identical upload.
+
+        Returns:
+            Tuple of (media_id, reused)
+        """
+        digest = file_digest(media_path)
+        media_id = self.media_cache.get(self.account_id, digest)
+        if media_id:
+            print(f"Reusing uploaded media with ID: {media_id}")
+            return media_id, True
+
+        print("\nUploading media...")
+        # Upload media using v1.1 API
+        media = self.api.media_upload(filename=media_path)
+        print(f"Media uploaded with ID: {media.media_id}")
+        self.media_cache.put(
+            self.account_id,
+            digest,
+            media.media_id,
+            getattr(media, "expires_after_secs", None),
+        )
+        return str(media.media_id), False
+
+    def _upload_all(self, media_paths: List[str]) -> List[Tuple[str, bool]]:
+        """Upload several files in parallel; returns (media_id, reused) each."""
+        if len(media_paths) == 1:
+            return [self.upload_media(media_paths[0])]
+        with ThreadPoolExecutor(max_workers=len(media_paths)) as pool:
+            return list(pool.map(self.upload_media, media_paths))
+
+    def post_tweet_with_media(
+        self, text: str, media_path: Union[str, Sequence[str]]
+    ) -> Dict[str, Any]:
+        """
+        Post a tweet with media attachments.
+
+        media_path is one file or a list of up to four; several files are
+        uploaded in parallel.
+        """
+        media_paths = [media_path] if isinstance(media_path, str) else list(media_path)
+        wait = self.rate_limit_wait()
+        if wait:
+            return self._rate_limited_result(wait)
+        if not self.breaker.allow():
+            return self._unavailable_result()
         try:
-            print("\nUploading media...")
-            # Upload media using v1.1 API
-            media = self.api.media_upload(filename=media_path)
-            print(f"Media uploaded with ID: {media.media_id}")
+            uploads = self._upload_all(media_paths)
+        except Exception as e:
+            self._record_outcome(e)
+            print(f"Error uploading media: {str(e)}")
+            # No tweet exists yet, so the outcome is never in doubt
+            retryable, _ = self._classify_error(e)
+            return {
+                "status": "failed",
+                "message": f"Failed to upload media: {str(e)}",
+                "retryable": retryable,
+                "in_doubt": False,
+            }
 
+        media_ids = [media_id for media_id, _ in uploads]
+        try:
             # Post tweet with media using v2 API
-            response = self.client.create_tweet(text=text, media_ids=[media.media_id])
+            try:
+                response = self.client.create_tweet(text=text, media_ids=media_ids)
+            except tweepy.errors.BadRequest:
+                reused = [path for path, (_, hit) in zip(media_paths, uploads) if hit]
+                if not reused:
+                    raise
+                # X dropped a cached id early; upload those files once more
+                print("Cached media ID rejected, uploading again...")
+                for path in reused:
+                    self.media_cache.invalidate(self.account_id, file_digest(path))
+                media_ids = [media_id for media_id, _ in self._upload_all(media_paths)]
+                response = self.client.create_tweet(text=text, media_ids=media_ids)
 
+            self._record_outcome(None)
             return {
                 "status": "success",
                 "message": "Tweet with media posted successfully",
                 "tweet_id": response.data["id"],
-                "media_id": media.media_id,
+                "media_id": media_ids[0],
+                "media_ids": media_ids,
             }
 
         except Exception as e:
+            self._record_outcome(e)
             print(f"Error posting tweet with media: {str(e)}")
+            retryable, in_doubt = self._classify_error(e)
             return {
                 "status": "failed",
                 "message": f"Failed to post tweet with media: {str(e)}",
+                "media_id": media_ids[0],
+                "media_ids": media_ids,
+                "retryable": retryable,
+                "in_doubt": in_doubt,
             }
 
     def delete_tweet(self, tweet_id: str) -> Dict[str, Any]:
@@ -74,3 +296,127 @@ class TwitterIntegration:
                 "status": "failed",
                 "message": f"Failed to delete tweet: {str(e)}",
             }
+
+    def get_recent_tweets(self, max_results: int = 20) -> Dict[str, Any]:
+        """
+        Fetch the account's most recent tweets, newest first.
+
+        Returns:
+            Result dict whose "tweets" is a list of {"id", "text", "created_at"}
+        """
+        try:
+            response = self.client.get_users_tweets(
+                id=self.account_id,
+                max_results=max(5, min(100, max_results)),
+                tweet_fields=["created_at"],
+                user_auth=True,
+            )
+            tweets = [
+                {
+                    "id": str(tweet.id),
+                    "text": tweet.text,
+                    "created_at": tweet.created_at,
+                }
+                for tweet in response.data or []
+            ]
+            return {
+                "status": "success",
+                "message": f"Fetched {len(tweets)} tweets",
+                "tweets": tweets,
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "message": f"Failed to fetch recent tweets: {str(e)}",
+            }
+
+
+class TwitterAccountPool:
+    """
+    X clients for many accounts over one shared connection pool.
+
+    Each account keeps its own credentials and rate limit state, but every
+    account's requests go through the same HTTP adapter, so connections to
+    the API hosts stay warm across accounts. Clients are built once when an
+    account is added; posting for any account afterwards constructs nothing.
+    """
+
+    def __init__(
+        self,
+        media_cache: Optional[MediaCache] = None,
+        max_connections: int = 32,
+    ):
+        """
+        Args:
+            media_cache: Media id cache shared by all accounts (entries are
+                keyed by account); in memory by default
+            max_connections: Connections kept open per API host
+        """
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections)
+        self.media_cache = media_cache or MediaCache()
+        self._accounts: Dict[str, TwitterIntegration] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        name: str,
+        consumer_key: str,
+        consumer_secret: str,
+        access_token: str,
+        access_token_secret: str,
+    ) -> TwitterIntegration:
+        """Register an account and return its client."""
+        integration = TwitterIntegration(
+            consumer_key=consumer_key,
+            consumer_secret=consumer_secret,
+            access_token=access_token,
+            access_token_secret=access_token_secret,
+            media_cache=self.media_cache,
+            adapter=self.adapter,
+        )
+        with self._lock:
+            self._accounts[name] = integration
+        return integration
+
+    def add_from_env_file(self, name: str, env_file: str) -> TwitterIntegration:
+        """Register an account from the X_* variables of a .env file."""
+        values = dotenv_values(env_file)
+        return self.add(
+            name,
+            consumer_key=values.get("X_CONSUMER_KEY"),
+            consumer_secret=values.get("X_CONSUMER_SECRET"),
+            access_token=values.get("X_ACCESS_TOKEN"),
+            access_token_secret=values.get("X_ACCESS_TOKEN_SECRET"),
+        )
+
+    def get(self, name: str) -> TwitterIntegration:
+        """Return the client of a registered account."""
+        try:
+            return self._accounts[name]
+        except KeyError:
+            raise KeyError(f"Unknown X account: {name}") from None
+
+    def names(self) -> List[str]:
+        """Return the names of all registered accounts."""
+        return list(self._accounts)
+
+    def available(self, endpoint: str = POST_TWEET_ENDPOINT) -> List[str]:
+        """Return the accounts that are not rate limited on an endpoint."""
+        return [
+            name
+            for name, integration in list(self._accounts.items())
+            if not integration.rate_limit_wait(endpoint)
+        ]
+
+    def close(self):
+        """Close the shared connections."""
+        self.adapter.close()
+
+    def __getitem__(self, name: str) -> TwitterIntegration:
+        return self.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._accounts
+
+    def __len__(self) -> int:
+        return len(self._accounts)
@@ -0,0 +1,222 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Collection, Dict, List, Optional
+
+# Job states:
+#   queued   accepted and waiting for a worker
+#   running  claimed by a worker; see recover() if the daemon stops first
+#   done     the action returned a result (which may itself report failure)
+#   failed   the action raised or could not be started
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    persona TEXT NOT NULL,
+    action TEXT NOT NULL,
+    params TEXT,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created_at);
+"""
+
+
+class JobQueue:
+    """
+    Persistent queue of agent jobs, in SQLite.
+
+    Jobs are stored when they are accepted, so the daemon can be restarted
+    without losing work: recover() settles the jobs that were running when
+    it stopped.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Database file; created with its parent directory if missing
+        """
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def submit(
+        self, persona: str, action: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue a job and return it; its "key" is the job id.
+
+        Args:
+            persona: Name of the persona to run the job as
+            action: Agent method to call
+            params: Keyword arguments for the method
+        """
+        now = time.time()
+        job = {
+            "key": uuid.uuid4().hex,
+            "persona": persona,
+            "action": action,
+            "params": json.dumps(params or {}),
+            "state": QUEUED,
+            "created_at": now,
+            "updated_at": now,
+        }
+        columns = ", ".join(job)
+        placeholders = ", ".join(f":{name}" for name in job)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO jobs ({columns}) VALUES ({placeholders})", job
+            )
+        return self.get(job["key"])
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the job with the given id, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE key = ?", (key,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job as running and return it, or None."""
+        # SELECT then UPDATE in one write transaction rather than UPDATE ...
+        # RETURNING, which needs SQLite 3.35
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE state = ? ORDER BY created_at LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ?",
+                (RUNNING, time.time(), row["id"]),
+            )
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE id = ?", (row["id"],)
+            ).fetchone()
+        return self._to_dict(row)
+
+    def _finish(self, key: str, state: str, **fields) -> bool:
+        fields.update(state=state, updated_at=time.time())
+        assignments = ", ".join(f"{name} = :{name}" for name in fields)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE key = :key AND state = :running",
+                {**fields, "key": key, "running": RUNNING},
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, key: str, result: Dict[str, Any]) -> bool:
+        """Record the result of a running job."""
+        return self._finish(key, DONE, result=json.dumps(result, default=str))
+
+    def fail(self, key: str, error: str) -> bool:
+        """Record that a running job failed."""
+        return self._finish(key, FAILED, error=error)
+
+    def recover(self, requeue: Collection[str] = ()) -> Dict[str, int]:
+        """
+        Settle jobs left running by a stopped daemon.
+
+        Jobs whose action is in requeue are safe to run again and are queued;
+        the others may have had side effects (such as a published post), so
+        they are marked failed rather than repeated.
+
+        Returns:
+            Number of jobs "queued" again and "failed"
+        """
+        now = time.time()
+        actions = list(requeue)
+        placeholders = ", ".join("?" for _ in actions)
+        with self._lock, self._conn:
+            queued = self._conn.execute(
+                f"UPDATE jobs SET state = ?, updated_at = ? "
+                f"WHERE state = ? AND action IN ({placeholders})",
+                (QUEUED, now, RUNNING, *actions),
+            ).rowcount
+            failed = self._conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE state = ?",
+                (
+                    FAILED,
+                    "Interrupted by a shutdown; it may have completed (see the outbox)",
+                    now,
+                    RUNNING,
+                ),
+            ).rowcount
+        return {"queued": queued, "failed": failed}
+
+    def jobs(
+        self,
+        state: Optional[str] = None,
+        persona: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Return the most recent jobs, newest first."""
+        sql = "SELECT * FROM jobs WHERE 1 = 1"
+        params: List[Any] = []
+        if state is not None:
+            sql += " AND state = ?"
+            params.append(state)
+        if persona is not None:
+            sql += " AND persona = ?"
+            params.append(persona)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of jobs in each state."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ).fetchall()
+        return {state: count for state, count in rows}
+
+    def prune(self, max_age: float) -> int:
+        """Delete finished jobs older than max_age seconds."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM jobs WHERE state IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, time.time() - max_age),
+            ).rowcount
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["params"] = json.loads(job["params"] or "{}")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,229 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Entry states:
+#   pending     persisted and ready to publish
+#   publishing  a publish attempt started and has not finished; after a
+#               crash or an ambiguous failure it is in doubt and must be
+#               reconciled against the timeline before it is retried
+#   published   X accepted the post
+#   failed      X rejected the post or it ran out of attempts
+PENDING = "pending"
+PUBLISHING = "publishing"
+PUBLISHED = "published"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    persona TEXT NOT NULL,
+    account_id TEXT,
+    kind TEXT NOT NULL,
+    text TEXT NOT NULL,
+    media_paths TEXT,
+    in_reply_to TEXT,
+    details TEXT,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    tweet_id TEXT,
+    media_id TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_state ON outbox (state, persona, created_at);
+"""
+
+
+class Outbox:
+    """
+    Write-ahead outbox for posts, in SQLite.
+
+    Generated content is stored before any publish attempt, and every
+    attempt is recorded before the API is called. A crash therefore never
+    loses content, and an attempt whose outcome is unknown stays in the
+    "publishing" state until it is reconciled against the account timeline,
+    so a retry never double-posts.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Database file; created with its parent directory if missing
+        """
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Entries must survive a power loss, not just a process crash
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(
+        self,
+        text: str,
+        persona: str,
+        account_id: Optional[str] = None,
+        kind: str = "text",
+        media_paths: Optional[List[str]] = None,
+        in_reply_to: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Persist a post before publishing it.
+
+        Args:
+            text: Tweet text
+            persona: Name of the persona posting it
+            account_id: X account the post is for
+            kind: "text", "image" or "gallery"
+            media_paths: Local files to attach
+            in_reply_to: Tweet id this post replies to
+            details: Extra data kept for the post history (prompt, scene, ...)
+
+        Returns:
+            The new entry; its "key" is the idempotency key of the post
+        """
+        now = time.time()
+        entry = {
+            "key": uuid.uuid4().hex,
+            "persona": persona,
+            "account_id": account_id,
+            "kind": kind,
+            "text": text,
+            "media_paths": json.dumps(media_paths or []),
+            "in_reply_to": str(in_reply_to) if in_reply_to is not None else None,
+            "details": json.dumps(details or {}),
+            "state": PENDING,
+            "created_at": now,
+            "updated_at": now,
+        }
+        columns = ", ".join(entry)
+        placeholders = ", ".join(f":{name}" for name in entry)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO outbox ({columns}) VALUES ({placeholders})", entry
+            )
+        return self.get(entry["key"])
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the entry with the given key, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM outbox WHERE key = ?", (key,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def _update(self, key: str, state: str, expected: str, **fields) -> bool:
+        """Move an entry from the expected state; False if it was not in it."""
+        fields.update(state=state, updated_at=time.time())
+        assignments = ", ".join(f"{name} = :{name}" for name in fields)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE outbox SET {assignments} "
+                "WHERE key = :key AND state = :expected",
+                {**fields, "key": key, "expected": expected},
+            )
+        return cursor.rowcount == 1
+
+    def begin(self, key: str) -> bool:
+        """
+        Record the start of a publish attempt.
+
+        Returns False if the entry is not pending (another worker claimed
+        it, or it was already published), in which case it must not be
+        published.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET state = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE key = ? AND state = ?",
+                (PUBLISHING, time.time(), key, PENDING),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, key: str, tweet_id: str, media_id: Optional[str] = None) -> bool:
+        """Record that X accepted the post."""
+        return self._update(
+            key,
+            PUBLISHED,
+            PUBLISHING,
+            tweet_id=str(tweet_id),
+            media_id=str(media_id) if media_id is not None else None,
+            error=None,
+        )
+
+    def fail(self, key: str, error: str, retry: bool = True) -> bool:
+        """Record a failed attempt that X definitely did not publish."""
+        return self._update(key, PENDING if retry else FAILED, PUBLISHING, error=error)
+
+    def mark_in_doubt(self, key: str, error: str) -> bool:
+        """Record an attempt whose outcome is unknown (such as a timeout)."""
+        return self._update(key, PUBLISHING, PUBLISHING, error=error)
+
+    def abandon(self, key: str, error: str) -> bool:
+        """Give up on a pending entry."""
+        return self._update(key, FAILED, PENDING, error=error)
+
+    def release(self, key: str) -> bool:
+        """Return an in-doubt entry to pending after reconciliation."""
+        return self._update(key, PENDING, PUBLISHING)
+
+    def entries(
+        self,
+        state: str,
+        persona: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return entries in a state, oldest first."""
+        sql = "SELECT * FROM outbox WHERE state = ?"
+        params: List[Any] = [state]
+        if persona is not None:
+            sql += " AND persona = ?"
+            params.append(persona)
+        sql += " ORDER BY created_at"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def in_doubt(self, persona: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return entries whose last publish attempt never finished."""
+        return self.entries(PUBLISHING, persona)
+
+    def prune(self, max_age: float) -> int:
+        """Delete published and failed entries older than max_age seconds."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM outbox WHERE state IN (?, ?) AND updated_at < ?",
+                (PUBLISHED, FAILED, time.time() - max_age),
+            ).rowcount
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        entry = dict(row)
+        entry["media_paths"] = json.loads(entry["media_paths"] or "[]")
+        entry["details"] = json.loads(entry["details"] or "{}")
+        return entry
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "Outbox":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
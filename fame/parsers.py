@@ -1,32 +1,282 @@
 import re
 from typing import Dict, List, Any, Tuple
+from .utils.keyword_matcher import KeywordMatcher
 
+# Keyword tables shared by the persona parsers. Matching is plain substring
+# matching on the lowercased description, in the order the tables are listed.
+MOOD_KEYWORDS = {
+    "excited": (0.8, ["excited", "thrilled", "enthusiastic", "energetic"]),
+    "happy": (0.7, ["happy", "joyful", "pleased", "delighted"]),
+    "optimistic": (0.6, ["optimistic", "hopeful", "positive", "confident"]),
+    "calm": (0.5, ["calm", "peaceful", "relaxed", "serene"]),
+    "neutral": (0.5, ["neutral", "balanced", "steady", "composed"]),
+    "thoughtful": (0.4, ["thoughtful", "contemplative", "reflective"]),
+    "serious": (0.3, ["serious", "focused", "determined", "resolute"]),
+    "concerned": (0.2, ["concerned", "worried", "anxious", "uneasy"]),
+}
+
+EMOTION_KEYWORDS = {
+    "passionate": ["passionate", "zealous", "ardent"],
+    "curious": ["curious", "inquisitive", "interested"],
+    "patient": ["patient", "understanding", "tolerant"],
+    "encouraging": ["encouraging", "supportive", "motivating"],
+    "analytical": ["analytical", "logical", "methodical"],
+    "creative": ["creative", "innovative", "imaginative"],
+    "friendly": ["friendly", "approachable", "welcoming"],
+    "professional": ["professional", "formal", "composed"],
+}
+
+SPECIALTY_INDICATORS = {
+    "ai_ml": [
+        "machine learning",
+        "artificial intelligence",
+        "neural networks",
+        "ai/ml",
+    ],
+    "sustainability": [
+        "sustainable",
+        "green tech",
+        "eco-friendly",
+        "carbon footprint",
+    ],
+    "business": ["startup", "entrepreneurship", "business", "scaling"],
+    "technology": ["computing", "algorithms", "tech solutions", "architecture"],
+    "innovation": ["innovation", "research", "development", "patents"],
+    "physics": ["quantum mechanics", "relativity", "particle physics"],
+    "teaching": ["education", "teaching", "instruction"],
+    "research": ["research", "investigation", "study"],
+}
+
+EXPERIENCE_INDICATORS = {
+    "expert": ["expert", "advanced", "seasoned", "veteran"],
+    "intermediate": ["experienced", "proficient", "skilled"],
+    "beginner": ["junior", "beginning", "learning"],
+}
+
+# Earlier groups win; within a group the leftmost occurrence wins
+ROLE_GROUPS = [
+    ["founder", "ceo", "owner", "executive", "leader"],
+    ["professor", "teacher", "instructor", "researcher", "scientist"],
+    ["engineer", "developer", "architect"],
+    ["phd", "doctorate", "master"],
+]
+
+# Phrases followed by a clause that runs up to the next period
+EXPERTISE_TRIGGERS = ["expert in ", "specialized in ", "expertise in "]
+FIELD_TRIGGERS = ["phd in ", "ms in ", "master in ", "specializing in "]
+
+TRAIT_KEYWORDS = ["friendly", "outgoing", "shy", "creative", "analytical"]
+INTEREST_KEYWORDS = ["likes", "enjoys", "interested", "passionate"]
+
+BASIC_MOOD_KEYWORDS = {
+    "happy": 0.8,
+    "sad": -0.5,
+    "angry": -0.8,
+    "excited": 1.0,
+    "neutral": 0.0,
+}
+
+# Patterns applied right after a trigger keyword, e.g. "skill" + "s in dancing"
+_FOLLOWING_WORD = re.compile(r"\s+(\w+)")
+_FOLLOWING_SKILL = re.compile(r"s?\s+in\s+(\w+)")
+_FOLLOWING_KNOWLEDGE = re.compile(r"\s+in\s+(\w+)")
+_TRAIT_WORDS = frozenset(TRAIT_KEYWORDS)
+
+
+def _keyword_entries(table: str) -> List[Tuple[str, Tuple[str, str, int]]]:
+    """Return (keyword, (table, label, rank)) entries for one keyword table."""
+    if table == "mood":
+        groups = [(mood, kws) for mood, (_, kws) in MOOD_KEYWORDS.items()]
+    elif table == "emotion":
+        groups = list(EMOTION_KEYWORDS.items())
+    elif table == "specialty":
+        groups = list(SPECIALTY_INDICATORS.items())
+    elif table == "experience":
+        groups = list(EXPERIENCE_INDICATORS.items())
+    elif table == "role":
+        # Each role word is its own label, ranked by its group
+        return [
+            (kw, (table, kw, rank))
+            for rank, kws in enumerate(ROLE_GROUPS)
+            for kw in kws
+        ]
+    elif table == "expertise":
+        groups = [(kw, [kw]) for kw in EXPERTISE_TRIGGERS]
+    elif table == "field":
+        groups = [(kw, [kw]) for kw in FIELD_TRIGGERS]
+    elif table == "interest":
+        groups = [(kw, [kw]) for kw in INTEREST_KEYWORDS]
+    elif table == "basic_mood":
+        groups = [(kw, [kw]) for kw in BASIC_MOOD_KEYWORDS]
+    elif table in ("skill", "knowledge"):
+        groups = [(table, [table])]
+    else:
+        raise ValueError(f"Unknown keyword table: {table}")
+
+    return [
+        (kw, (table, label, rank))
+        for rank, (label, kws) in enumerate(groups)
+        for kw in kws
+    ]
 
-def extract_traits_from_text(text: str) -> Tuple[List[str], List[str]]:
-    """Extract personality traits and interests from text description."""
-    # Basic trait extraction (this could be enhanced with NLP)
-    traits = []
-    interests = []
 
-    # Look for common descriptive words
-    words = text.lower().split()
+def build_persona_matcher(*tables: str) -> KeywordMatcher:
+    """Compile the given keyword tables into one matcher."""
+    return KeywordMatcher(
+        entry for table in tables for entry in _keyword_entries(table)
+    )
 
-    # Simple trait keywords
-    trait_keywords = ["friendly", "outgoing", "shy", "creative", "analytical"]
-    interest_keywords = ["likes", "enjoys", "interested", "passionate"]
 
-    for word in words:
-        if word in trait_keywords:
-            traits.append(word)
+# One precompiled matcher per parser, each scanning its text in a single pass
+MOOD_MATCHER = build_persona_matcher("mood", "emotion")
+ABILITY_MATCHER = build_persona_matcher(
+    "expertise", "field", "specialty", "experience", "role"
+)
+FACET_MATCHER = build_persona_matcher("interest")
+SKILL_MATCHER = build_persona_matcher("skill", "knowledge")
+BASIC_MOOD_MATCHER = build_persona_matcher("basic_mood")
+PERSONA_MATCHER = build_persona_matcher(
+    "mood", "emotion", "expertise", "field", "specialty", "experience", "role"
+)
 
-    # Extract interests (words after "likes", "enjoys", etc.)
+
+def scan_persona_text(
+    text: str, matcher: KeywordMatcher = PERSONA_MATCHER
+) -> Tuple[str, Dict[str, List[Tuple[int, int, str, int]]]]:
+    """
+    Lowercase a persona description and collect all keyword hits in one pass.
+
+    Returns:
+        Tuple of (lowercased text, hits grouped by table), where each hit is
+        (start, end, label, rank)
+    """
     text_lower = text.lower()
-    for keyword in interest_keywords:
-        if keyword in text_lower:
-            # Find the word after the keyword
-            pattern = f"{keyword}\s+(\w+)"
-            matches = re.findall(pattern, text_lower)
-            interests.extend(matches)
+    hits: Dict[str, List[Tuple[int, int, str, int]]] = {}
+    for start, end, _, tags in matcher.iter_matches(text_lower):
+        for table, label, rank in tags:
+            hits.setdefault(table, []).append((start, end, label, rank))
+    return text_lower, hits
+
+
+def _labels_in_order(hits: List[Tuple[int, int, str, int]]) -> List[str]:
+    """Return the distinct labels that were hit, in table order."""
+    ranked = {(rank, label) for _, _, label, rank in hits}
+    return [label for _, label in sorted(ranked)]
+
+
+def _clauses_after(
+    text: str, hits: List[Tuple[int, int, str, int]], first_only: bool
+) -> List[Tuple[int, str]]:
+    """
+    Capture the text after each trigger up to the next period.
+
+    Returns (rank, clause) pairs in table order; with first_only, only the
+    leftmost clause per trigger is kept.
+    """
+    clauses = []
+    last_end: Dict[int, int] = {}
+    for start, end, _, rank in sorted(hits, key=lambda hit: (hit[3], hit[0])):
+        if start < last_end.get(rank, 0) or (first_only and rank in last_end):
+            continue
+        clause_end = text.find(".", end)
+        if clause_end == -1:
+            clause_end = len(text)
+        if clause_end == end:
+            continue
+        clauses.append((rank, text[end:clause_end]))
+        last_end[rank] = clause_end
+    return clauses
+
+
+def _words_after(
+    text: str, hits: List[Tuple[int, int, str, int]], pattern: "re.Pattern"
+) -> List[str]:
+    """Capture the word a pattern finds right after each trigger, in table order."""
+    words = []
+    last_end: Dict[int, int] = {}
+    for start, end, _, rank in sorted(hits, key=lambda hit: (hit[3], hit[0])):
+        if start < last_end.get(rank, 0):
+            continue
+        match = pattern.match(text, end)
+        if match:
+            words.append(match.group(1))
+            last_end[rank] = match.end()
+    return words
+
+
+def _mood_features(text: str, hits: Dict[str, list]) -> Dict[str, Any]:
+    """Derive mood, intensity and emotional states from scanned hits."""
+    # The mood with the most distinct keywords wins; ties go to the earlier mood
+    keywords_by_mood: Dict[str, set] = {}
+    for start, end, mood, _ in hits.get("mood", []):
+        keywords_by_mood.setdefault(mood, set()).add(text[start:end])
+    best_mood, best_intensity, max_matches = "neutral", 0.5, 0
+    for mood, (intensity, _) in MOOD_KEYWORDS.items():
+        matches = len(keywords_by_mood.get(mood, ()))
+        if matches > max_matches:
+            best_mood, best_intensity, max_matches = mood, intensity, matches
+
+    return {
+        "current_mood": best_mood,
+        "mood_intensity": best_intensity,
+        "emotional_state": _labels_in_order(hits.get("emotion", [])),
+    }
+
+
+def _ability_features(text: str, hits: Dict[str, list]) -> Dict[str, Any]:
+    """Derive expertise, field, specialties, experience and role from hits."""
+    expertise = []
+    for _, clause in _clauses_after(text, hits.get("expertise", []), False):
+        expertise.extend(exp.strip() for exp in clause.split(","))
+
+    field_clauses = _clauses_after(text, hits.get("field", []), True)
+    primary_field = field_clauses[0][1].strip() if field_clauses else None
+
+    experience = _labels_in_order(hits.get("experience", []))
+
+    role = None
+    role_hits = hits.get("role")
+    if role_hits:
+        role = min(role_hits, key=lambda hit: (hit[3], hit[0]))[2]
+
+    return {
+        "expertise": expertise,
+        "primary_field": primary_field,
+        "specialties": _labels_in_order(hits.get("specialty", [])),
+        "experience_level": experience[0] if experience else None,
+        "role": role,
+    }
+
+
+def extract_mood_features(description: str) -> Dict[str, Any]:
+    """Extract mood, intensity and emotional states from a mood description."""
+    return _mood_features(*scan_persona_text(description, MOOD_MATCHER))
+
+
+def extract_ability_features(description: str) -> Dict[str, Any]:
+    """
+    Extract expertise, primary field, specialties, experience level and role.
+
+    Fields that are not mentioned in the description are returned as None.
+    """
+    return _ability_features(*scan_persona_text(description, ABILITY_MATCHER))
+
+
+def extract_persona_features(text: str) -> Dict[str, Any]:
+    """Extract mood, emotion and ability features from one text in one pass."""
+    text_lower, hits = scan_persona_text(text, PERSONA_MATCHER)
+    features = _mood_features(text_lower, hits)
+    features.update(_ability_features(text_lower, hits))
+    return features
+
+
+def extract_traits_from_text(text: str) -> Tuple[List[str], List[str]]:
+    """Extract personality traits and interests from text description."""
+    text_lower, hits = scan_persona_text(text, FACET_MATCHER)
+
+    # Traits are whole words; interests are the word after "likes", "enjoys", etc.
+    traits = [word for word in text_lower.split() if word in _TRAIT_WORDS]
+    interests = _words_after(text_lower, hits.get("interest", []), _FOLLOWING_WORD)
 
     return traits, interests
 
@@ -46,17 +296,16 @@ def parse_facets_of_personality(text: str) -> Dict[str, Any]:
 
 def parse_abilities_knowledge(text: str) -> Dict[str, Any]:
     """Parse abilities and knowledge description into structured data."""
+    text_lower, hits = scan_persona_text(text, SKILL_MATCHER)
+
     # Extract skills (words after "skills in" or similar patterns)
-    skills = []
-    skill_pattern = r"skills?\s+in\s+(\w+)"
-    matches = re.findall(skill_pattern, text.lower())
-    skills.extend(matches)
+    skills = _words_after(text_lower, hits.get("skill", []), _FOLLOWING_SKILL)
 
     # Extract knowledge areas
     knowledge = {}
-    knowledge_pattern = r"knowledge\s+in\s+(\w+)"
-    matches = re.findall(knowledge_pattern, text.lower())
-    for area in matches:
+    for area in _words_after(
+        text_lower, hits.get("knowledge", []), _FOLLOWING_KNOWLEDGE
+    ):
         knowledge[area] = "basic"  # Default level
 
     return {"skills": skills, "domain_knowledge": knowledge}
@@ -64,24 +313,15 @@ def parse_abilities_knowledge(text: str) -> Dict[str, Any]:
 
 def parse_mood_emotions(text: str) -> Dict[str, Any]:
     """Parse mood and emotions description into structured data."""
-    # Basic mood keywords
-    mood_keywords = {
-        "happy": 0.8,
-        "sad": -0.5,
-        "angry": -0.8,
-        "excited": 1.0,
-        "neutral": 0.0,
-    }
+    _, hits = scan_persona_text(text, BASIC_MOOD_MATCHER)
 
     current_mood = "neutral"
     mood_intensity = 0.0
 
-    text_lower = text.lower()
-    for mood, intensity in mood_keywords.items():
-        if mood in text_lower:
-            current_mood = mood
-            mood_intensity = intensity
-            break
+    moods = _labels_in_order(hits.get("basic_mood", []))
+    if moods:
+        current_mood = moods[0]
+        mood_intensity = BASIC_MOOD_KEYWORDS[current_mood]
 
     return {
         "current_mood": current_mood,
@@ -0,0 +1,214 @@
+import csv
+import json
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from fame.core.abilities_and_knowledge import AbilitiesAndKnowledge
+from fame.core.facets_of_personality import FacetsOfPersonality
+from fame.core.mood_and_emotions import MoodAndEmotions
+from fame.parsers import parse_facets_of_personality
+
+SNAPSHOT_MAGIC = b"FAMESNP1"
+
+# magic, record count, byte offset of the JSON name index
+_HEADER = struct.Struct("<8sIQ")
+
+DESCRIPTION_FIELDS = ("facets_of_personality", "abilities_knowledge", "mood_emotions")
+DEMOGRAPHIC_FIELDS = ("age", "gender", "ethnicity")
+
+
+def load_persona_definitions(path: str) -> List[Dict[str, Any]]:
+    """
+    Read persona definitions from a JSONL or CSV file.
+
+    Each record needs facets_of_personality, abilities_knowledge and
+    mood_emotions, plus an optional name, profile_image_path and either a
+    demographics object or age/gender/ethnicity columns.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            records = list(csv.DictReader(f))
+    else:
+        with open(path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    for index, record in enumerate(records):
+        missing = [name for name in DESCRIPTION_FIELDS if not record.get(name)]
+        if missing:
+            raise ValueError(
+                f"Persona {index} in {path} is missing: {', '.join(missing)}"
+            )
+        record.setdefault("name", str(index))
+
+        # Accept flat demographic columns as well as a nested object
+        if not record.get("demographics") and all(
+            record.get(name) for name in DEMOGRAPHIC_FIELDS
+        ):
+            record["demographics"] = {
+                name: record[name].lower() for name in DEMOGRAPHIC_FIELDS
+            }
+
+    return records
+
+
+def compile_persona(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse one persona definition into its precompiled snapshot form."""
+    abilities = AbilitiesAndKnowledge(record["abilities_knowledge"])
+    mood = MoodAndEmotions(record["mood_emotions"])
+
+    return {
+        "name": str(record["name"]),
+        "facets_of_personality": record["facets_of_personality"],
+        "abilities_knowledge": record["abilities_knowledge"],
+        "mood_emotions": record["mood_emotions"],
+        "profile_image_path": record.get("profile_image_path") or None,
+        "facets": parse_facets_of_personality(record["facets_of_personality"]),
+        "abilities": abilities.get_knowledge_context(),
+        "mood": mood.get_mood_context(),
+        "demographics": record.get("demographics") or None,
+    }
+
+
+def _finalize_persona(compiled: Dict[str, Any], llm=None) -> Dict[str, Any]:
+    """
+    Resolve missing demographics and render the personality prompt prefix.
+
+    Demographics that are not given and cannot be resolved (no llm, or the
+    lookup failed) stay None, so the Agent resolves them when it loads the
+    persona.
+    """
+    demographics = compiled["demographics"]
+    if demographics is None and llm is None:
+        demographics = {}
+
+    # With no demographics given, FacetsOfPersonality asks the LLM for them
+    facets = FacetsOfPersonality(
+        description=compiled["facets_of_personality"],
+        llm=llm,
+        demographics=demographics,
+    )
+    compiled["demographics"] = facets.demographics or None
+    compiled["personality_context"] = facets.get_personality_context()
+    return compiled
+
+
+def build_persona_snapshot(
+    source: str,
+    output: str,
+    llm=None,
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    llm_concurrency: int = 8,
+) -> int:
+    """
+    Parse persona definitions in a process pool and write a snapshot file.
+
+    Args:
+        source: JSONL or CSV file of persona definitions
+        output: Path of the snapshot file to write
+        llm: Optional OpenRouter integration used to resolve demographics
+            for personas that do not provide them; without one they are
+            resolved by the Agent that loads the persona
+        workers: Number of parser processes (defaults to the CPU count)
+        chunksize: Personas sent to a worker process at a time
+        llm_concurrency: Concurrent demographic lookups when llm is given
+
+    Returns:
+        Number of personas written
+    """
+    records = load_persona_definitions(source)
+
+    print(f"\nParsing {len(records)} personas...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        compiled = list(pool.map(compile_persona, records, chunksize=chunksize))
+
+    # Demographic lookups are network-bound, so they run on threads
+    with ThreadPoolExecutor(max_workers=llm_concurrency) as pool:
+        compiled = list(pool.map(lambda c: _finalize_persona(c, llm), compiled))
+
+    write_persona_snapshot(compiled, output)
+    print(f"Wrote snapshot with {len(compiled)} personas to: {output}")
+    return len(compiled)
+
+
+def write_persona_snapshot(personas: List[Dict[str, Any]], output: str) -> None:
+    """Write compiled personas as one snapshot file with a name index."""
+    index = {}
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, 0, 0))
+        for persona in personas:
+            if persona["name"] in index:
+                raise ValueError(f"Duplicate persona name: {persona['name']}")
+            data = json.dumps(persona, separators=(",", ":")).encode("utf-8")
+            index[persona["name"]] = (f.tell(), len(data))
+            f.write(data)
+
+        index_offset = f.tell()
+        f.write(json.dumps(index, separators=(",", ":")).encode("utf-8"))
+        f.seek(0)
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, len(index), index_offset))
+
+    # Replace atomically so readers never map a half-written snapshot
+    os.replace(tmp_path, output)
+
+
+class PersonaSnapshot:
+    """
+    Read-only, memory-mapped view of a persona snapshot file.
+
+    The file is mapped rather than read, so any number of worker processes
+    opening the same snapshot share one copy in the OS page cache. Records
+    are decoded only when requested.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, index_offset = _HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"Not a persona snapshot: {path}")
+
+        self._index = json.loads(self._map[index_offset:].decode("utf-8"))
+        if len(self._index) != count:
+            self.close()
+            raise ValueError(f"Corrupt persona snapshot index: {path}")
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def names(self) -> List[str]:
+        """Return the names of all personas in the snapshot."""
+        return list(self._index)
+
+    def get(self, name: str) -> Dict[str, Any]:
+        """Return the compiled persona with the given name."""
+        if name not in self._index:
+            raise KeyError(f"Persona not found in snapshot: {name}")
+        offset, length = self._index[name]
+        return json.loads(self._map[offset : offset + length].decode("utf-8"))
+
+    def close(self):
+        """Unmap the snapshot and close the file."""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "PersonaSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,282 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    persona TEXT NOT NULL,
+    account_id TEXT,
+    tweet_id TEXT UNIQUE,
+    in_reply_to TEXT,
+    media_id TEXT,
+    kind TEXT NOT NULL,
+    text TEXT NOT NULL,
+    prompt TEXT,
+    model TEXT,
+    scene TEXT,
+    image_path TEXT,
+    mood TEXT,
+    mood_intensity REAL,
+    created_at REAL NOT NULL,
+    deleted_at REAL,
+    metrics TEXT,
+    metrics_updated_at REAL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS posts_persona_time ON posts (persona, created_at);
+CREATE INDEX IF NOT EXISTS posts_time ON posts (created_at);
+"""
+
+# Columns a caller may set when recording a post
+POST_FIELDS = (
+    "persona",
+    "account_id",
+    "tweet_id",
+    "in_reply_to",
+    "media_id",
+    "kind",
+    "text",
+    "prompt",
+    "model",
+    "scene",
+    "image_path",
+    "mood",
+    "mood_intensity",
+    "created_at",
+    "extra",
+)
+
+
+class PostHistory:
+    """
+    Local record of everything the agents published, in SQLite.
+
+    The database runs in WAL mode, so readers (analytics, dedupe jobs) never
+    block the agent recording a post. Rows are indexed by persona and time
+    and by tweet id.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Database file; created with its parent directory if missing
+        """
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def record(self, text: str, persona: str, **fields) -> int:
+        """
+        Record a published post and return its row id.
+
+        Args:
+            text: Posted text
+            persona: Name of the persona that posted it
+            **fields: Any other column in POST_FIELDS, such as tweet_id,
+                media_id, prompt, model, scene, image_path or mood; extra
+                is a dict for anything else (e.g. every image of a gallery)
+        """
+        unknown = set(fields) - set(POST_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown post fields: {', '.join(sorted(unknown))}")
+
+        values = {"kind": "text", "created_at": time.time(), **fields}
+        values.update(text=text, persona=persona)
+        if values.get("tweet_id") is not None:
+            values["tweet_id"] = str(values["tweet_id"])
+        if values.get("media_id") is not None:
+            values["media_id"] = str(values["media_id"])
+        if values.get("extra") is not None:
+            values["extra"] = json.dumps(values["extra"])
+
+        columns = ", ".join(values)
+        placeholders = ", ".join(f":{name}" for name in values)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"INSERT INTO posts ({columns}) VALUES ({placeholders})", values
+            )
+        return cursor.lastrowid
+
+    def get(self, tweet_id: str) -> Optional[Dict[str, Any]]:
+        """Return the post with the given tweet id, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM posts WHERE tweet_id = ?", (str(tweet_id),)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def _where(
+        self,
+        persona: Optional[str],
+        since: Optional[float],
+        until: Optional[float],
+        kind: Optional[str],
+        include_deleted: bool,
+    ):
+        """Build the WHERE clause shared by query() and count()."""
+        clauses, params = [], []
+        if persona is not None:
+            clauses.append("persona = ?")
+            params.append(persona)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if not include_deleted:
+            clauses.append("deleted_at IS NULL")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(
+        self,
+        persona: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        kind: Optional[str] = None,
+        include_deleted: bool = False,
+        limit: Optional[int] = 100,
+        newest_first: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return posts matching the filters.
+
+        Args:
+            persona: Only posts by this persona
+            since: Only posts created at or after this Unix time
+            until: Only posts created before this Unix time
+            kind: Only posts of this kind ("text", "image" or "gallery")
+            include_deleted: Include posts marked as deleted
+            limit: Maximum number of posts; None for all
+            newest_first: Order by creation time, newest first
+        """
+        where, params = self._where(persona, since, until, kind, include_deleted)
+        sql = f"SELECT * FROM posts{where} ORDER BY created_at "
+        sql += "DESC" if newest_first else "ASC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def count(
+        self,
+        persona: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        kind: Optional[str] = None,
+        include_deleted: bool = False,
+    ) -> int:
+        """Return the number of posts matching the filters."""
+        where, params = self._where(persona, since, until, kind, include_deleted)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM posts{where}", params
+            ).fetchone()[0]
+
+    def mark_deleted(self, tweet_ids: Iterable[str]) -> int:
+        """Mark posts as deleted on X; returns the number of posts updated."""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "UPDATE posts SET deleted_at = ? WHERE tweet_id = ?",
+                [(now, str(tweet_id)) for tweet_id in tweet_ids],
+            )
+        return cursor.rowcount
+
+    def update_metrics(self, metrics: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Store engagement metrics fetched from the API.
+
+        Args:
+            metrics: Mapping of tweet id to its metrics (likes, reposts, ...)
+
+        Returns:
+            Number of posts updated
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "UPDATE posts SET metrics = ?, metrics_updated_at = ? "
+                "WHERE tweet_id = ?",
+                [
+                    (json.dumps(values), now, str(tweet_id))
+                    for tweet_id, values in metrics.items()
+                ],
+            )
+        return cursor.rowcount
+
+    def prune(
+        self,
+        max_age: Optional[float] = None,
+        keep_per_persona: Optional[int] = None,
+    ) -> int:
+        """
+        Delete old rows from the store (not from X).
+
+        Args:
+            max_age: Delete posts older than this many seconds
+            keep_per_persona: Keep only this many newest posts per persona
+
+        Returns:
+            Number of rows deleted
+        """
+        deleted = 0
+        with self._lock, self._conn:
+            if max_age is not None:
+                deleted += self._conn.execute(
+                    "DELETE FROM posts WHERE created_at < ?",
+                    (time.time() - max_age,),
+                ).rowcount
+            if keep_per_persona is not None:
+                deleted += self._conn.execute(
+                    "DELETE FROM posts WHERE id IN ("
+                    "  SELECT id FROM ("
+                    "    SELECT id, ROW_NUMBER() OVER ("
+                    "      PARTITION BY persona ORDER BY created_at DESC"
+                    "    ) AS position FROM posts"
+                    "  ) WHERE position > ?"
+                    ")",
+                    (keep_per_persona,),
+                ).rowcount
+        return deleted
+
+    def compact(self):
+        """Fold the WAL into the database and reclaim space from deleted rows."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("VACUUM")
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        post = dict(row)
+        for name in ("metrics", "extra"):
+            if post[name]:
+                post[name] = json.loads(post[name])
+        return post
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "PostHistory":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
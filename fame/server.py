@@ -0,0 +1,478 @@
+import json
+import os
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from fame.agent import Agent
+from fame.integrations.twitter_integration import TwitterAccountPool
+from fame.jobs import JobQueue
+from fame.persona_snapshot import PersonaSnapshot, build_persona_snapshot
+from fame.utils.path_utils import resolve_data_path
+
+# Agent methods a job may call; the job's params are passed as keyword
+# arguments
+ACTIONS = (
+    "post_tweet",
+    "post_image_tweet",
+    "post_gallery_tweet",
+    "post_thread",
+    "post_buffered",
+    "fill_content_buffer",
+    "finalize_buffered",
+    "retry_outbox",
+    "reconcile_outbox",
+)
+
+# Actions that are safe to run again after a crash. The others publish, and
+# their posts are settled by the outbox (retry_outbox) instead of a rerun
+REQUEUE_ACTIONS = (
+    "fill_content_buffer",
+    "finalize_buffered",
+    "retry_outbox",
+    "reconcile_outbox",
+)
+
+# Persona definition files; anything else is read as a persona snapshot
+DEFINITION_SUFFIXES = (".jsonl", ".csv")
+
+DEFAULT_PORT = 8765
+
+
+class PersonaRegistry:
+    """
+    Personas of a snapshot or definitions file, with warm agents.
+
+    An agent is created the first time one of its persona's jobs runs and is
+    kept for later jobs. reload() reads the source again and drops the
+    agents of personas whose definition changed or disappeared; jobs that
+    are already running keep the agent they started with.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        env_file: str = ".env",
+        publisher: Optional[str] = None,
+        accounts_dir: Optional[str] = None,
+        parse_workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            source: Persona snapshot, or a JSONL/CSV file of definitions that
+                is compiled into a snapshot in the data directory
+            env_file: Path to the .env file with API keys
+            publisher: Where posts go (see Agent)
+            accounts_dir: Directory of <persona>.env files with each
+                persona's X credentials; personas without one use env_file
+            parse_workers: Processes used to compile definitions
+        """
+        self.source = source
+        self.env_file = env_file
+        self.publisher = publisher
+        self.accounts_dir = accounts_dir
+        self.parse_workers = parse_workers
+        self.accounts = TwitterAccountPool() if accounts_dir else None
+
+        self._lock = threading.Lock()
+        # The watcher, POST /reload and SIGHUP may reload at once; they would
+        # all write the same temporary snapshot file
+        self._reload_lock = threading.Lock()
+        self._snapshot: Optional[PersonaSnapshot] = None
+        self._source_mtime: Optional[float] = None
+        # name -> (agent, persona record it was created from)
+        self._agents: Dict[str, Tuple[Agent, Dict[str, Any]]] = {}
+        self.reload()
+
+    def _open_snapshot(self) -> PersonaSnapshot:
+        path = self.source
+        if Path(path).suffix.lower() in DEFINITION_SUFFIXES:
+            # Parsing runs in a process pool; the snapshot is replaced
+            # atomically, so agents reading the old one are unaffected
+            path = resolve_data_path("serve", f"{Path(path).stem}.snap")
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            build_persona_snapshot(self.source, path, workers=self.parse_workers)
+        return PersonaSnapshot(path)
+
+    def reload(self) -> int:
+        """
+        Load the persona source again; returns the number of agents dropped.
+
+        Raises on an invalid source, leaving the current personas in place.
+        """
+        with self._reload_lock:
+            mtime = os.path.getmtime(self.source)
+            snapshot = self._open_snapshot()
+            with self._lock:
+                old_snapshot, self._snapshot = self._snapshot, snapshot
+                self._source_mtime = mtime
+                stale = [
+                    name
+                    for name, (_, record) in self._agents.items()
+                    if name not in snapshot or snapshot.get(name) != record
+                ]
+                for name in stale:
+                    del self._agents[name]
+        # Agents keep the record they were created from, not the mapping
+        if old_snapshot is not None:
+            old_snapshot.close()
+        print(f"Loaded {len(snapshot)} personas, {len(stale)} agents reloaded")
+        return len(stale)
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """
+        Reload when the persona source was modified (or when forced);
+        returns whether it was reloaded. Errors are printed, not raised.
+        """
+        try:
+            if not force and os.path.getmtime(self.source) == self._source_mtime:
+                return False
+            self.reload()
+            return True
+        except Exception as e:
+            print(f"Error reloading personas: {str(e)}")
+            return False
+
+    def names(self) -> List[str]:
+        """Return the names of all personas."""
+        with self._lock:
+            return self._snapshot.names()
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._snapshot
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._snapshot)
+
+    @property
+    def warm(self) -> int:
+        """Number of agents currently in memory."""
+        return len(self._agents)
+
+    def agent(self, name: str) -> Agent:
+        """Return the persona's agent, creating it on first use."""
+        with self._lock:
+            if name in self._agents:
+                return self._agents[name][0]
+            record = self._snapshot.get(name)
+
+        agent = Agent(
+            env_file=self.env_file,
+            facets_of_personality=record["facets_of_personality"],
+            abilities_knowledge=record["abilities_knowledge"],
+            mood_emotions=record["mood_emotions"],
+            environment_execution=[],
+            profile_image_path=record["profile_image_path"],
+            compiled_persona=record,
+            name=name,
+            twitter_integration=self._account(name),
+            publisher=self.publisher,
+        )
+        with self._lock:
+            # Another job may have created it meanwhile; keep one agent
+            return self._agents.setdefault(name, (agent, record))[0]
+
+    def _account(self, name: str):
+        if self.accounts is None:
+            return None
+        if name in self.accounts:
+            return self.accounts.get(name)
+        env_file = Path(self.accounts_dir) / f"{name}.env"
+        if not env_file.exists():
+            return None
+        return self.accounts.add_from_env_file(name, str(env_file))
+
+    def close(self):
+        """Close the snapshot and the X clients."""
+        with self._lock:
+            self._agents.clear()
+            if self._snapshot is not None:
+                self._snapshot.close()
+        if self.accounts is not None:
+            self.accounts.close()
+
+
+class FameServer:
+    """
+    Worker daemon that runs queued agent jobs.
+
+    Jobs are persisted in a JobQueue and run by a fixed number of worker
+    threads; agent calls spend their time waiting on the LLM, Replicate and
+    X, so threads keep many jobs in flight. Stopping lets running jobs
+    finish; after a crash, interrupted jobs are settled on the next start
+    (see JobQueue.recover).
+    """
+
+    def __init__(
+        self,
+        registry: PersonaRegistry,
+        queue: JobQueue,
+        workers: int = 8,
+        watch_interval: Optional[float] = 2.0,
+    ):
+        """
+        Args:
+            registry: Personas and their warm agents
+            queue: Persistent job queue
+            workers: Jobs run at once
+            watch_interval: Seconds between checks of the persona source
+                for changes; None to reload only on request
+        """
+        self.registry = registry
+        self.queue = queue
+        self.workers = workers
+        self.watch_interval = watch_interval
+
+        self._stopping = threading.Event()
+        self._wakeup = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """Settle jobs interrupted by the last shutdown and start the workers."""
+        recovered = self.queue.recover(requeue=REQUEUE_ACTIONS)
+        if recovered["queued"]:
+            print(
+                f"Requeued {recovered['queued']} jobs interrupted by the last shutdown"
+            )
+        if recovered["failed"]:
+            print(
+                f"Marked {recovered['failed']} interrupted post jobs failed; "
+                f"run retry_outbox to settle their posts"
+            )
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"fame-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        if self.watch_interval:
+            threading.Thread(target=self._watch, name="fame-watch", daemon=True).start()
+
+    def stop(self):
+        """Stop taking jobs and wait for the running ones to finish."""
+        print("\nStopping workers, waiting for running jobs...")
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join()
+
+    def submit(
+        self, persona: str, action: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Queue a job; raises ValueError for an unknown persona or action."""
+        if action not in ACTIONS:
+            raise ValueError(
+                f"Unknown action '{action}'. Available: {', '.join(ACTIONS)}"
+            )
+        if persona not in self.registry:
+            raise ValueError(f"Unknown persona '{persona}'")
+        if not isinstance(params or {}, dict):
+            raise ValueError("params must be an object")
+        job = self.queue.submit(persona, action, params)
+        self._wakeup.set()
+        return job
+
+    def _work(self):
+        while not self._stopping.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self._wakeup.wait(timeout=1.0)
+                self._wakeup.clear()
+                continue
+            self.run_job(job)
+
+    def run_job(self, job: Dict[str, Any]):
+        """Run a claimed job and record its outcome."""
+        print(f"\nRunning job {job['key']}: {job['action']} as {job['persona']}")
+        try:
+            agent = self.registry.agent(job["persona"])
+            result = getattr(agent, job["action"])(**job["params"])
+            self.queue.complete(job["key"], result)
+        except Exception as e:
+            print(f"Error running job {job['key']}: {str(e)}")
+            self.queue.fail(job["key"], str(e))
+
+    def _watch(self):
+        while not self._stopping.wait(self.watch_interval):
+            self.registry.reload_if_changed()
+
+    def health(self) -> Dict[str, Any]:
+        """Return the daemon's status."""
+        return {
+            "status": "success",
+            "message": "Serving",
+            "personas": len(self.registry),
+            "warm_agents": self.registry.warm,
+            "workers": self.workers,
+            "jobs": self.queue.counts(),
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """JSON job API; see serve() for the routes."""
+
+    server_version = "fame"
+
+    @property
+    def fame(self) -> FameServer:
+        return self.server.fame
+
+    def _send(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str):
+        self._send(status, {"status": "failed", "message": message})
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        return body
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["health"]:
+            self._send(200, self.fame.health())
+        elif parts == ["personas"]:
+            self._send(
+                200, {"status": "success", "personas": self.fame.registry.names()}
+            )
+        elif parts == ["jobs"]:
+            jobs = self.fame.queue.jobs(
+                state=query.get("state"),
+                persona=query.get("persona"),
+                limit=int(query.get("limit", 100)),
+            )
+            self._send(200, {"status": "success", "jobs": jobs})
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self.fame.queue.get(parts[1])
+            if job is None:
+                self._error(404, f"Job not found: {parts[1]}")
+            else:
+                self._send(200, {"status": "success", "job": job})
+        else:
+            self._error(404, f"Not found: {url.path}")
+
+    def do_POST(self):
+        path = urlparse(self.path).path.rstrip("/")
+        try:
+            if path == "/jobs":
+                body = self._read_json()
+                job = self.fame.submit(
+                    body.get("persona", ""), body.get("action", ""), body.get("params")
+                )
+                self._send(
+                    202, {"status": "queued", "message": "Job accepted", "job": job}
+                )
+            elif path == "/reload":
+                reloaded = self.fame.registry.reload()
+                self._send(
+                    200,
+                    {
+                        "status": "success",
+                        "message": f"Reloaded personas, {reloaded} agents replaced",
+                        "reloaded": reloaded,
+                    },
+                )
+            else:
+                self._error(404, f"Not found: {path}")
+        except ValueError as e:
+            self._error(400, str(e))
+        except Exception as e:
+            self._error(500, str(e))
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler logs client_address[0]
+        return request, ("unix", 0)
+
+
+def serve(
+    source: str,
+    env_file: str = ".env",
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+    workers: int = 8,
+    publisher: Optional[str] = None,
+    accounts_dir: Optional[str] = None,
+    watch_interval: Optional[float] = 2.0,
+    parse_workers: Optional[int] = None,
+):
+    """
+    Run the job daemon until SIGINT or SIGTERM.
+
+    Routes (JSON in and out):
+        POST /jobs       {"persona", "action", "params"}: queue a job (202)
+        GET  /jobs       recent jobs; ?state=, ?persona=, ?limit=
+        GET  /jobs/<id>  one job with its state and result
+        GET  /personas   persona names
+        POST /reload     reload the persona source (also on SIGHUP)
+        GET  /health     queue counts and warm agents
+
+    Jobs are kept in the data directory (jobs.db) across restarts.
+    """
+    registry = PersonaRegistry(
+        source,
+        env_file=env_file,
+        publisher=publisher,
+        accounts_dir=accounts_dir,
+        parse_workers=parse_workers,
+    )
+    queue = JobQueue(resolve_data_path("jobs.db"))
+    fame = FameServer(registry, queue, workers=workers, watch_interval=watch_interval)
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        httpd = _UnixHTTPServer(socket_path, _Handler)
+        address = socket_path
+    else:
+        httpd = ThreadingHTTPServer((host, port), _Handler)
+        address = f"http://{host}:{httpd.server_port}"
+    httpd.fame = fame
+
+    def shutdown(signum, frame):
+        # shutdown() waits for serve_forever(), so it cannot run on this thread
+        threading.Thread(target=httpd.shutdown).start()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(
+            signal.SIGHUP,
+            lambda signum, frame: threading.Thread(
+                target=registry.reload_if_changed, args=(True,)
+            ).start(),
+        )
+
+    fame.start()
+    print(f"\nServing {len(registry)} personas on {address}")
+    try:
+        httpd.serve_forever()
+    finally:
+        fame.stop()
+        httpd.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        queue.close()
+        registry.close()
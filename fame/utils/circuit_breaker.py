@@ -0,0 +1,126 @@
+import threading
+import time
+
+# Breaker states:
+#   closed     calls go through; consecutive failures are counted
+#   open       calls fail fast until reset_timeout has passed
+#   half_open  a limited number of probe calls go through; one success
+#              closes the breaker, one failure opens it again
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one external service.
+
+    After failure_threshold consecutive failures the breaker opens and
+    callers skip the service instead of waiting out its timeouts and
+    retries. After reset_timeout it lets probe calls through to find out
+    whether the service has recovered.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        probes: int = 1,
+    ):
+        """
+        Args:
+            name: Service name used in messages
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before probing
+            probes: Calls allowed at once while half-open
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_running = 0
+
+    @property
+    def state(self) -> str:
+        """Current state; an open breaker turns half-open once it may probe."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if (
+            self._state == OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = HALF_OPEN
+            self._probes_running = 0
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls currently fail fast (probing does not count)."""
+        return self.state == OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker starts probing (0 if not open)."""
+        with self._lock:
+            if self._current_state() != OPEN:
+                return 0.0
+            return self.reset_timeout - (time.monotonic() - self._opened_at)
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through, claiming a probe if half-open.
+
+        Every allowed call must be followed by record_success() or
+        record_failure().
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes_running < self.probes:
+                self._probes_running += 1
+                return True
+            return False
+
+    def record_success(self):
+        """Record a call that reached a healthy service."""
+        with self._lock:
+            if self._state != CLOSED:
+                print(f"{self.name} recovered, closing circuit")
+            self._state = CLOSED
+            self._failures = 0
+            self._probes_running = 0
+
+    def record_failure(self):
+        """Record a call that failed because of the service."""
+        with self._lock:
+            self._failures += 1
+            # Calls that started before the breaker opened do not extend it
+            if self._state == OPEN:
+                return
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                print(
+                    f"{self.name} is failing, opening circuit for "
+                    f"{self.reset_timeout:.0f} seconds"
+                )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probes_running = 0
+
+    def open_message(self) -> str:
+        """Message for a call skipped because the breaker is open."""
+        return (
+            f"{self.name} is unavailable (circuit open, "
+            f"retrying in {self.retry_after():.0f} seconds)"
+        )
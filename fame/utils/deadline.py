@@ -0,0 +1,70 @@
+import time
+from typing import Optional, Union
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call cannot start or continue within its deadline."""
+
+
+class Deadline:
+    """
+    Point in time by which a whole operation must finish.
+
+    An Agent method turns its latency budget into a Deadline and passes it
+    down through every stage. Each stage takes a share of what is left
+    (child()), and each integration call fits its timeout and retries into
+    the stage's remaining time (timeout(), fits()). Deadline(None) never
+    expires, so callers can use the same code with and without a budget.
+    """
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Args:
+            seconds: Budget from now; None for no deadline
+        """
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    @classmethod
+    def coerce(cls, deadline: Union["Deadline", float, None]) -> "Deadline":
+        """Return a Deadline for a Deadline, a budget in seconds or None."""
+        if isinstance(deadline, Deadline):
+            return deadline
+        return cls(deadline)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative); None if there is no deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def child(self, share: float) -> "Deadline":
+        """Return a deadline for a stage that may use a share of the time left."""
+        child = Deadline()
+        remaining = self.remaining()
+        if remaining is not None:
+            child.expires_at = time.monotonic() + remaining * share
+        return child
+
+    def timeout(self, default: float) -> float:
+        """
+        Return the timeout for one request: the default, capped by the time left.
+
+        Raises DeadlineExceeded if no time is left.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if remaining <= 0:
+            raise DeadlineExceeded("Deadline exceeded")
+        return min(default, remaining)
+
+    def fits(self, seconds: float) -> bool:
+        """Whether waiting this long still leaves time for another attempt."""
+        remaining = self.remaining()
+        return remaining is None or remaining > seconds
@@ -0,0 +1,287 @@
+import html
+import os
+import re
+import struct
+import threading
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+INDEX_MAGIC = b"FAMEDUP1"
+
+# magic, num_perm, shingle size, hash seed
+_HEADER = struct.Struct("<8sHHI")
+
+# Multiplier for the rolling shingle hash
+_SHINGLE_BASE = np.uint32(0x01000193)
+
+_URL_PATTERN = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
+# Bare domains such as example.com/page, which X turns into t.co links
+_DOMAIN_PATTERN = re.compile(
+    r"\b[a-z0-9-]+(?:\.[a-z0-9-]+)*\.(?:com|org|net|io|ai|dev|app|co|me|ly|tv|gg|"
+    r"info|xyz|[a-z]{2})\b(?:/\S*)?",
+    re.IGNORECASE,
+)
+_NON_WORD_PATTERN = re.compile(r"[\W_]+")
+
+# New entries are kept in an unsorted tail and merged into the sorted band
+# tables once the tail reaches this many rows
+_MERGE_THRESHOLD = 4096
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase text and strip URLs, punctuation, emoji and hashtag marks.
+
+    HTML entities are decoded first, as X returns tweet text escaped.
+    """
+    text = _URL_PATTERN.sub(" ", html.unescape(text).lower())
+    text = _DOMAIN_PATTERN.sub(" ", text)
+    return _NON_WORD_PATTERN.sub(" ", text).strip()
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of posted text for near-duplicate detection.
+
+    Each text is reduced to character shingles and a MinHash signature of
+    num_perm values. The signature is split into bands; two texts that
+    agree on every value of any band become candidates, and candidates are
+    confirmed by the fraction of signature values they share (an estimate
+    of the Jaccard similarity of their shingle sets).
+
+    The band keys of all texts are kept in one sorted array, so a lookup is
+    two vectorized binary searches regardless of how many texts are indexed. Signatures
+    are appended to a fixed-record file, so adding a text never rewrites
+    the index.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.7,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        max_age: Optional[float] = None,
+        seed: int = 1,
+    ):
+        """
+        Args:
+            path: File the index is persisted to; None keeps it in memory
+            threshold: Estimated Jaccard similarity at which a text counts
+                as a near-duplicate
+            num_perm: Number of MinHash values per signature
+            bands: Number of LSH bands; num_perm must divide evenly. With
+                64 values in 16 bands, pairs of 0.7 similarity become
+                candidates with ~99% probability
+            shingle_size: Characters per shingle
+            max_age: Seconds after which indexed texts are ignored
+            seed: Seed for the MinHash permutations; stored in the file
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_age = max_age
+        self.seed = seed
+        self._lock = threading.Lock()
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: the high 32 bits of a * x + b (mod 2 ** 64)
+        # with odd a form one random permutation per signature value
+        self._a = rng.integers(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64)
+        self._a |= np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64)
+        self._band_weights = rng.integers(
+            1, 1 << 63, size=self.rows_per_band, dtype=np.uint64
+        )
+        # Per-band salt so keys from different bands never collide
+        self._band_salts = rng.integers(0, 1 << 63, size=bands, dtype=np.uint64)
+        self._shingle_powers = _SHINGLE_BASE ** np.arange(shingle_size, dtype=np.uint32)
+        self._record = np.dtype(
+            [("timestamp", "<f8"), ("signature", "<u4", (num_perm,))]
+        )
+
+        self.size = 0
+        self._allocate(1024)
+        if path and os.path.exists(path) and os.path.getsize(path):
+            self._load()
+        self._rebuild_bands()
+
+    def _allocate(self, capacity: int):
+        """Allocate (or grow) the per-row arrays."""
+        signatures = np.zeros((capacity, self.num_perm), dtype=np.uint32)
+        band_keys = np.zeros((capacity, self.bands), dtype=np.uint64)
+        timestamps = np.zeros(capacity, dtype=np.float64)
+        if self.size:
+            signatures[: self.size] = self.signatures[: self.size]
+            band_keys[: self.size] = self.band_keys[: self.size]
+            timestamps[: self.size] = self.timestamps[: self.size]
+        self.signatures = signatures
+        self.band_keys = band_keys
+        self.timestamps = timestamps
+        self.capacity = capacity
+
+    def _load(self):
+        """Read every persisted signature."""
+        with open(self.path, "rb") as f:
+            magic, num_perm, shingle_size, seed = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != INDEX_MAGIC:
+                raise ValueError(f"Not a duplicate index: {self.path}")
+            if (num_perm, shingle_size, seed) != (
+                self.num_perm,
+                self.shingle_size,
+                self.seed,
+            ):
+                raise ValueError(
+                    f"Duplicate index {self.path} was built with num_perm="
+                    f"{num_perm}, shingle_size={shingle_size}, seed={seed}"
+                )
+            records = np.fromfile(f, dtype=self._record)
+
+        self._append(records["signature"], records["timestamp"])
+
+    def _append(self, signatures: np.ndarray, timestamps: np.ndarray) -> int:
+        """Add signatures to the in-memory arrays and return the first row."""
+        count = len(signatures)
+        if self.size + count > self.capacity:
+            capacity = self.capacity
+            while capacity < self.size + count:
+                capacity *= 2
+            self._allocate(capacity)
+
+        start = self.size
+        self.signatures[start : start + count] = signatures
+        self.band_keys[start : start + count] = self._band_keys(signatures)
+        self.timestamps[start : start + count] = timestamps
+        self.size += count
+        return start
+
+    def _shingles(self, text: str) -> np.ndarray:
+        """Return the 32-bit hashes of the text's character shingles."""
+        code_points = np.frombuffer(
+            normalize_text(text).encode("utf-32-le"), dtype=np.uint32
+        )
+        k = self.shingle_size
+        if len(code_points) < k:
+            code_points = np.pad(code_points, (0, k - len(code_points)))
+        windows = np.lib.stride_tricks.as_strided(
+            code_points,
+            shape=(len(code_points) - k + 1, k),
+            strides=(code_points.strides[0],) * 2,
+            writeable=False,
+        )
+        # Polynomial hash of every window at once; uint32 arithmetic wraps.
+        # Repeated shingles do not change the minimum, so no dedup is needed
+        return (windows @ self._shingle_powers).astype(np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return the MinHash signature of a text."""
+        hashes = self._shingles(text)
+        permuted = (self._a * hashes + self._b) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """Collapse each band of each signature into one 64-bit key."""
+        bands = signatures.reshape(-1, self.bands, self.rows_per_band)
+        # uint64 arithmetic wraps, which is fine for a hash
+        weighted = (bands.astype(np.uint64) * self._band_weights).sum(
+            axis=2, dtype=np.uint64
+        )
+        return weighted + self._band_salts
+
+    def _rebuild_bands(self):
+        """Sort all band keys into one table searched by binary search."""
+        keys = self.band_keys[: self.size].ravel()
+        order = np.argsort(keys)
+        self._sorted_keys = keys[order]
+        self._sorted_rows = (order // self.bands).astype(np.int32)
+        self._sorted_size = self.size
+
+    def _candidates(self, keys: np.ndarray) -> np.ndarray:
+        """Return the rows sharing at least one band key with a signature."""
+        found = []
+        if self._sorted_size:
+            # Two vectorized searches cover every band
+            starts = np.searchsorted(self._sorted_keys, keys, side="left")
+            ends = np.searchsorted(self._sorted_keys, keys, side="right")
+            for start, end in zip(starts[ends > starts], ends[ends > starts]):
+                found.append(self._sorted_rows[start:end])
+
+        # Rows added since the last merge are compared directly
+        if self.size > self._sorted_size:
+            tail = self.band_keys[self._sorted_size : self.size]
+            matches = np.flatnonzero((tail == keys).any(axis=1))
+            found.append(matches + self._sorted_size)
+
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(found)
+
+    def query(self, text: str) -> float:
+        """
+        Return the highest estimated similarity to any indexed text.
+
+        Returns 0.0 when no indexed text shares a band with this one.
+        """
+        signature = self.signature(text)
+        keys = self._band_keys(signature[np.newaxis])[0]
+        with self._lock:
+            rows = self._candidates(keys)
+            if self.max_age is not None and len(rows):
+                rows = rows[self.timestamps[rows] >= time.time() - self.max_age]
+            if not len(rows):
+                return 0.0
+            agreement = (self.signatures[rows] == signature).mean(axis=1)
+        return float(agreement.max())
+
+    def is_duplicate(self, text: str) -> bool:
+        """Check whether a text is a near-duplicate of an indexed text."""
+        return self.query(text) >= self.threshold
+
+    def add(self, text: str, timestamp: Optional[float] = None) -> int:
+        """Index a posted text and return its row."""
+        return self.add_many([text], timestamp)
+
+    def add_many(self, texts: Iterable[str], timestamp: Optional[float] = None) -> int:
+        """Index many posted texts and return the row of the first one."""
+        signatures = np.array(
+            [self.signature(text) for text in texts], dtype=np.uint32
+        ).reshape(-1, self.num_perm)
+        timestamps = np.full(len(signatures), timestamp or time.time())
+
+        with self._lock:
+            if self.path:
+                self._persist(signatures, timestamps)
+            start = self._append(signatures, timestamps)
+            if self.size - self._sorted_size >= _MERGE_THRESHOLD:
+                self._rebuild_bands()
+        return start
+
+    def _persist(self, signatures: np.ndarray, timestamps: np.ndarray):
+        """Append records to the index file, writing the header if new."""
+        records = np.empty(len(signatures), dtype=self._record)
+        records["signature"] = signatures
+        records["timestamp"] = timestamps
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "ab") as f:
+            if f.tell() == 0:
+                f.write(
+                    _HEADER.pack(
+                        INDEX_MAGIC, self.num_perm, self.shingle_size, self.seed
+                    )
+                )
+            f.write(records.tobytes())
+
+    def __len__(self) -> int:
+        return self.size
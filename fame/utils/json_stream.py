@@ -0,0 +1,107 @@
+import json
+from typing import Any, Iterable, Iterator, List
+
+# Closing bracket for each opening bracket inside an element
+_CLOSERS = {"[": "]", "{": "}"}
+
+
+class JSONArrayParser:
+    """
+    Incremental parser for a JSON array that arrives in pieces.
+
+    feed() returns each element as soon as its text is complete, so the
+    first element of a streamed LLM completion can be used while the rest is
+    still being generated. The parser is forgiving in the ways LLM output
+    needs: text before the array (prose, code fences, an object wrapping
+    it) is skipped, an element that is not valid JSON is dropped without
+    losing its neighbours, a missing comma between strings is tolerated, and
+    an array cut off at the end still yields its complete elements. Once an
+    array closes, the parser looks for the next one.
+    """
+
+    def __init__(self):
+        self.errors = 0  # Elements dropped as invalid
+        self._in_array = False
+        self._element: List[str] = []
+        self._closers: List[str] = []  # Open brackets inside the element
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[Any]:
+        """Parse the next piece of input; returns the elements it completed."""
+        elements: List[Any] = []
+        for char in text:
+            if not self._in_array:
+                self._in_array = char == "["
+            elif self._in_string:
+                self._element.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if not self._closers:
+                        self._finish_element(elements)
+            elif char == '"':
+                if not self._closers:
+                    # Anything before a top-level string is a separate element
+                    self._finish_element(elements)
+                self._in_string = True
+                self._element.append(char)
+            elif char in _CLOSERS:
+                self._closers.append(_CLOSERS[char])
+                self._element.append(char)
+            elif self._closers:
+                self._element.append(char)
+                if char == self._closers[-1]:
+                    self._closers.pop()
+                    if not self._closers:
+                        self._finish_element(elements)
+            elif char == ",":
+                self._finish_element(elements)
+            elif char == "]":
+                self._finish_element(elements)
+                self._in_array = False
+            else:
+                self._element.append(char)
+        return elements
+
+    def close(self) -> List[Any]:
+        """
+        End the input; returns the last element if the array was cut off
+        right after it. An element cut off in the middle is dropped.
+        """
+        elements: List[Any] = []
+        if self._in_string or self._closers:
+            self._element = []
+            self.errors += 1
+        else:
+            self._finish_element(elements)
+        self._in_array = False
+        self._closers = []
+        self._in_string = False
+        self._escaped = False
+        return elements
+
+    def parse(self, chunks: Iterable[str]) -> Iterator[Any]:
+        """Yield the elements of a streamed array as each one completes."""
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.close()
+
+    def _finish_element(self, elements: List[Any]):
+        raw = "".join(self._element).strip()
+        self._element = []
+        if not raw:
+            return
+        try:
+            # LLMs put raw newlines inside strings; strict=False accepts them
+            elements.append(json.loads(raw, strict=False))
+        except json.JSONDecodeError:
+            self.errors += 1
+
+
+def parse_json_array(text: str) -> List[Any]:
+    """Return the valid elements of the JSON array(s) in text."""
+    return list(JSONArrayParser().parse([text]))
@@ -0,0 +1,111 @@
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+class KeywordMatcher:
+    """
+    Precompiled multi-keyword substring matcher.
+
+    The keywords are folded into a trie and compiled into a single regular
+    expression, so one C-level pass over the text finds every occurrence of
+    every keyword. Keywords that can start inside another keyword (such as
+    "friendly" in "eco-friendly") are precomputed, so overlapping matches are
+    found by probing only those offsets. Each keyword carries one or more
+    tags, reported alongside the match.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, Any]]):
+        """
+        Build the matcher.
+
+        Args:
+            keywords: (keyword, tag) pairs; a keyword listed several times
+                collects all of its tags
+        """
+        tags_by_keyword: Dict[str, list] = {}
+        for keyword, tag in keywords:
+            if keyword:
+                tags_by_keyword.setdefault(keyword, []).append(tag)
+
+        self.keywords = tuple(tags_by_keyword)
+        self._tags = {kw: tuple(tags) for kw, tags in tags_by_keyword.items()}
+
+        # Every keyword that starts where a longer one starts is a prefix of
+        # it, so the longest match at a position implies all the shorter ones
+        self._matches_for: Dict[str, Tuple[Tuple[str, tuple], ...]] = {}
+        for keyword in self.keywords:
+            prefixes = [
+                keyword[:size]
+                for size in range(1, len(keyword) + 1)
+                if keyword[:size] in self._tags
+            ]
+            self._matches_for[keyword] = tuple(
+                (prefix, self._tags[prefix]) for prefix in prefixes
+            )
+
+        trie: Dict[str, Any] = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = True
+
+        self._pattern = re.compile(self._trie_to_regex(trie), re.DOTALL)
+
+        # Offsets inside each keyword where another keyword could start
+        self._inner_offsets: Dict[str, Tuple[int, ...]] = {}
+        for keyword in self.keywords:
+            self._inner_offsets[keyword] = tuple(
+                offset
+                for offset in range(1, len(keyword))
+                if any(
+                    other.startswith(keyword[offset:])
+                    or keyword[offset:].startswith(other)
+                    for other in self.keywords
+                )
+            )
+
+    @classmethod
+    def _trie_to_regex(cls, node: Dict[str, Any]) -> str:
+        """Render a trie as a regex that prefers the longest keyword."""
+        is_end = "" in node
+        branches = [
+            re.escape(char) + cls._trie_to_regex(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if is_end:
+            return f"(?:{body})?"
+        return body
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str, tuple]]:
+        """
+        Yield (start, end, keyword, tags) for every keyword occurrence.
+
+        Occurrences come out grouped by the longest match they belong to, so
+        callers that need a strict order should sort them.
+        """
+        matches_for = self._matches_for
+        inner_offsets = self._inner_offsets
+        match_at = self._pattern.match
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            longest = match.group()
+            for keyword, tags in matches_for[longest]:
+                yield start, start + len(keyword), keyword, tags
+
+            # The scan resumes after this match, so probe for keywords that
+            # begin inside it
+            for offset in inner_offsets[longest]:
+                inner = match_at(text, start + offset)
+                if inner:
+                    inner_start = start + offset
+                    for keyword, tags in matches_for[inner.group()]:
+                        yield inner_start, inner_start + len(keyword), keyword, tags
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str, tuple]]:
+        """Return all keyword occurrences in the text."""
+        return list(self.iter_matches(text))
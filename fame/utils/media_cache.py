@@ -0,0 +1,113 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+# X keeps uploaded media for 24 hours; without an expiry in the upload
+# response, trust an id for half that
+DEFAULT_TTL = 12 * 3600.0
+
+# Stop reusing an id this long before X says it expires
+EXPIRY_MARGIN = 300.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    account_id TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    media_id TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (account_id, digest)
+);
+"""
+
+
+def file_digest(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class MediaCache:
+    """
+    Uploaded media ids keyed by account and file content hash.
+
+    Reposting the same image, captioning it differently or retrying a
+    failed create_tweet can reuse the media id instead of uploading the
+    file again, as long as X has not expired it.
+    """
+
+    def __init__(self, path: str = ":memory:", ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            path: SQLite file; the default keeps the cache in memory
+            ttl: Seconds an id is reused when X does not report an expiry
+        """
+        self.path = path
+        self.ttl = ttl
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, account_id: str, digest: str) -> Optional[str]:
+        """Return a still-valid media id for the content, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT media_id FROM media "
+                "WHERE account_id = ? AND digest = ? AND expires_at > ?",
+                (str(account_id), digest, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(
+        self,
+        account_id: str,
+        digest: str,
+        media_id: str,
+        expires_after: Optional[float] = None,
+    ):
+        """
+        Remember an uploaded media id.
+
+        Args:
+            account_id: Account the media was uploaded for
+            digest: file_digest() of the uploaded file
+            media_id: Id returned by the upload
+            expires_after: Seconds until X expires the id, if reported
+        """
+        if expires_after:
+            lifetime = expires_after - EXPIRY_MARGIN
+        else:
+            lifetime = self.ttl
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?)",
+                (str(account_id), digest, str(media_id), time.time() + lifetime),
+            )
+
+    def invalidate(self, account_id: str, digest: str):
+        """Forget a media id, e.g. after X rejected it."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM media WHERE account_id = ? AND digest = ?",
+                (str(account_id), digest),
+            )
+
+    def prune(self) -> int:
+        """Delete expired ids; returns the number removed."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM media WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
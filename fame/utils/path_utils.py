@@ -28,3 +28,13 @@ def resolve_profile_path(profile_path: str) -> Optional[str]:
             return os.path.abspath(root_path)
 
     return None
+
+
+def resolve_data_path(*parts: str) -> str:
+    """
+    Return a path inside the FAME data directory.
+
+    The directory holds local state such as post indexes and defaults to
+    ./fame_data; set FAME_DATA_DIR to move it.
+    """
+    return os.path.join(os.getenv("FAME_DATA_DIR", "fame_data"), *parts)
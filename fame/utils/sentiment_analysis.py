@@ -1,43 +1,109 @@
-from typing import Dict, Any
+import json
+import re
+from typing import Dict, Any, List, Sequence
 from fame.integrations.openrouter_integration import OpenRouterIntegration
+from fame.utils.sentiment_lexicon import LexiconSentimentScorer
+
+MOODS = ["enthusiastic", "happy", "neutral", "concerned", "frustrated"]
 
 
 class SentimentAnalyzer:
-    def __init__(self):
-        """Initialize sentiment analyzer."""
+    def __init__(self, confidence_threshold: float = 0.6, llm_batch_size: int = 20):
+        """
+        Initialize sentiment analyzer.
+
+        Args:
+            confidence_threshold: Local results below this confidence are
+                escalated to the LLM (when one is set)
+            llm_batch_size: Number of texts sent per LLM request
+        """
         self.openrouter = None  # Will be set when needed
+        self.scorer = LexiconSentimentScorer()
+        self.confidence_threshold = confidence_threshold
+        self.llm_batch_size = llm_batch_size
 
     def set_openrouter(self, openrouter: OpenRouterIntegration):
         """Set OpenRouter integration instance."""
         self.openrouter = openrouter
 
     def analyze_mood(self, text: str) -> Dict[str, Any]:
-        """Analyze text sentiment using OpenRouter LLM."""
+        """Analyze text sentiment locally, asking the LLM only when unsure."""
+        return self.analyze_many([text])[0]
+
+    def analyze_many(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze the mood of many texts.
+
+        Every text is scored locally first. Texts whose confidence is below
+        the threshold are sent to the LLM, many per request.
+
+        Returns:
+            One {"mood", "intensity", "confidence"} dict per text
+        """
+        results = self.scorer.analyze_many(texts)
         if not self.openrouter:
-            return {"mood": "neutral", "intensity": 0.5}
+            return results
+
+        uncertain = [
+            index
+            for index, result in enumerate(results)
+            if result["confidence"] < self.confidence_threshold
+        ]
+        for start in range(0, len(uncertain), self.llm_batch_size):
+            batch = uncertain[start : start + self.llm_batch_size]
+            llm_results = self._analyze_with_llm([texts[index] for index in batch])
+            for index, llm_result in zip(batch, llm_results):
+                if llm_result is not None:
+                    results[index] = llm_result
 
+        return results
+
+    def _analyze_with_llm(self, texts: List[str]) -> List[Any]:
+        """Score a batch of texts with one LLM request; None marks a failure."""
+        numbered = "\n".join(
+            f"{number}. {json.dumps(text, ensure_ascii=False)}"
+            for number, text in enumerate(texts, start=1)
+        )
         prompt = f"""
-        Analyze the emotional tone and mood of this text:
-        "{text}"
-        
-        Return only a JSON object with two fields:
-        - mood: one of [enthusiastic, happy, neutral, concerned, frustrated]
+        Analyze the emotional tone and mood of each of these {len(texts)} texts:
+        {numbered}
+
+        Return only a JSON array with one object per text, in the same order.
+        Each object has two fields:
+        - mood: one of [{", ".join(MOODS)}]
         - intensity: float between 0.0 and 1.0 indicating strength of the mood
-        
-        Example: {{"mood": "enthusiastic", "intensity": 0.8}}
+
+        Example: [{{"mood": "enthusiastic", "intensity": 0.8}}, {{"mood": "neutral", "intensity": 0.5}}]
         """
 
-        response = self.openrouter.generate_text(prompt)
+        response = self.openrouter.generate_text(
+            prompt, task="sentiment", items=len(texts)
+        )
+        if not response:
+            return [None] * len(texts)
 
         try:
-            # Parse the response as JSON
-            import json
-
-            mood_data = json.loads(response)
-            return {
-                "mood": mood_data.get("mood", "neutral"),
-                "intensity": float(mood_data.get("intensity", 0.5)),
-            }
-        except:
-            # Fallback to neutral if parsing fails
-            return {"mood": "neutral", "intensity": 0.5}
+            # Tolerate code fences or text around the array
+            match = re.search(r"\[.*\]", response, re.DOTALL)
+            mood_data = json.loads(match.group(0) if match else response)
+            if not isinstance(mood_data, list):
+                raise ValueError("Expected a JSON array")
+
+            results = []
+            for item in mood_data[: len(texts)]:
+                mood = item.get("mood", "neutral")
+                results.append(
+                    {
+                        "mood": mood if mood in MOODS else "neutral",
+                        "intensity": max(
+                            0.0, min(1.0, float(item.get("intensity", 0.5)))
+                        ),
+                        "confidence": 1.0,
+                    }
+                )
+            return results + [None] * (len(texts) - len(results))
+
+        except (ValueError, TypeError, AttributeError) as e:
+            # Keep the local results if the response cannot be parsed
+            print(f"Error parsing sentiment response: {str(e)}")
+            return [None] * len(texts)
@@ -0,0 +1,267 @@
+import re
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# word -> (valence, arousal); valence in [-1, 1], arousal in [0, 1]
+LEXICON = {
+    # Enthusiastic: positive and energetic
+    "amazing": (0.9, 0.8),
+    "awesome": (0.9, 0.8),
+    "incredible": (0.9, 0.8),
+    "excited": (0.8, 0.9),
+    "exciting": (0.8, 0.8),
+    "thrilled": (0.9, 0.9),
+    "fantastic": (0.9, 0.7),
+    "love": (0.8, 0.6),
+    "loving": (0.8, 0.6),
+    "epic": (0.8, 0.8),
+    "wow": (0.7, 0.9),
+    "breakthrough": (0.7, 0.7),
+    "can't wait": (0.7, 0.9),
+    "cannot wait": (0.7, 0.9),
+    "stoked": (0.8, 0.9),
+    "pumped": (0.7, 0.9),
+    "brilliant": (0.8, 0.6),
+    "celebrate": (0.7, 0.7),
+    # Happy: positive and calmer
+    "happy": (0.7, 0.4),
+    "glad": (0.6, 0.3),
+    "great": (0.6, 0.5),
+    "good": (0.4, 0.3),
+    "nice": (0.4, 0.2),
+    "beautiful": (0.6, 0.4),
+    "grateful": (0.7, 0.3),
+    "thankful": (0.7, 0.3),
+    "thanks": (0.4, 0.2),
+    "proud": (0.6, 0.5),
+    "enjoy": (0.5, 0.4),
+    "enjoyed": (0.5, 0.4),
+    "fun": (0.5, 0.5),
+    "inspiring": (0.6, 0.5),
+    "joy": (0.7, 0.5),
+    "wonderful": (0.7, 0.5),
+    "hope": (0.3, 0.3),
+    "hopeful": (0.4, 0.3),
+    "fascinating": (0.6, 0.5),
+    "congrats": (0.6, 0.6),
+    "congratulations": (0.6, 0.6),
+    # Concerned: negative and worried
+    "worried": (-0.6, 0.5),
+    "worry": (-0.5, 0.5),
+    "concerned": (-0.5, 0.4),
+    "concerning": (-0.5, 0.4),
+    "anxious": (-0.6, 0.6),
+    "afraid": (-0.6, 0.6),
+    "scared": (-0.6, 0.7),
+    "sad": (-0.6, 0.3),
+    "unfortunately": (-0.4, 0.3),
+    "sorry": (-0.3, 0.3),
+    "miss": (-0.3, 0.3),
+    "stressed": (-0.5, 0.6),
+    "tired": (-0.3, 0.2),
+    "problem": (-0.4, 0.4),
+    "risk": (-0.3, 0.4),
+    "bad": (-0.5, 0.4),
+    "disappointed": (-0.6, 0.4),
+    "misinformation": (-0.4, 0.4),
+    # Frustrated: negative and heated
+    "angry": (-0.8, 0.9),
+    "annoyed": (-0.6, 0.7),
+    "annoying": (-0.6, 0.7),
+    "frustrated": (-0.7, 0.8),
+    "frustrating": (-0.7, 0.8),
+    "hate": (-0.8, 0.8),
+    "terrible": (-0.8, 0.7),
+    "awful": (-0.8, 0.7),
+    "ridiculous": (-0.6, 0.8),
+    "worst": (-0.9, 0.8),
+    "fed up": (-0.7, 0.8),
+    "broken": (-0.5, 0.6),
+    "unacceptable": (-0.7, 0.8),
+    "stupid": (-0.7, 0.8),
+    "ugh": (-0.6, 0.7),
+}
+
+EMOJI_LEXICON = {
+    "😀": (0.7, 0.6),
+    "😃": (0.7, 0.6),
+    "😄": (0.7, 0.6),
+    "😊": (0.6, 0.3),
+    "🙂": (0.4, 0.2),
+    "😍": (0.8, 0.7),
+    "🥰": (0.8, 0.5),
+    "❤": (0.7, 0.5),
+    "🎉": (0.8, 0.9),
+    "🚀": (0.7, 0.9),
+    "🔥": (0.6, 0.9),
+    "✨": (0.5, 0.5),
+    "💪": (0.6, 0.7),
+    "👏": (0.6, 0.6),
+    "😢": (-0.6, 0.4),
+    "😭": (-0.6, 0.7),
+    "😞": (-0.6, 0.3),
+    "😟": (-0.5, 0.5),
+    "😰": (-0.6, 0.7),
+    "😡": (-0.8, 0.9),
+    "😠": (-0.7, 0.8),
+    "🤬": (-0.9, 1.0),
+    "🙄": (-0.4, 0.5),
+}
+
+NEGATIONS = frozenset(
+    [
+        "not",
+        "no",
+        "never",
+        "none",
+        "nothing",
+        "hardly",
+        "without",
+        "isn't",
+        "wasn't",
+        "aren't",
+        "don't",
+        "doesn't",
+        "didn't",
+        "can't",
+        "won't",
+    ]
+)
+INTENSIFIERS = {
+    "very": 1.3,
+    "so": 1.2,
+    "really": 1.3,
+    "extremely": 1.5,
+    "super": 1.4,
+    "incredibly": 1.5,
+    "totally": 1.3,
+    "absolutely": 1.4,
+    "slightly": 0.6,
+    "somewhat": 0.7,
+    "bit": 0.7,
+}
+
+# Negations reach this many tokens ahead
+NEGATION_SCOPE = 3
+
+_PHRASES = sorted((key for key in LEXICON if " " in key), key=len, reverse=True)
+_TOKEN_PATTERN = re.compile(
+    "|".join(re.escape(phrase) for phrase in _PHRASES)
+    + r"|[a-z]+(?:'[a-z]+)?|!|"
+    + "|".join(re.escape(emoji) for emoji in EMOJI_LEXICON)
+)
+
+
+class LexiconSentimentScorer:
+    """
+    Local lexicon- and rule-based mood scorer.
+
+    Word and emoji hits are combined with negation, intensifier and
+    exclamation rules into a valence and arousal per text; the mood,
+    intensity and confidence for a whole batch are then derived with
+    NumPy in one step.
+    """
+
+    def __init__(self, neutral_band: float = 0.15):
+        """
+        Args:
+            neutral_band: Absolute valence below which a text is neutral
+        """
+        self.neutral_band = neutral_band
+
+    def _features(self, text: str):
+        """Return (valence sum, arousal sum, hits, positive hits, negative hits)."""
+        valence = arousal = 0.0
+        hits = positive = negative = 0
+        negate_until = -1
+        boost = 1.0
+
+        for index, token in enumerate(_TOKEN_PATTERN.findall(text.lower())):
+            if token == "!":
+                arousal += 0.15
+                continue
+            if token in NEGATIONS:
+                negate_until = index + NEGATION_SCOPE
+                continue
+            if token in INTENSIFIERS:
+                boost *= INTENSIFIERS[token]
+                continue
+
+            scores = LEXICON.get(token) or EMOJI_LEXICON.get(token)
+            if scores is None:
+                continue
+
+            token_valence, token_arousal = scores
+            token_valence *= boost
+            if index <= negate_until:
+                # "not happy" is mildly negative, "not bad" mildly positive
+                token_valence *= -0.6
+            boost = 1.0
+
+            valence += token_valence
+            arousal += token_arousal
+            hits += 1
+            if token_valence > 0:
+                positive += 1
+            elif token_valence < 0:
+                negative += 1
+
+        return valence, arousal, hits, positive, negative
+
+    def analyze_many(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Score many texts at once.
+
+        Returns:
+            One {"mood", "intensity", "confidence"} dict per text, with mood in
+            [enthusiastic, happy, neutral, concerned, frustrated]
+        """
+        if not texts:
+            return []
+
+        features = np.array([self._features(text) for text in texts], dtype=np.float64)
+        valence_sum, arousal_sum, hits, positive, negative = features.T
+
+        safe_hits = np.maximum(hits, 1.0)
+        valence = np.clip(valence_sum / np.sqrt(safe_hits), -1.0, 1.0)
+        arousal = np.clip(arousal_sum / safe_hits, 0.0, 1.0)
+        arousal = np.where(hits > 0, arousal, np.clip(arousal_sum, 0.0, 1.0))
+
+        positive_mood = np.where(
+            (valence > 0.5) & (arousal >= 0.6), "enthusiastic", "happy"
+        )
+        negative_mood = np.where(arousal >= 0.65, "frustrated", "concerned")
+        moods = np.where(
+            np.abs(valence) < self.neutral_band,
+            "neutral",
+            np.where(valence > 0, positive_mood, negative_mood),
+        )
+
+        intensity = np.where(
+            moods == "neutral", 0.5, np.clip(0.4 + 0.6 * np.abs(valence), 0.0, 1.0)
+        )
+
+        # More evidence, a clearer valence and less mixed evidence raise
+        # confidence; texts with no lexicon hits at all are a weak neutral
+        evidence = 1.0 - np.exp(-hits)
+        clarity = np.clip(np.abs(valence) / 0.5, 0.0, 1.0)
+        agreement = 1.0 - np.minimum(positive, negative) / safe_hits
+        confidence = np.where(
+            hits > 0,
+            np.where(
+                moods == "neutral",
+                0.5 * evidence * agreement,
+                evidence * (0.5 + 0.5 * clarity) * agreement,
+            ),
+            0.5,
+        )
+
+        return [
+            {
+                "mood": str(mood),
+                "intensity": round(float(level), 3),
+                "confidence": round(float(conf), 3),
+            }
+            for mood, level, conf in zip(moods, intensity, confidence)
+        ]
@@ -1,5 +1,76 @@
 import re
-from typing import Tuple
+import unicodedata
+from typing import List, Optional, Sequence, Tuple
+
+# twitter-text v3 weighting: characters in these code point ranges weigh 100,
+# everything else (CJK, most symbols) weighs 200, and a tweet may weigh at
+# most 280 * 100. Every URL counts as 23 characters and every emoji, however
+# many code points it spans, as one default-weight character.
+WEIGHT_SCALE = 100
+DEFAULT_WEIGHT = 200
+LIGHT_WEIGHT_RANGES = ((0, 4351), (8192, 8205), (8208, 8223), (8242, 8247))
+INVALID_CHARACTERS = frozenset("\ufffe\ufeff\uffff")
+
+# TLDs that link without a protocol; two-letter ccTLDs only link bare when
+# followed by a path, except the ones twitter-text treats like gTLDs
+GENERIC_TLDS = frozenset(
+    "com net org edu gov mil int info biz name pro aero coop museum mobi "
+    "asia jobs travel tel cat xxx io ai app dev xyz online site tech store "
+    "blog shop news live art club design page space website cloud".split()
+)
+BARE_CCTLDS = frozenset(["co", "tv"])
+
+_URL_PATTERN = (
+    r"(?<![\w@#$/.\-])"
+    r"(?P<protocol>https?://)?"
+    r"(?:[^\W_](?:[\w\-]*[^\W_])?\.)+"
+    r"(?P<tld>[a-z]{2,24})(?![\w\-])"
+    r"(?::\d{1,5})?"
+    r"(?P<path>[/?#]\S*)?"
+)
+# Cheap check for text that could contain a URL at all
+_DOMAIN_HINT = re.compile(r"[^\W_]\.[a-z]{2}", re.IGNORECASE)
+_TRAILING_PUNCTUATION = re.compile(r"[.,:;!?'\")\]]+$")
+
+_EMOJI_BASE = (
+    "\U0001f000-\U0001faff"
+    "\u2600-\u27bf"
+    "\u231a\u231b\u2328\u23cf\u23e9-\u23f3\u23f8-\u23fa"
+    "\u2b05-\u2b07\u2b1b\u2b1c\u2b50\u2b55"
+    "\u203c\u2049\u2122\u2139\u2194-\u2199\u21a9\u21aa\u24c2"
+    "\u25aa\u25ab\u25b6\u25c0\u25fb-\u25fe\u2934\u2935"
+    "\u3030\u303d\u3297\u3299"
+)
+# One pictograph with optional presentation selector and skin tone
+_EMOJI_ELEMENT = (
+    f"[{_EMOJI_BASE}]\ufe0f?[\U0001f3fb-\U0001f3ff]?" "|[\u00a9\u00ae]\ufe0f"
+)
+_EMOJI_PATTERN = (
+    "[\U0001f1e6-\U0001f1ff]{2}"  # flags
+    "|[0-9#*]\ufe0f?\u20e3"  # keycaps
+    "|\U0001f3f4[\U000e0020-\U000e007e]+\U000e007f"  # subdivision flags
+    f"|(?:{_EMOJI_ELEMENT})(?:\u200d(?:{_EMOJI_ELEMENT}))*"  # ZWJ sequences
+)
+
+_URL_REGEX = re.compile(f"(?P<url>{_URL_PATTERN})", re.IGNORECASE)
+_ENTITY_REGEX = re.compile(
+    f"(?P<url>{_URL_PATTERN})|(?P<emoji>{_EMOJI_PATTERN})", re.IGNORECASE
+)
+# LIGHT_WEIGHT_RANGES as a character class
+_LIGHT_CHARACTERS = re.compile(
+    r"[\u0000-\u10FF\u2000-\u200D\u2010-\u201F\u2032-\u2037]"
+)
+_ASTRAL_CHARACTERS = re.compile(r"[\U00010000-\U0010FFFF]")
+
+
+def _character_weight(char: str) -> int:
+    """Return the twitter-text weight of one code point."""
+    code_point = ord(char)
+    for start, end in LIGHT_WEIGHT_RANGES:
+        if start <= code_point <= end:
+            return WEIGHT_SCALE
+    # Astral characters are two UTF-16 units, each weighed separately
+    return DEFAULT_WEIGHT * 2 if code_point > 0xFFFF else DEFAULT_WEIGHT
 
 
 class TweetValidator:
@@ -26,6 +97,75 @@ class TweetValidator:
 
         return text.strip()
 
+    def _entities(self, text: str) -> List[Tuple[int, int, int]]:
+        """Return (start, end, weight) for every URL and emoji in the text."""
+        entities = []
+        for match in _ENTITY_REGEX.finditer(text):
+            start = match.start()
+            if match.group("url"):
+                url = self._valid_url(match)
+                if url is not None:
+                    entities.append(
+                        (start, start + len(url), self.url_length * WEIGHT_SCALE)
+                    )
+            else:
+                entities.append((start, match.end(), DEFAULT_WEIGHT))
+        return entities
+
+    @staticmethod
+    def _plain_weight(text: str) -> int:
+        """Return the weight of text that contains no URLs or emoji."""
+        if text.isascii():
+            return len(text) * WEIGHT_SCALE
+        light = len(text) - len(_LIGHT_CHARACTERS.sub("", text))
+        astral = len(text) - len(_ASTRAL_CHARACTERS.sub("", text))
+        return (
+            light * WEIGHT_SCALE
+            + (len(text) - light) * DEFAULT_WEIGHT
+            + astral * DEFAULT_WEIGHT
+        )
+
+    @staticmethod
+    def _valid_url(match: "re.Match") -> Optional[str]:
+        """Return the URL text for a candidate match, or None if it is not a link."""
+        url = _TRAILING_PUNCTUATION.sub("", match.group("url"))
+        tld = match.group("tld").lower()
+        if not match.group("protocol"):
+            if len(tld) == 2:
+                # Bare ccTLD domains only link with a path
+                has_path = len(url) > match.end("tld") - match.start()
+                if tld not in BARE_CCTLDS and not has_path:
+                    return None
+            elif tld not in GENERIC_TLDS:
+                return None
+        return url
+
+    def weighted_length(self, text: str) -> int:
+        """Return the tweet length as X counts it (URLs 23, CJK and emoji 2)."""
+        if text.isascii():
+            # Fast path: ASCII has no emoji and weighs one per character, so
+            # only URLs need adjusting, and there are none without a domain
+            length = len(text)
+            if "." in text and _DOMAIN_HINT.search(text):
+                for match in _URL_REGEX.finditer(text):
+                    url = self._valid_url(match)
+                    if url is not None:
+                        length += self.url_length - len(url)
+            return length
+
+        text = unicodedata.normalize("NFC", text)
+        weight = 0
+        position = 0
+        for start, end, entity_weight in self._entities(text):
+            weight += self._plain_weight(text[position:start]) + entity_weight
+            position = end
+        weight += self._plain_weight(text[position:])
+        return -(-weight // WEIGHT_SCALE)
+
+    def weighted_lengths(self, texts: Sequence[str]) -> List[int]:
+        """Return the weighted length of many candidate tweets."""
+        return [self.weighted_length(text) for text in texts]
+
     def validate_tweet(self, text: str) -> Tuple[bool, str]:
         """
         Validate tweet content.
@@ -33,16 +173,64 @@ class TweetValidator:
         Returns:
             Tuple of (is_valid, reason)
         """
-        if not text:
+        if not text or not text.strip():
             return False, "Tweet is empty"
 
-        # Calculate length considering URL shortening
-        length = len(text)
-        urls = re.findall(r"https?://\S+", text)
-        for url in urls:
-            length = length - len(url) + self.url_length
+        if not text.isascii() and INVALID_CHARACTERS.intersection(text):
+            return False, "Tweet contains invalid characters"
 
-        if length > self.max_length:
+        if self.weighted_length(text) > self.max_length:
             return False, f"Tweet exceeds {self.max_length} characters"
 
         return True, "Valid tweet"
+
+    def validate_many(self, texts: Sequence[str]) -> List[Tuple[bool, str]]:
+        """Validate many candidate tweets."""
+        return [self.validate_tweet(text) for text in texts]
+
+    def largest_valid_prefix(self, text: str) -> str:
+        """
+        Return the longest prefix of the (NFC-normalized) text that fits.
+
+        URLs and emoji are never cut in the middle.
+        """
+        text = unicodedata.normalize("NFC", text)
+        budget = self.max_length * WEIGHT_SCALE
+        if text.isascii() and "." not in text:
+            return text[: self.max_length]
+
+        # Walk whole entities and single code points until the budget runs out
+        used = 0
+        position = 0
+        for start, end, entity_weight in self._entities(text) + [(len(text), 0, 0)]:
+            for index in range(position, start):
+                used += _character_weight(text[index])
+                if used > budget:
+                    return text[:index]
+            if end == 0:
+                break
+            used += entity_weight
+            if used > budget:
+                return text[:start]
+            position = end
+        return text
+
+    def split_tweet(self, text: str) -> List[str]:
+        """
+        Split text into tweets that each fit, breaking at whitespace.
+
+        A single word longer than a tweet is cut at the largest valid prefix.
+        """
+        text = unicodedata.normalize("NFC", text).strip()
+        parts = []
+        while text and self.weighted_length(text) > self.max_length:
+            prefix = self.largest_valid_prefix(text)
+            cut = prefix.rfind(" ")
+            # Prefer a word boundary unless it would waste most of the tweet
+            if cut > len(prefix) // 2:
+                prefix = prefix[:cut]
+            parts.append(prefix.rstrip())
+            text = text[len(prefix) :].lstrip()
+        if text:
+            parts.append(text)
+        return parts